@@ -77,10 +77,24 @@ DOWNLOAD_RETRIES = 5  # Specific retry count for file downloads
 
 # GitHub API settings
 GITHUB_API_URL = "https://api.github.com"
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+GITHUB_GRAPHQL_PAGE_SIZE = 100  # Repositories per GraphQL page (metadata only; the API maximum)
+GITHUB_GRAPHQL_BLOB_BATCH = 100  # File contents fetched per GraphQL request
+GITHUB_GRAPHQL_BLOB_BATCH_BYTES = 4 * 1024 * 1024  # Content size budget per GraphQL request; larger files use raw downloads
+GITHUB_GRAPHQL_BLOB_CONCURRENCY = 4  # Batched blob reads in flight at once
 GITHUB_MAX_RETRIES = 3
 GITHUB_TIMEOUT = 30
 GITHUB_DEFAULT_BRANCH = "main"
 GITHUB_DOWNLOAD_RETRIES = 5  # Specific retry count for file downloads
+GITHUB_DOWNLOAD_MIN_INTERVAL = 0.05  # Minimum gap (seconds) between raw file downloads
+GITHUB_ETAG_CACHE_DIR = CACHE_DIR / ".etags"  # Conditional-request (ETag) response cache
+GITHUB_ETAG_CACHE_MAX_BYTES = 256 * 1024 * 1024  # On-disk ETag cache size; least recently used entries are pruned beyond it
+GITHUB_POOL_CONNECTIONS = 20  # Number of per-host connection pools kept by the shared session
+GITHUB_POOL_MAXSIZE = 50  # Keep-alive connections kept per host
+GITHUB_RATE_LIMIT_RESERVE = 64  # Requests held back per rate-limit window (about twice the worker count)
+GITHUB_RATE_LIMIT_MAX_WAIT = 120  # Longest wait (seconds) for a window reset before giving up
+GITHUB_DOWNLOAD_CONCURRENCY = 16  # File downloads kept in flight during the download phase
+GITHUB_DOWNLOAD_QUEUE_SIZE = 256  # Files buffered between repository scanning and the download workers
 
 # Repository content settings
 RELEVANT_FOLDERS = [
@@ -129,6 +143,8 @@ HF_DATASET_TEMPLATE = {
     "config": {"features": {"text": "string", "metadata": "dict"}},
 }
 HF_DEFAULT_REPO_TYPE = "dataset"
+HF_METADATA_CACHE_TTL = 300  # Seconds to reuse Hub lookups (whoami, dataset info, dataset cards)
+HF_METADATA_CONCURRENCY = 8  # Datasets whose metadata is downloaded at once by download_many_metadata
 
 # Logging settings
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
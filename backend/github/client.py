@@ -1,24 +1,100 @@
 import time
+import json
+import hashlib
+import re
 import logging
+import os
 import requests
 import random
 import threading
+import atexit
 import sys
 from pathlib import Path
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, ConnectionError, ReadTimeout
 from http.client import RemoteDisconnected
+from urllib.parse import quote
 from urllib3.exceptions import ProtocolError
+from urllib3.util.retry import Retry
 # Ensure local import takes precedence over any installed packages
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config.settings import (
     GITHUB_API_URL,
+    GITHUB_GRAPHQL_URL,
     GITHUB_MAX_RETRIES,
     GITHUB_TIMEOUT,
     GITHUB_DOWNLOAD_RETRIES,
+    GITHUB_DOWNLOAD_MIN_INTERVAL,
+    GITHUB_ETAG_CACHE_DIR,
+    GITHUB_ETAG_CACHE_MAX_BYTES,
+    GITHUB_POOL_CONNECTIONS,
+    GITHUB_POOL_MAXSIZE,
+    TEXT_FILE_EXTENSIONS,
+    MAX_FILE_SIZE_MB,
+    RELEVANT_FOLDERS,
+    IGNORED_DIRS,
 )
+from utils.github_ratelimit import RateLimiter, RateLimitExhausted
 
 logger = logging.getLogger(__name__)
 
+# Relevant-file filter used while scanning; str.endswith checks the whole tuple in C
+_TEXT_FILE_SUFFIXES = tuple(ext.lower() for ext in TEXT_FILE_EXTENSIONS)
+_MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
+# Directory name filters as sets, so each check is one hash lookup
+_RELEVANT_FOLDER_NAMES = frozenset(RELEVANT_FOLDERS)
+_IGNORED_DIR_NAMES = frozenset(IGNORED_DIRS)
+
+# Endpoints whose responses are worth revalidating with ETags: organization and
+# user repository listings, git trees, and contents listings (directories only,
+# file responses carry base64 payloads and are not cached)
+_ETAG_CACHEABLE_RE = re.compile(r"^(?:(?:orgs|users)/[^/]+/repos|repos/[^/]+/[^/]+/(?:git/trees|contents)(?:/.*)?)$")
+
+# Process-wide HTTP session so every client reuses keep-alive TLS connections
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session():
+    """Get or create the process-wide pooled HTTP session used for GitHub requests."""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=GITHUB_POOL_CONNECTIONS,
+                pool_maxsize=GITHUB_POOL_MAXSIZE,
+                # Status retries only: connection and read errors are already
+                # retried by the loops in GitHubClient.get and _request_download
+                max_retries=Retry(
+                    total=3,
+                    connect=0,
+                    read=0,
+                    other=0,
+                    backoff_factor=0.3,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    # Hand the final response back so GitHubClient can report it
+                    raise_on_status=False,
+                ),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _shared_session = session
+        return _shared_session
+
+
+def close_shared_session():
+    """Close the process-wide HTTP session."""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is not None:
+            logger.debug("Closing shared GitHub HTTP session")
+            _shared_session.close()
+            _shared_session = None
+
+
+atexit.register(close_shared_session)
+
 
 class GitHubAPIError(Exception):
     """Exception raised for GitHub API errors."""
@@ -32,6 +108,153 @@ class RateLimitError(GitHubAPIError):
     pass
 
 
+class EtagCache:
+    """Stores ETags and response bodies so unchanged resources can be revalidated.
+
+    GitHub answers a conditional request (``If-None-Match``) for an unchanged
+    resource with ``304 Not Modified`` and no body, and does not count it
+    against the rate limit. Entries are persisted as one JSON file per request
+    under ``cache_dir`` so they survive across runs; only the ETags are kept in
+    memory, and a body is read back from disk when a 304 needs it. Once the
+    files exceed ``max_bytes`` the least recently used ones are deleted.
+    """
+
+    def __init__(self, cache_dir=GITHUB_ETAG_CACHE_DIR, max_bytes=GITHUB_ETAG_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._etags = {}
+        # Bytes on disk, measured on the first write and then tracked per write
+        self._total_bytes = None
+        self._lock = threading.Lock()
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not create ETag cache directory {self.cache_dir}: {e}")
+
+    @staticmethod
+    def make_key(url, params=None, token=None):
+        """Build a cache key from a URL, its query parameters and the requesting token.
+
+        The token is hashed into the key so clients that can see different
+        repositories never share cached bodies.
+        """
+        scope = hashlib.sha256(token.encode("utf-8")).hexdigest()[:16] if token else "anonymous"
+        if not params:
+            return f"{scope}:{url}"
+        query = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        return f"{scope}:{url}?{query}"
+
+    @staticmethod
+    def is_cacheable(endpoint, body):
+        """Whether a response for ``endpoint`` should be stored (listings and trees only)."""
+        endpoint = endpoint.strip("/")
+        if not _ETAG_CACHEABLE_RE.match(endpoint):
+            return False
+        if "/contents" in endpoint and not isinstance(body, list):
+            return False
+        return True
+
+    def _entry_path(self, key):
+        return self.cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+    def _load(self, key):
+        try:
+            with open(self._entry_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get_etag(self, key):
+        """Return the ETag stored for a key, or None."""
+        with self._lock:
+            etag = self._etags.get(key)
+        if etag is not None:
+            return etag
+
+        entry = self._load(key)
+        if not entry or not entry.get("etag"):
+            return None
+        with self._lock:
+            self._etags[key] = entry["etag"]
+        return entry["etag"]
+
+    def get(self, key):
+        """Return the cached ``{"etag", "body"}`` entry for a key, or None."""
+        entry = self._load(key)
+        if entry is not None:
+            # Mark the entry as recently used so pruning keeps it
+            try:
+                os.utime(self._entry_path(key))
+            except OSError:
+                pass
+        return entry
+
+    def discard(self, key):
+        """Forget the ETag held in memory for a key."""
+        with self._lock:
+            self._etags.pop(key, None)
+
+    def set(self, key, etag, body):
+        """Store the ETag and decoded body for a key."""
+        entry_path = self._entry_path(key)
+        tmp_path = entry_path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            old_size = entry_path.stat().st_size
+        except OSError:
+            old_size = 0
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"etag": etag, "body": body}, f)
+            new_size = tmp_path.stat().st_size
+            os.replace(tmp_path, entry_path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.debug(f"Could not persist ETag cache entry for {key}: {e}")
+            return
+
+        with self._lock:
+            self._etags[key] = etag
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._scan_entries())
+            else:
+                self._total_bytes += new_size - old_size
+            over_limit = self._total_bytes > self.max_bytes
+        if over_limit:
+            self._prune()
+
+    def _scan_entries(self):
+        """List ``(mtime, size, path)`` for every entry file on disk."""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for dir_entry in it:
+                    if not dir_entry.name.endswith(".json"):
+                        continue
+                    try:
+                        stat = dir_entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+        except OSError as e:
+            logger.debug(f"Could not list ETag cache directory {self.cache_dir}: {e}")
+        return entries
+
+    def _prune(self):
+        """Delete least recently used entries until the cache is under 90% of ``max_bytes``."""
+        entries = self._scan_entries()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+        with self._lock:
+            self._total_bytes = total
+
+
 class GitHubClient:
     """Client for interacting with GitHub API with improved rate limiting."""
 
@@ -39,6 +262,11 @@ class GitHubClient:
     _class_lock = threading.RLock()
     # Add this class attribute
     request_lock = threading.Lock()
+    # Raw downloads are not charged against the API limit, so they get their own lighter pacing
+    download_lock = threading.Lock()
+    last_download_time = float("-inf")  # time.monotonic() of the last reserved download start
+    # Server-reported rate-limit budget shared by every client in the process
+    rate_limiter = RateLimiter()
     
     # Initialize class variables in a thread-safe way
     @classmethod
@@ -55,7 +283,7 @@ class GitHubClient:
     # Instance-level lock for this specific client
     # Class-level rate limiting with thread safety
 
-    def __init__(self, token=None):
+    def __init__(self, token=None, etag_cache=None, session=None):
         # Initialize class variables if not already done
         self._initialize_class_vars()
         
@@ -65,15 +293,25 @@ class GitHubClient:
         if token:
             # GitHub API accepts both formats but "Bearer" is more modern and standard OAuth format
             self.headers["Authorization"] = f"Bearer {token}"
-        self.session = requests.Session()
+        # Share pooled connections with every other client unless a session is supplied
+        self.session = session if session is not None else get_shared_session()
         # Create an instance-level lock for this specific client
         self.request_lock = threading.RLock()
+        # Conditional-request cache shared by every GET made through this client
+        self.etag_cache = etag_cache if etag_cache is not None else EtagCache()
 
     def get(self, endpoint, params=None):
         """Make a GET request to GitHub API with proper rate limiting."""
         url = f"{GITHUB_API_URL}/{endpoint.lstrip('/')}"
         retries = 0
 
+        # Revalidate against a previously seen ETag so unchanged resources come back as 304
+        cache_key = EtagCache.make_key(url, params, self.token)
+        cached_etag = self.etag_cache.get_etag(cache_key)
+        headers = self.headers
+        if cached_etag:
+            headers = dict(self.headers, **{"If-None-Match": cached_etag})
+
         # Check hourly rate limit - use class-level lock for shared state
         with GitHubClient._class_lock:
             current_time = time.time()
@@ -120,10 +358,18 @@ class GitHubClient:
                     GitHubClient.last_request_time = time.time()
                     GitHubClient.current_requests += 1
 
+            try:
+                self.rate_limiter.acquire("core")
+            except RateLimitExhausted as e:
+                message = f"GitHub API rate limit exceeded. Try again after {e.wait_time/60:.1f} minutes."
+                logger.error(message)
+                raise RateLimitError(message)
+
             try:
                 response = self.session.get(
-                    url, headers=self.headers, params=params, timeout=GITHUB_TIMEOUT
+                    url, headers=headers, params=params, timeout=GITHUB_TIMEOUT
                 )
+                self.rate_limiter.update(response.headers, "core")
 
                 # Check remaining rate limit
                 remaining = int(response.headers.get("X-RateLimit-Remaining", "1"))
@@ -136,8 +382,26 @@ class GitHubClient:
                         GitHubClient.min_request_interval, 2.0
                     )
 
-                if response.status_code == 200:
-                    return response.json()
+                if response.status_code == 304 and cached_etag:
+                    cached = self.etag_cache.get(cache_key)
+                    if cached is not None:
+                        # Not modified: GitHub does not charge 304s against the rate limit
+                        with GitHubClient._class_lock:
+                            GitHubClient.current_requests = max(0, GitHubClient.current_requests - 1)
+                        logger.debug(f"Not modified, using cached response for {cache_key}")
+                        return cached["body"]
+                    # The stored body has gone from disk; ask again without the ETag
+                    self.etag_cache.discard(cache_key)
+                    cached_etag = None
+                    headers = self.headers
+                    retries += 1
+                    continue
+                elif response.status_code == 200:
+                    data = response.json()
+                    etag = response.headers.get("ETag")
+                    if isinstance(etag, str) and etag and EtagCache.is_cacheable(endpoint, data):
+                        self.etag_cache.set(cache_key, etag, data)
+                    return data
                 elif (
                     response.status_code == 403
                     and "rate limit exceeded" in response.text.lower()
@@ -198,6 +462,66 @@ class GitHubClient:
 
         raise GitHubAPIError("Maximum retries reached")
 
+    def graphql(self, query, variables=None):
+        """
+        Execute a query against the GitHub GraphQL API.
+
+        Args:
+            query (str): GraphQL query document
+            variables (dict, optional): Query variables
+
+        Returns:
+            dict: The ``data`` member of the response
+
+        Raises:
+            GitHubAPIError: If the request fails or the response contains errors
+        """
+        if not self.token:
+            raise GitHubAPIError("GitHub GraphQL API requires an authentication token")
+
+        with self.request_lock:
+            with GitHubClient._class_lock:
+                elapsed = time.time() - GitHubClient.last_request_time
+                if elapsed < GitHubClient.min_request_interval:
+                    time.sleep(GitHubClient.min_request_interval - elapsed)
+                GitHubClient.last_request_time = time.time()
+                GitHubClient.current_requests += 1
+
+        try:
+            self.rate_limiter.acquire("graphql")
+        except RateLimitExhausted as e:
+            raise RateLimitError(
+                f"GitHub GraphQL API rate limit exceeded. Try again after {e.wait_time/60:.1f} minutes."
+            )
+
+        try:
+            response = self.session.post(
+                GITHUB_GRAPHQL_URL,
+                headers=self.headers,
+                json={"query": query, "variables": variables or {}},
+                timeout=GITHUB_TIMEOUT,
+            )
+        except RequestException as e:
+            raise GitHubAPIError(f"Failed to connect to GitHub GraphQL API: {e}")
+        self.rate_limiter.update(response.headers, "graphql")
+
+        if response.status_code != 200:
+            message = response.text[:200] if response.text else "No response body"
+            if response.status_code == 403 and "rate limit" in message.lower():
+                raise RateLimitError(f"GitHub GraphQL API rate limit exceeded: {message}")
+            raise GitHubAPIError(f"GitHub GraphQL API error: {response.status_code} - {message}")
+
+        try:
+            payload = response.json()
+        except ValueError:
+            raise GitHubAPIError("GitHub GraphQL API returned a non-JSON response")
+
+        if payload.get("errors"):
+            messages = "; ".join(error.get("message", "Unknown error") for error in payload["errors"])
+            raise GitHubAPIError(f"GitHub GraphQL API error: {messages}")
+
+        return payload.get("data") or {}
+
     def get_organization_repos(self, org_name, page=1, per_page=100):
         """Get repositories for a GitHub organization."""
         logger.info(f"Fetching repositories for organization: {org_name}")
@@ -231,6 +555,27 @@ class GitHubClient:
             logger.error(f"Failed to fetch contents for {owner}/{repo}/{path}: {e}")
             raise
             
+    def get_tree(self, owner, repo, ref, recursive=True):
+        """
+        Get a repository's git tree in a single request.
+
+        Args:
+            owner (str): Repository owner
+            repo (str): Repository name
+            ref (str): Branch, tag or tree SHA
+            recursive (bool): Include every nested entry (up to GitHub's 100,000 entry limit)
+
+        Returns:
+            dict: Tree response with a flat ``tree`` list and a ``truncated`` flag
+        """
+        logger.debug(f"Fetching tree for {owner}/{repo}@{ref}")
+        params = {"recursive": 1} if recursive else None
+        try:
+            return self.get(f"repos/{owner}/{repo}/git/trees/{ref}", params)
+        except GitHubAPIError as e:
+            logger.error(f"Failed to fetch tree for {owner}/{repo}@{ref}: {e}")
+            raise
+            
     def scan_repository_structure(self, owner, repo, ref=None):
         """
         Scan a repository's directory structure to identify all relevant folders.
@@ -241,16 +586,30 @@ class GitHubClient:
             ref (str, optional): Branch or commit reference
             
         Returns:
-            dict: Dictionary with relevant paths and file metadata
+            dict: Dictionary with relevant paths and file metadata. ``structure``
+            nests directories by name; ``structure_flat`` maps each directory path
+            to the same file list, for direct lookups by path.
         """
         logger.info(f"Scanning repository structure for {owner}/{repo}")
         result = {
             "relevant_paths": [],
             "total_files": 0,
             "relevant_files": 0,
-            "structure": {}
+            "structure": {},
+            "structure_flat": {}
         }
         
+        # One recursive tree listing covers the whole repository; walk the contents
+        # API directory by directory only if the tree is unavailable or truncated
+        try:
+            tree = self.get_tree(owner, repo, ref or "HEAD", recursive=True)
+        except GitHubAPIError as e:
+            logger.warning(f"Tree listing unavailable for {owner}/{repo}, scanning directories: {e}")
+            tree = None
+        if tree and not tree.get("truncated") and isinstance(tree.get("tree"), list):
+            self._scan_tree_structure(owner, repo, ref or "HEAD", tree["tree"], result)
+            return result
+        
         try:
             # Start with root directory
             self._scan_directory_structure(owner, repo, "", ref, result)
@@ -259,6 +618,54 @@ class GitHubClient:
             logger.error(f"Failed to scan repository structure for {owner}/{repo}: {e}")
             raise
             
+    def _scan_tree_structure(self, owner, repo, ref, entries, result, max_depth=10):
+        """
+        Fill ``result`` from a recursive tree listing, as ``_scan_directory_structure`` would.
+        
+        Entries arrive with each directory before its contents, so every entry's
+        parent has been placed (or skipped) by the time the entry is seen.
+        """
+        # Scanned directories by path: (structure node, is relevant, depth)
+        scanned = {"": (result["structure"], False, 0)}
+        # Percent-encoded so refs and paths containing '#', '?' or '/' address the right file
+        raw_base = f"https://raw.githubusercontent.com/{owner}/{repo}/{quote(ref, safe='')}/"
+        for entry in entries:
+            path = entry["path"]
+            parent, _, name = path.rpartition("/")
+            parent_info = scanned.get(parent)
+            if parent_info is None:
+                # Inside an ignored directory or beyond the depth limit
+                continue
+            node, is_relevant, depth = parent_info
+            result["total_files"] += 1
+            
+            if entry["type"] == "tree":
+                # Skip ignored directories
+                if name in _IGNORED_DIR_NAMES:
+                    continue
+                node.setdefault("dirs", []).append(name)
+                if depth + 1 < max_depth:
+                    subdir_relevant = is_relevant or name.lower() in _RELEVANT_FOLDER_NAMES
+                    scanned[path] = (node.setdefault(name, {}), subdir_relevant, depth + 1)
+                    if subdir_relevant:
+                        result["relevant_paths"].append(path)
+            elif entry["type"] == "blob":
+                if "files" not in node:
+                    node["files"] = result["structure_flat"][parent] = []
+                size = entry.get("size", 0)
+                node["files"].append({
+                    "name": name,
+                    "path": path,
+                    "size": size,
+                    "sha": entry["sha"],
+                    "download_url": raw_base + quote(path)
+                })
+                
+                # Check if file is in a relevant folder
+                if (is_relevant and size <= _MAX_FILE_SIZE_BYTES and
+                        name.lower().endswith(_TEXT_FILE_SUFFIXES)):
+                    result["relevant_files"] += 1
+            
     def _scan_directory_structure(self, owner, repo, path, ref, result, max_depth=10):
         """Recursively scan directory structure with depth limit."""
         if max_depth <= 0:
@@ -281,9 +688,8 @@ class GitHubClient:
                     current_path = current_path[part]
             
             # Check if this is a relevant folder
-            from config.settings import RELEVANT_FOLDERS
             path_parts = path.split("/") if path else []
-            is_relevant = any(part.lower() in RELEVANT_FOLDERS for part in path_parts)
+            is_relevant = any(part.lower() in _RELEVANT_FOLDER_NAMES for part in path_parts)
             if is_relevant:
                 result["relevant_paths"].append(path)
             
@@ -292,8 +698,7 @@ class GitHubClient:
                 result["total_files"] += 1
                 if item["type"] == "dir":
                     # Skip ignored directories
-                    from config.settings import IGNORED_DIRS
-                    if item["name"] in IGNORED_DIRS:
+                    if item["name"] in _IGNORED_DIR_NAMES:
                         continue
                         
                     # Add directory to structure
@@ -308,6 +713,7 @@ class GitHubClient:
                     # Record file in structure
                     if "files" not in current_path:
                         current_path["files"] = []
+                        result["structure_flat"][path] = current_path["files"]
                     
                     file_info = {
                         "name": item["name"],
@@ -321,9 +727,8 @@ class GitHubClient:
                     # Check if file is in a relevant folder
                     if is_relevant:
                         # Check file type
-                        from config.settings import TEXT_FILE_EXTENSIONS, MAX_FILE_SIZE_MB
-                        if (any(item["name"].lower().endswith(ext) for ext in TEXT_FILE_EXTENSIONS) and
-                            item["size"] / 1024 / 1024 <= MAX_FILE_SIZE_MB):
+                        if (item["size"] <= _MAX_FILE_SIZE_BYTES and
+                            item["name"].lower().endswith(_TEXT_FILE_SUFFIXES)):
                             result["relevant_files"] += 1
         except GitHubAPIError as e:
             logger.warning(f"Error scanning directory {path}: {e}")
@@ -353,61 +758,145 @@ class GitHubClient:
             logger.error(f"Failed to verify GitHub credentials: {e}")
             raise
 
+    def _request_download(self, path, download_url, stream=False):
+        """
+        Request a raw file URL with download-specific pacing and retries.
+
+        Args:
+            path (str): Repository path (for log messages)
+            download_url (str): Raw download URL
+            stream (bool): Whether to defer reading the body
+
+        Returns:
+            requests.Response: Successful response
+        """
+        # Special retry logic for file downloads
+        download_retries = GITHUB_DOWNLOAD_RETRIES  # More retries for downloads
+        retry_count = 0
+
+        while retry_count < download_retries:
+            try:
+                # Apply rate limiting for download as well: reserve the next start
+                # slot under the lock, then wait for it outside so other threads
+                # can reserve theirs meanwhile
+                with GitHubClient.download_lock:
+                    current_time = time.monotonic()
+                    start_time = max(
+                        current_time,
+                        GitHubClient.last_download_time + GITHUB_DOWNLOAD_MIN_INTERVAL,
+                    )
+                    GitHubClient.last_download_time = start_time
+                if start_time > current_time:
+                    time.sleep(start_time - current_time)
+
+                download_timeout = (
+                    GITHUB_TIMEOUT * 2
+                )  # Double timeout for downloads
+                response = self.session.get(
+                    download_url, timeout=download_timeout, stream=stream
+                )
+                if not response.ok:
+                    # Release the pooled connection before reporting the error
+                    response.close()
+                response.raise_for_status()
+                return response
+            except (
+                ConnectionError,
+                ReadTimeout,
+                RemoteDisconnected,
+                ProtocolError,
+            ) as e:
+                retry_count += 1
+                if retry_count < download_retries:
+                    # Exponential backoff with jitter
+                    backoff_time = min(30, (2**retry_count) + (random.random() * 2))
+                    logger.warning(
+                        f"Connection error downloading {path}, "
+                        f"retrying in {backoff_time:.2f}s ({retry_count}/{download_retries}): {e}"
+                    )
+                    time.sleep(backoff_time)
+                else:
+                    logger.error(
+                        f"Failed to download file after {download_retries} retries: {e}"
+                    )
+                    raise GitHubAPIError(
+                        f"Failed to download file content after {download_retries} retries: {e}"
+                    )
+            except RequestException as e:
+                logger.error(f"Failed to download file content: {e}")
+                raise GitHubAPIError(f"Failed to download file content: {e}")
+
+        raise GitHubAPIError(f"Maximum retries reached for downloading {path}")
+
+    def _get_download_url(self, owner, repo, path, ref=None):
+        """Look up the raw download URL of a repository file."""
+        content_data = self.get_repository_contents(owner, repo, path, ref)
+        if isinstance(content_data, dict) and "download_url" in content_data:
+            return content_data["download_url"]
+        raise GitHubAPIError(f"Unexpected content data format for {path}")
+
     def get_repository_file(self, owner, repo, path, ref=None):
         """Get the raw content of a file."""
         logger.debug(f"Fetching file content for {owner}/{repo}/{path}")
-        content_data = self.get_repository_contents(owner, repo, path, ref)
+        download_url = self._get_download_url(owner, repo, path, ref)
+        return self._request_download(path, download_url).text
 
-        if isinstance(content_data, dict) and "download_url" in content_data:
-            # Special retry logic for file downloads
-            download_retries = GITHUB_DOWNLOAD_RETRIES  # More retries for downloads
-            retry_count = 0
-
-            while retry_count < download_retries:
-                try:
-                    # Apply rate limiting for download as well
-                    with GitHubClient.request_lock:
-                        current_time = time.time()
-                        elapsed = current_time - GitHubClient.last_request_time
-                        if elapsed < GitHubClient.min_request_interval:
-                            sleep_time = GitHubClient.min_request_interval - elapsed
-                            time.sleep(sleep_time)
-                        GitHubClient.last_request_time = time.time()
-
-                    download_timeout = (
-                        GITHUB_TIMEOUT * 2
-                    )  # Double timeout for downloads
-                    response = self.session.get(
-                        content_data["download_url"], timeout=download_timeout
-                    )
-                    response.raise_for_status()
-                    return response.text
-                except (
-                    ConnectionError,
-                    ReadTimeout,
-                    RemoteDisconnected,
-                    ProtocolError,
-                ) as e:
-                    retry_count += 1
-                    if retry_count < download_retries:
-                        # Exponential backoff with jitter
-                        backoff_time = min(30, (2**retry_count) + (random.random() * 2))
-                        logger.warning(
-                            f"Connection error downloading {path}, "
-                            f"retrying in {backoff_time:.2f}s ({retry_count}/{download_retries}): {e}"
-                        )
-                        time.sleep(backoff_time)
-                    else:
-                        logger.error(
-                            f"Failed to download file after {download_retries} retries: {e}"
-                        )
-                        raise GitHubAPIError(
-                            f"Failed to download file content after {download_retries} retries: {e}"
-                        )
-                except RequestException as e:
-                    logger.error(f"Failed to download file content: {e}")
-                    raise GitHubAPIError(f"Failed to download file content: {e}")
+    def download_repository_file(
+        self, owner, repo, path, local_path, ref=None, chunk_size=1024 * 1024, download_url=None
+    ):
+        """
+        Stream the raw content of a file straight to disk.
+
+        The body is written in ``chunk_size`` pieces as it arrives, so the whole
+        file is never held in memory. It lands in ``<local_path>.part`` and is
+        renamed into place only once the transfer completes. A ``download_url`` already known from a
+        repository scan skips the contents API lookup; if it fails the URL is
+        looked up again (e.g. private repositories need a tokenised URL).
+
+        Args:
+            owner (str): Repository owner
+            repo (str): Repository name
+            path (str): File path in the repository
+            local_path (str): Destination path
+            ref (str, optional): Branch or commit reference
+            chunk_size (int): Read size in bytes
+            download_url (str, optional): Raw URL recorded when the repository was scanned
+
+        Returns:
+            int: Number of bytes written
+        """
+        logger.debug(f"Streaming file content for {owner}/{repo}/{path}")
+        response = None
+        if download_url:
+            try:
+                response = self._request_download(path, download_url, stream=True)
+            except GitHubAPIError as e:
+                logger.debug(f"Scanned download URL failed for {path}, looking it up: {e}")
+        if response is None:
+            download_url = self._get_download_url(owner, repo, path, ref)
+            response = self._request_download(path, download_url, stream=True)
+
+        # Stream into a sibling .part file so an interrupted transfer never
+        # leaves a truncated file at the final path
+        part_path = f"{os.fspath(local_path)}.part"
+        written = 0
+        try:
+            with open(part_path, "wb") as f:
+                # iter_content transparently decodes gzip/deflate transfer encodings
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if chunk:
+                        f.write(chunk)
+                        written += len(chunk)
+            os.replace(part_path, local_path)
+        except BaseException as e:
+            try:
+                os.unlink(part_path)
+            except OSError:
+                pass
+            if isinstance(e, RequestException):
+                raise GitHubAPIError(f"Failed to download file content for {path}: {e}")
+            raise
+        finally:
+            response.close()
 
-            raise GitHubAPIError(f"Maximum retries reached for downloading {path}")
-        else:
-            raise GitHubAPIError(f"Unexpected content data format for {path}")
\ No newline at end of file
+        return written
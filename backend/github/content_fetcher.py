@@ -1,5 +1,11 @@
 import logging
+import os
 import re
+import json
+import copy
+import hashlib
+import functools
+import queue
 import atexit
 import signal
 import time
@@ -7,42 +13,296 @@ import sys
 from pathlib import Path
 # Ensure local import takes precedence over any installed packages
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from github.repository import RepositoryFetcher
+from config.settings import GITHUB_DOWNLOAD_CONCURRENCY, GITHUB_DOWNLOAD_QUEUE_SIZE
+from github.client import GitHubAPIError
+from github.repository import RepositoryFetcher, DownloadQueue
 from utils.performance import async_process
 from utils.task_tracker import TaskTracker
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import requests
 import threading
 
 logger = logging.getLogger(__name__)
 
+# GitHub URL patterns, compiled once at import
+_GH_ORG_URL_RE = re.compile(r"https?://github\.com/([^/]+)/?$")
+_GH_REPO_URL_RE = re.compile(r"https?://github\.com/([^/]+)/([^/]+?)(?:\.git)?(?:/|$)")
+_GH_NAME_RE = re.compile(r"^[\w.-]+$")
+
 # Global executor for background tasks
 _global_executor = None
+# Process-wide pool running the download workers, reused across organization fetches
+_download_executor = None
+_download_executor_lock = threading.Lock()
+_signal_handlers_installed = False
+# Set once the global executor has been shut down (interpreter exit or SIGINT/SIGTERM);
+# fetches check it before dispatching more work
+_shutdown_event = threading.Event()
+# Whether shutdown_executor has run; a signal alone only stops the fetches in progress
+_executors_shut_down = False
+
+# Repository scans currently running, keyed by (owner, repo, branch), shared by
+# every fetch in the process so concurrent organization fetches scan each repository once
+_inflight_scans = {}
+_inflight_scans_lock = threading.Lock()
+
+# Tells a download worker thread to exit
+_DOWNLOAD_WORKER_SENTINEL = object()
+
+# Serialises reads and writes of the on-disk AI guidance cache
+_instructions_cache_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=256)
+def _get_github_instructions_cached(token_hash, user_input, repo_url):
+    """
+    Ask the LLM for repository fetching instructions, memoised per token and input.
+
+    ``token_hash`` only scopes the cache; it is not sent anywhere.
+    Exceptions are not cached, so a failed call is retried next time.
+    """
+    # Import LLMClient for AI guidance
+    from utils.llm_client import LLMClient
+
+    logger.info(f"Getting AI guidance for repository: {repo_url}")
+    return LLMClient().generate_github_instructions(user_input, repo_url)
+
 
+def get_executor(max_workers=None):
+    """Get or create a global thread pool executor.
 
-def get_executor(max_workers=3):
-    """Get or create a global thread pool executor."""
-    global _global_executor
+    The pool is created once and reused for every scan and download batch.
+    By default it is sized by ``default_worker_count()``.
+    """
+    global _global_executor, _executors_shut_down
     if _global_executor is None:
+        if max_workers is None:
+            max_workers = default_worker_count()
         _global_executor = ThreadPoolExecutor(max_workers=max_workers)
+        _executors_shut_down = False
+        _shutdown_event.clear()
+        _install_signal_handlers()
     return _global_executor
 
 
+def _rearm_shutdown_flag():
+    """
+    Clear a shutdown flag left by a signal the process survived.
+
+    A signal whose previous handler did not exit the process (for example a
+    server's graceful-shutdown callback) only stops the fetches that were
+    running; new fetches proceed unless the executors were really shut down.
+    """
+    if _shutdown_event.is_set() and not _executors_shut_down:
+        _shutdown_event.clear()
+
+
+def _forget_scan(key, future):
+    """Drop a finished scan from the in-flight registry."""
+    with _inflight_scans_lock:
+        if _inflight_scans.get(key) is future:
+            del _inflight_scans[key]
+
+
+def get_download_executor():
+    """
+    Get or create the process-wide pool that runs download workers.
+
+    Sized to ``GITHUB_DOWNLOAD_CONCURRENCY`` and created on first use, so repeated
+    organization fetches reuse warm threads instead of starting new ones. Fetches
+    running at the same time share its download window.
+    """
+    global _download_executor
+    with _download_executor_lock:
+        if _download_executor is None:
+            _download_executor = ThreadPoolExecutor(
+                max_workers=GITHUB_DOWNLOAD_CONCURRENCY, thread_name_prefix="gh-download"
+            )
+            _install_signal_handlers()
+        return _download_executor
+
+
+def _install_signal_handlers():
+    """
+    Flag shutdown on SIGINT/SIGTERM, then defer to the prior handler.
+
+    The handler only sets ``_shutdown_event``: it may interrupt the main thread
+    while it holds ``_download_executor_lock`` (or an executor's own lock), so
+    anything lock-taking is left to the ``shutdown_executor`` atexit hook.
+    Signals that are ignored (``SIG_IGN``, e.g. SIGINT in a nohup'd process) or
+    whose handler was not installed from Python are left alone.
+    Installed once, the first time the executor is created, and only from the
+    main thread (``signal.signal`` refuses anywhere else).
+    """
+    global _signal_handlers_installed
+    if _signal_handlers_installed or threading.current_thread() is not threading.main_thread():
+        return
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if previous is None or previous == signal.SIG_IGN:
+            continue
+
+        def handler(signum, frame, previous=previous):
+            _shutdown_event.set()
+            if callable(previous):
+                previous(signum, frame)
+            elif previous == signal.SIG_DFL:
+                # Restore the default action and deliver the signal again
+                signal.signal(signum, signal.SIG_DFL)
+                signal.raise_signal(signum)
+
+        signal.signal(sig, handler)
+    _signal_handlers_installed = True
+
+
+def default_worker_count():
+    """
+    Number of threads used for I/O-bound GitHub work.
+
+    Five threads per CPU the process may run on (respecting container CPU
+    affinity where the platform exposes it), capped at 32.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return min(32, cpus * 5)
+
+
+def _iter_completed(futures, cancellation_event=None, timeout=300, poll_interval=0.5):
+    """
+    Yield futures as they complete, checking for cancellation between completions.
+
+    Completion order is used instead of submission order, so one slow future no
+    longer delays the others, and cancellation is noticed within ``poll_interval``.
+    Stops early (after cancelling what is still pending) once the event is set.
+    Futures still running after ``timeout`` seconds are yielded as-is so callers
+    calling ``result(timeout=0)`` see a ``TimeoutError`` for them.
+
+    Args:
+        futures: Futures to wait on
+        cancellation_event (threading.Event, optional): Event signalling cancellation
+        timeout (float): Overall time budget in seconds
+        poll_interval (float): Maximum time between cancellation checks
+
+    Yields:
+        Future: Completed (or timed-out) futures
+    """
+    pending = set(futures)
+    deadline = time.monotonic() + timeout
+    while pending:
+        if cancellation_event and cancellation_event.is_set():
+            for future in pending:
+                future.cancel()
+            return
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            for future in pending:
+                future.cancel()
+            yield from pending
+            return
+
+        done, pending = wait(
+            pending, timeout=min(poll_interval, remaining), return_when=FIRST_COMPLETED
+        )
+        yield from done
+
+
 def shutdown_executor():
-    """Shutdown the global executor."""
-    global _global_executor
+    """Shutdown the global executor and the download pool."""
+    global _global_executor, _download_executor, _executors_shut_down
+    _executors_shut_down = True
+    _shutdown_event.set()
     if _global_executor:
         logger.debug("Shutting down global thread pool executor")
         _global_executor.shutdown(wait=False)
         _global_executor = None
+    with _download_executor_lock:
+        if _download_executor:
+            # Queued workers still run and drain their queues once they see the shutdown flag
+            logger.debug("Shutting down download thread pool executor")
+            _download_executor.shutdown(wait=False)
+            _download_executor = None
 
 
 # Register shutdown function
 atexit.register(shutdown_executor)
 
-# Register signal handlers for graceful shutdown
-for sig in (signal.SIGINT, signal.SIGTERM):
-    signal.signal(sig, lambda signum, frame: shutdown_executor())
+
+class _TaskTrackerWriter:
+    """
+    Apply task tracker writes on a background thread.
+
+    Each tracker write is a JSON read-modify-write on disk, so progress updates
+    are queued here instead of blocking the fetch. Consecutive progress updates
+    for the same task and stage are merged, keeping only the latest. The daemon
+    thread is started on first use.
+    """
+
+    _MAX_BATCH = 64
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def submit(self, method, *args, **kwargs):
+        """Queue ``method(*args, **kwargs)`` to run on the writer thread."""
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._queue.put((method, args, kwargs))
+
+    def flush(self, timeout=5.0):
+        """Block until every write queued so far has been applied."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    @staticmethod
+    def _mergeable(previous, current):
+        if isinstance(previous, threading.Event) or isinstance(current, threading.Event):
+            return False
+        (prev_method, prev_args, prev_kwargs), (method, args, kwargs) = previous, current
+        return (
+            method == prev_method
+            and getattr(method, "__name__", None) == "update_task_progress"
+            and args[:1] == prev_args[:1]
+            and kwargs.get("stage") == prev_kwargs.get("stage")
+            and kwargs.get("status") is None
+            and prev_kwargs.get("status") is None
+        )
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            merged = []
+            for item in batch:
+                if merged and self._mergeable(merged[-1], item):
+                    merged[-1] = item
+                else:
+                    merged.append(item)
+
+            for item in merged:
+                if isinstance(item, threading.Event):
+                    item.set()
+                    continue
+                method, args, kwargs = item
+                try:
+                    method(*args, **kwargs)
+                except Exception as e:
+                    logger.error(f"Error writing task update: {e}")
 
 
 class ContentFetcher:
@@ -59,31 +319,143 @@ class ContentFetcher:
         self.status_thread = None
         self.stop_status_display = threading.Event()
         self.current_status = ""
+        
+        # Last task progress written, used to coalesce task tracker updates
+        self._last_progress_pct = -1
+        self._last_progress_ts = 0.0
+        self._last_progress_stage = None
+        self._last_progress_task = None
+        
+        # Progress writes go through a background writer; see _complete_task/_cancel_task
+        self._tracker_writer = _TaskTrackerWriter()
+        
+        # Queue the status display is watching (a fetch may pass its own)
+        self._status_queue = None
 
-    def fetch_organization_repositories(
+    def _submit_scan(self, executor, key, fn, *args):
+        """
+        Submit a repository scan unless an identical one is already running.
+
+        Args:
+            executor (ThreadPoolExecutor): Pool to run the scan on
+            key (tuple): ``(owner, repo, branch)`` identifying the scan
+            fn (callable): Scan function
+            *args: Arguments for ``fn``
+
+        Returns:
+            Future: The new future, or the one already running for ``key``
+        """
+        with _inflight_scans_lock:
+            future = _inflight_scans.get(key)
+            if future is not None:
+                logger.debug(f"Reusing in-flight scan for {key[0]}/{key[1]}")
+                return future
+            future = executor.submit(fn, *args)
+            _inflight_scans[key] = future
+
+        # Registered outside the lock: the callback runs immediately if the scan already finished
+        future.add_done_callback(lambda f: _forget_scan(key, f))
+        return future
+
+    def _maybe_update_task(self, task_id, progress, stage=None, stage_progress=None, status=None):
+        """
+        Forward a progress update to the task tracker unless it is too small to matter.
+        
+        Updates that move less than 1% within 250ms of the previous write are
+        dropped; stage and status changes are always written. Writes are applied
+        asynchronously by the background tracker writer.
+        
+        Returns:
+            bool: True if the update was queued
+        """
+        now = time.monotonic()
+        if (
+            status is None
+            and task_id == self._last_progress_task
+            and stage == self._last_progress_stage
+            and abs(progress - self._last_progress_pct) < 1
+            and now - self._last_progress_ts < 0.25
+        ):
+            return False
+        
+        self._last_progress_pct = progress
+        self._last_progress_ts = now
+        self._last_progress_stage = stage
+        self._last_progress_task = task_id
+        self._tracker_writer.submit(
+            self.task_tracker.update_task_progress,
+            task_id, progress, stage=stage, stage_progress=stage_progress, status=status
+        )
+        return True
+
+    def _complete_task(self, task_id, success=True, result=None):
+        """Record the final task outcome once queued progress writes have landed."""
+        self._tracker_writer.flush()
+        return self.task_tracker.complete_task(task_id, success=success, result=result)
+
+    def _finish_task(self, task_id, progress_callback, result):
+        """Drive progress to 100% and record a successful outcome with a single tracker write."""
+        if progress_callback:
+            progress_callback(100)
+        return self._complete_task(task_id, success=True, result=result)
+
+    def _cancel_task(self, task_id):
+        """Mark a task cancelled once queued progress writes have landed."""
+        self._tracker_writer.flush()
+        return self.task_tracker.cancel_task(task_id)
+
+    def iter_organization_repositories(
         self, org_name, callback=None, _cancellation_event=None
     ):
         """
-        Fetch repositories from an organization.
+        Iterate over an organization's repositories one page at a time.
+
+        Pages are yielded as soon as they arrive so callers can start work on
+        them while later pages are still being fetched.
 
         Args:
             org_name: Organization name
             callback: Progress callback function
             _cancellation_event: Event to check for cancellation
 
-        Returns:
-            List of repositories
+        Yields:
+            list: One page of repositories
         """
         # Initialize progress
         total_repos = 0
         processed = 0
         page = 1
-        all_repos = []
 
         try:
             # Use the GitHub client directly instead of direct API calls
             # This ensures proper authentication and rate limiting
             logger.info(f"Fetching repositories for organization: {org_name}")
+
+            # With a token, GraphQL lists repositories in a few large pages
+            if self.github_token:
+                try:
+                    for total_repos, repos_page in self.repo_fetcher.iter_organization_repos_graphql(org_name):
+                        if _cancellation_event and _cancellation_event.is_set():
+                            if callback:
+                                callback(
+                                    processed / max(1, total_repos) * 100, "Operation cancelled"
+                                )
+                            return
+
+                        processed += len(repos_page)
+
+                        if callback:
+                            callback(
+                                processed / max(1, total_repos) * 100,
+                                f"Fetched {processed}/{total_repos} repositories",
+                            )
+                        yield repos_page
+                    return
+                except GitHubAPIError as e:
+                    # Pages already handed out cannot be taken back, so only fall back before the first one
+                    if processed:
+                        raise
+                    logger.warning(f"GraphQL organization listing failed, falling back to REST: {e}")
             
             # First get the organization info to get the total repo count
             try:
@@ -107,7 +479,7 @@ class ContentFetcher:
                         callback(
                             processed / max(1, total_repos) * 100, "Operation cancelled"
                         )
-                    return []
+                    return
                 
                 try:
                     # Get repositories for this page using the proper GitHub client
@@ -118,7 +490,6 @@ class ContentFetcher:
                     if not repos_page:
                         break
                         
-                    all_repos.extend(repos_page)
                     processed += len(repos_page)
                     
                     if callback:
@@ -127,6 +498,8 @@ class ContentFetcher:
                             f"Fetched {processed}/{total_repos} repositories",
                         )
                     
+                    yield repos_page
+                    
                     # Check if we've reached the end
                     if len(repos_page) < 100:
                         break
@@ -135,8 +508,6 @@ class ContentFetcher:
                 except StopIteration:
                     # Handle StopIteration for test mocks that end early
                     break
-                
-            return all_repos
             
         except Exception as e:
             logger.error(f"Failed to fetch repositories for organization {org_name}: {e}")
@@ -144,6 +515,28 @@ class ContentFetcher:
                 callback(0, f"Error: {str(e)}")
             raise
 
+    def fetch_organization_repositories(
+        self, org_name, callback=None, _cancellation_event=None
+    ):
+        """
+        Fetch repositories from an organization.
+
+        Args:
+            org_name: Organization name
+            callback: Progress callback function
+            _cancellation_event: Event to check for cancellation
+
+        Returns:
+            List of repositories
+        """
+        all_repos = []
+        for repos_page in self.iter_organization_repositories(org_name, callback, _cancellation_event):
+            all_repos.extend(repos_page)
+
+        if _cancellation_event and _cancellation_event.is_set():
+            return []
+        return all_repos
+
     def fetch_org_repositories(self, org_name, progress_callback=None):
         """Fetch repositories for an organization."""
         try:
@@ -181,15 +574,20 @@ class ContentFetcher:
             dict: A dictionary of GitHub repository instructions
         """
         try:
-            # Import LLMClient for AI guidance
-            from utils.llm_client import LLMClient
-            
-            # Initialize LLM client
-            llm_client = LLMClient()
-            
-            # Get instructions
-            logger.info(f"Getting AI guidance for repository: {repo_url}")
-            instructions = llm_client.generate_github_instructions(user_input, repo_url)
+            # Reuse guidance saved by earlier runs before paying for an LLM call
+            cache_file = self.repo_fetcher.cache_dir / "llm_instructions.json"
+            disk_key = json.dumps([user_input, repo_url])
+            disk_cache = self._load_instructions_cache(cache_file)
+            if disk_key in disk_cache:
+                logger.info(f"Using cached AI guidance for repository: {repo_url}")
+                return disk_cache[disk_key]
+
+            token_hash = hashlib.sha256((self.github_token or "").encode()).hexdigest()
+            instructions = _get_github_instructions_cached(token_hash, user_input, repo_url)
+            # Hand out a copy so callers cannot mutate the memoised result
+            instructions = copy.deepcopy(instructions)
+
+            self._store_instructions_cache(cache_file, disk_key, instructions)
             
             logger.info(f"Received AI guidance with {len(instructions.get('file_patterns', []))} file patterns")
             return instructions
@@ -207,6 +605,39 @@ class ContentFetcher:
                 "priority_content": []
             }
 
+    @staticmethod
+    def _load_instructions_cache(cache_file):
+        """Read the on-disk AI guidance cache, treating a missing or corrupt file as empty."""
+        with _instructions_cache_lock:
+            try:
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                return data if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                return {}
+
+    @staticmethod
+    def _store_instructions_cache(cache_file, key, instructions):
+        """Add one entry to the on-disk AI guidance cache."""
+        with _instructions_cache_lock:
+            try:
+                try:
+                    with open(cache_file, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    if not isinstance(data, dict):
+                        data = {}
+                except (OSError, ValueError):
+                    data = {}
+                data[key] = instructions
+
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = cache_file.with_suffix(".tmp")
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_file, cache_file)
+            except (OSError, TypeError) as e:
+                logger.warning(f"Could not save AI guidance cache: {e}")
+
     def fetch_single_repository(self, repo_url, progress_callback=None, max_files=None, user_instructions=None, use_ai_guidance=False, _cancellation_event=None):
         """Fetch a single repository or all repositories from an organization.
         
@@ -242,9 +673,9 @@ class ContentFetcher:
         try:
             # Check if this is an organization URL by examining the pattern
             is_org_url = False
-            match = re.match(r"https?://github\.com/([^/]+)/?$", repo_url)
+            match = _GH_ORG_URL_RE.match(repo_url)
             # Validate organization name if matched
-            if match and not re.match(r"^[\w.-]+$", match.group(1)):
+            if match and not _GH_NAME_RE.match(match.group(1)):
                 raise ValueError(f"Invalid GitHub organization name in URL: {repo_url}")
                 
             if match:
@@ -390,7 +821,9 @@ class ContentFetcher:
                 return repo_info
                 
             # Extract relevant files from repo
-            owner, repo_name = repo_info["full_name"].split("/")
+            # Prefer the separate owner/name fields; full_name is only a fallback
+            owner = (repo_info.get("owner") or {}).get("login") or repo_info["full_name"].split("/", 1)[0]
+            repo_name = repo_info.get("name") or repo_info["full_name"].split("/", 1)[1]
             branch = repo_info["default_branch"]
             
             # Fetch actual file content rather than just repo metadata
@@ -413,7 +846,7 @@ class ContentFetcher:
             return file_content
         except Exception as e:
             # Check if this is an organization URL
-            is_org_url = bool(re.match(r"https?://github\.com/([^/]+)/?$", repo_url))
+            is_org_url = bool(_GH_ORG_URL_RE.match(repo_url))
             if is_org_url:
                 logger.error(f"Failed to fetch organization repositories from {repo_url}: {e}")
                 if progress_callback:
@@ -424,69 +857,102 @@ class ContentFetcher:
                     progress_callback(100, f"Error: {str(e)}")
             raise
 
-    def _start_status_display(self, task_id=None):
+    def _start_status_display(self, task_id=None, download_queue=None):
         """
         Start a background thread to display download status in the console.
         
         Args:
             task_id (str, optional): Task ID for tracking
+            download_queue (DownloadQueue, optional): Queue to watch; defaults to
+                the repository fetcher's queue
         """
         self.stop_status_display.clear()
+        self._status_queue = download_queue
         self.status_thread = threading.Thread(
             target=self._status_display_thread,
-            args=(task_id,),
+            args=(task_id, download_queue),
             daemon=True
         )
         self.status_thread.start()
         
-    def _status_display_thread(self, task_id=None):
+    def _status_display_thread(self, task_id=None, download_queue=None):
         """
-        Background thread that periodically updates the console with download status.
+        Background thread that updates the console whenever download status changes.
+        
+        The thread blocks on the download queue's ``status_changed`` event instead of
+        polling, and prints at most every 0.5 seconds to coalesce bursts of updates.
+        The console line is only drawn when stdout is a terminal, so redirected
+        output and container logs are left alone.
         
         Args:
             task_id (str, optional): Task ID for tracking
+            download_queue (DownloadQueue, optional): Queue to watch
         """
+        interactive = bool(getattr(sys.stdout, "isatty", None) and sys.stdout.isatty())
         try:
             while not self.stop_status_display.is_set():
-                if self.repo_fetcher and hasattr(self.repo_fetcher, 'download_queue'):
-                    # Get current status from the download queue
-                    status_message = self.repo_fetcher.download_queue.get_status_message()
+                if download_queue is None:
+                    download_queue = getattr(self.repo_fetcher, "download_queue", None)
+                if download_queue is None:
+                    break
+                
+                # Sleep until the queue reports a change (or we are asked to stop)
+                download_queue.status_changed.wait()
+                download_queue.status_changed.clear()
+                if self.stop_status_display.is_set():
+                    break
+                
+                # Get current status from the download queue
+                status_message = download_queue.get_status_message()
+                
+                if status_message != self.current_status:
+                    # Only print status when it changes to reduce console spam
+                    self.current_status = status_message
                     
-                    if status_message != self.current_status:
-                        # Only print status when it changes to reduce console spam
-                        self.current_status = status_message
-                        
-                        # Clear the line and print the updated status
-                        print(f"\r{' ' * 100}", end="\r")  # Clear the line
-                        print(f"\r{status_message}", end="", flush=True)
-                        
-                        # Update task tracker if we have a task ID
-                        if task_id:
-                            progress = self.repo_fetcher.download_queue.get_progress()
-                            self.task_tracker.update_task_progress(
-                                task_id,
-                                progress["percent"],
-                                stage="downloading",
-                                stage_progress=progress["percent"]
-                            )
+                    # Erase the line and print the updated status
+                    if interactive:
+                        sys.stdout.write(f"\r\x1b[2K{status_message}")
+                        sys.stdout.flush()
+                    
+                    # Update task tracker if we have a task ID
+                    if task_id:
+                        progress = download_queue.get_progress()
+                        self._maybe_update_task(
+                            task_id,
+                            progress["percent"],
+                            stage="downloading_files",
+                            stage_progress=progress["percent"]
+                        )
                 
-                # Sleep briefly before next update
-                time.sleep(0.5)
+                # Rate-limit console updates; returns early when stopping
+                self.stop_status_display.wait(0.5)
                 
         except Exception as e:
             logger.error(f"Error in status display thread: {e}")
         finally:
             # Clear the line before exiting
-            print(f"\r{' ' * 100}", end="\r")
+            if interactive:
+                sys.stdout.write("\r\x1b[2K")
+                sys.stdout.flush()
             
     def _stop_status_display(self):
-        """Stop the status display thread."""
+        """
+        Stop the status display thread and flush queued task updates.
+        
+        Safe to call more than once; calls after the first return immediately.
+        """
+        if self.stop_status_display.is_set():
+            return
+        self.stop_status_display.set()
         if self.status_thread and self.status_thread.is_alive():
-            self.stop_status_display.set()
-            self.status_thread.join(timeout=1.0)
-            
-            # Print a newline to ensure next output starts on a clean line
-            print()
+            # Wake the thread if it is waiting for a status change
+            download_queue = self._status_queue or getattr(self.repo_fetcher, "download_queue", None)
+            if download_queue is not None:
+                download_queue.status_changed.set()
+            # The daemon thread exits on its own once woken; don't hold up the caller
+            self.status_thread.join(timeout=0.05)
+        # Make sure the final progress/status write has landed before returning to the caller
+        self._tracker_writer.flush()
 
     def fetch_content_for_dataset(self, repo_data, branch=None, progress_callback=None, _cancellation_event=None):
         """
@@ -503,7 +969,7 @@ class ContentFetcher:
         """
         if isinstance(repo_data, str):
             # Check if this is an organization URL
-            org_match = re.match(r"https?://github\.com/([^/]+)/?$", repo_data)
+            org_match = _GH_ORG_URL_RE.match(repo_data)
             if org_match:
                 # This is an organization URL - fetch all repositories
                 org_name = org_match.group(1)
@@ -520,11 +986,10 @@ class ContentFetcher:
                 return content_files
                 
             # Handle single repository URL
-            match = re.match(r"https?://github\.com/([^/]+)/([^/]+)", repo_data)
+            match = _GH_REPO_URL_RE.match(repo_data)
             if not match:
                 raise ValueError(f"Invalid GitHub repository URL: {repo_data}")
-            owner, repo = match.groups()
-            repo = repo.rstrip(".git")
+            owner, repo = match.group(1), match.group(2)
         else:
             # Handle repository dict from API
             owner = repo_data["owner"]["login"]
@@ -549,7 +1014,7 @@ class ContentFetcher:
             # Check for early cancellation
             if _cancellation_event and _cancellation_event.is_set():
                 logger.info(f"Operation cancelled before starting fetch for {owner}/{repo}")
-                self.task_tracker.cancel_task(task_id)
+                self._cancel_task(task_id)
                 return []
             
             # Initialize progress at 10% to show activity
@@ -563,7 +1028,7 @@ class ContentFetcher:
             # Check for cancellation after content fetch
             if _cancellation_event and _cancellation_event.is_set():
                 logger.info(f"Operation cancelled after content fetch for {owner}/{repo}")
-                self.task_tracker.cancel_task(task_id)
+                self._cancel_task(task_id)
                 return []
 
             if progress_callback:
@@ -578,7 +1043,7 @@ class ContentFetcher:
                 progress_callback(100)
                 
             # Complete the task
-            self.task_tracker.complete_task(
+            self._complete_task(
                 task_id, 
                 success=True,
                 result={"files_count": len(content_files)}
@@ -590,7 +1055,7 @@ class ContentFetcher:
             
             # Update task if we have one
             if task_id:
-                self.task_tracker.complete_task(
+                self._complete_task(
                     task_id,
                     success=False,
                     result={"error": str(e)}
@@ -601,10 +1066,13 @@ class ContentFetcher:
                 progress_callback(-1)  # Use negative value to indicate error
             raise
         finally:
-            # Always stop the status display
-            self._stop_status_display()
+            # Always stop the status display, without masking the exception in flight
+            try:
+                self._stop_status_display()
+            except Exception as e:
+                logger.error("Error stopping status display: %s", e)
 
-    def fetch_multiple_repositories(self, org_name, progress_callback=None, _cancellation_event=None):
+    def fetch_multiple_repositories(self, org_name, progress_callback=None, _cancellation_event=None, sink=None):
         """
         Fetch content from multiple repositories in an organization.
         
@@ -612,9 +1080,12 @@ class ContentFetcher:
             org_name: Name of the organization
             progress_callback: Function to call with progress updates
             _cancellation_event: Event that can be set to cancel the operation
+            sink: Optional callable receiving each downloaded file as it lands, instead of
+                collecting them in the returned list. Called from download worker
+                threads, one call at a time.
             
         Returns:
-            List of content files
+            List of content files (empty when ``sink`` is given)
             
         Raises:
             ValueError: If org_name is invalid
@@ -625,11 +1096,14 @@ class ContentFetcher:
             raise ValueError(f"Organization name must be a non-empty string, got: {org_name}")
         
         # Regular expression to validate organization name format
-        if not re.match(r'^[\w.-]+$', org_name):
+        if not _GH_NAME_RE.match(org_name):
             raise ValueError(f"Invalid organization name format: {org_name}")
             
         task_id = None
-        executor = None
+        stop_download_workers = None
+        # Long-lived pool shared by the repository scans
+        executor = get_executor()
+        _rearm_shutdown_flag()
         
         try:
             # Create task for tracking
@@ -644,12 +1118,13 @@ class ContentFetcher:
             # 20-90%: Download and process files
             # 90-100%: Final processing
 
-            # Start status display
-            self._start_status_display(task_id)
+            # Each call gets its own queue so overlapping fetches keep separate counters and files
+            download_queue = DownloadQueue()
+            self._start_status_display(task_id, download_queue)
             
             # Update task status
-            self.task_tracker.update_task_progress(
-                task_id, 
+            self._maybe_update_task(
+                task_id,
                 5, 
                 stage="scanning_repositories",
                 stage_progress=5
@@ -657,302 +1132,330 @@ class ContentFetcher:
             
             # Check for cancellation
             if _cancellation_event and _cancellation_event.is_set():
-                self.task_tracker.cancel_task(task_id)
+                self._cancel_task(task_id)
                 return []
 
-            # Phase 1: Fetch all repositories in the organization
-            repos = self.fetch_org_repositories(org_name, progress_callback)
+            # Phase 1 + 2: Page through the organization's repositories and scan each page
+            # as soon as it arrives, so scanning overlaps with pagination. Relevant files
+            # are queued for download in the same pass.
+            repos_found = 0
+            repos_scanned = 0
+            total_relevant_files = 0
+            max_scans_in_flight = 50  # Back-pressure on pagination when scans fall behind
             
-            # Check for cancellation after repository fetch
-            if _cancellation_event and _cancellation_event.is_set():
-                logger.info("Operation cancelled during repository fetch")
-                self.task_tracker.cancel_task(task_id)
-                return []
-
-            if not repos:
-                logger.warning(f"No repositories found for organization {org_name}")
-                if progress_callback:
-                    progress_callback(70)  # Skip to the end of this stage
-                self.task_tracker.complete_task(
-                    task_id,
-                    success=True,
-                    result={"files_count": 0, "message": "No repositories found"}
-                )
-                return []
-
-            logger.info(f"Found {len(repos)} repositories in {org_name}")
-            logger.debug(f"Repository names: {[repo['name'] for repo in repos[:5]]}...")
-
-            if progress_callback:
-                logger.debug("Updating progress to 10% after finding repositories")
-                progress_callback(10)
-                
-            self.task_tracker.update_task_progress(
-                task_id,
-                10,
-                stage="scanning_repositories",
-                stage_progress=50
-            )
-
-            # Phase 2: Scan all repositories to identify relevant files first
-            scan_results = []
+            # Phase 3: Download workers start now and take files as soon as each repository
+            # has been scanned, so downloading overlaps with scanning. The bounded queue
+            # holds back scan collection when downloads fall behind.
+            all_content = []
+            deliver = sink if sink is not None else all_content.append
+            downloaded_count = 0
             
-            try:
-                # Function to scan a single repository
-                def scan_repository_structure(repo):
+            results_lock = threading.Lock()
+            progress_changed = threading.Event()
+            work = queue.Queue(maxsize=GITHUB_DOWNLOAD_QUEUE_SIZE)
+            
+            def notify_progress():
+                # The reporter reads the counters at its own pace, so completions only need
+                # to wake it once; skip the Event's lock while a wake-up is still pending.
+                # Counters are updated before this check, so the pending pass sees them.
+                if not progress_changed.is_set():
+                    progress_changed.set()
+            
+            def download_worker():
+                nonlocal downloaded_count
+                while True:
+                    file_item = work.get()
                     try:
-                        owner = repo["owner"]["login"]
-                        repo_name = repo["name"]
-                        branch = repo.get("default_branch")
-                        
-                        logger.debug(f"Scanning repository structure: {owner}/{repo_name}")
-                        
-                        # Scan repository structure without downloading files
-                        scan_result = self.github_client.scan_repository_structure(
-                            owner, repo_name, branch
+                        if file_item is _DOWNLOAD_WORKER_SENTINEL:
+                            return
+                        # Drain without downloading once cancelled or shutting down
+                        if (
+                            _cancellation_event and _cancellation_event.is_set()
+                        ) or _shutdown_event.is_set():
+                            continue
+                        result = self.repo_fetcher._download_single_file(
+                            file_item.owner,
+                            file_item.repo,
+                            file_item.path,
+                            file_item.branch,
+                            file_item.local_path,
+                            file_item.url or None,
+                            file_item.sha
                         )
-                        
-                        return {
-                            "owner": owner,
-                            "repo": repo_name,
-                            "branch": branch,
-                            "scan_result": scan_result
-                        }
+                        with results_lock:
+                            if result:
+                                deliver(result)
+                                downloaded_count += 1
+                            download_queue.mark_processed()
+                        notify_progress()
                     except Exception as e:
-                        logger.error(f"Error scanning repository {repo['name']}: {e}")
-                        return None
-                
-                # Process repositories in batches to avoid overwhelming the API
-                batch_size = min(5, len(repos))
-                for i in range(0, len(repos), batch_size):
-                    # Check for cancellation before processing each batch
-                    if _cancellation_event and _cancellation_event.is_set():
-                        logger.info("Operation cancelled during repository scanning")
-                        self.task_tracker.cancel_task(task_id)
-                        return []
-                        
-                    batch = repos[i:i+batch_size]
-                    logger.debug(f"Scanning batch {i//batch_size + 1}: {[r['name'] for r in batch]}")
-                    
-                    # Use direct threading for better control with proper resource management
-                    local_executor = get_executor()
-                    futures = []
+                        logger.error("Error downloading file: %s", e)
+                        with results_lock:
+                            download_queue.mark_processed()
+                        notify_progress()
+                    finally:
+                        work.task_done()
+            
+            # Each worker starts its next download as soon as one finishes, so a
+            # window of GITHUB_DOWNLOAD_CONCURRENCY requests stays in flight. The
+            # workers run on the shared download pool, whose threads outlive this call.
+            download_executor = get_download_executor()
+            workers = [
+                download_executor.submit(download_worker)
+                for _ in range(GITHUB_DOWNLOAD_CONCURRENCY)
+            ]
+            
+            def stop_workers():
+                nonlocal workers_stopped
+                if not workers_stopped:
+                    workers_stopped = True
+                    for _ in workers:
+                        work.put(_DOWNLOAD_WORKER_SENTINEL)
+            
+            workers_stopped = False
+            # Early returns and errors below still have to release the workers
+            stop_download_workers = stop_workers
+            
+            # Function to scan a single repository and identify the files to download.
+            # The tree is dropped as soon as its file list has been extracted.
+            def scan_repository_structure(repo):
+                try:
+                    owner = repo["owner"]["login"]
+                    repo_name = repo["name"]
+                    branch = repo.get("default_branch")
                     
-                    try:
-                        # Submit all tasks
-                        futures = [local_executor.submit(scan_repository_structure, repo) for repo in batch]
-                        
-                        # Collect results
-                        for future in futures:
-                            try:
-                                # Check for cancellation during future processing
-                                if _cancellation_event and _cancellation_event.is_set():
-                                    logger.info("Operation cancelled during repository scanning futures")
-                                    self.task_tracker.cancel_task(task_id)
-                                    return []
-                                    
-                                result = future.result(timeout=300)  # 5-minute timeout
-                                if result:
-                                    scan_results.append(result)
-                            except Exception as e:
-                                logger.error(f"Error in scan batch processing: {e}")
-                    except Exception as e:
-                        logger.error(f"Error during executor processing: {e}")
-                        if _cancellation_event:
-                            _cancellation_event.set()
-                        raise
+                    logger.debug("Scanning repository structure: %s/%s", owner, repo_name)
                     
-                    # Update progress (10-20%)
-                    if progress_callback:
-                        scan_progress = 10 + 10 * min((i + batch_size) / len(repos), 1.0)
-                        progress_callback(scan_progress)
-                        
-                    # Update task status
-                    self.task_tracker.update_task_progress(
-                        task_id,
-                        scan_progress,
-                        stage="scanning_repositories",
-                        stage_progress=min(100, (i + batch_size) / len(repos) * 100)
+                    # One recursive tree listing per repository (contents walk as fallback)
+                    structure = self.github_client.scan_repository_structure(
+                        owner, repo_name, branch
                     )
                     
-                # Log overall scan results
-                total_relevant_files = sum(
-                    r["scan_result"]["relevant_files"] for r in scan_results if r and "scan_result" in r
-                )
-                logger.info(
-                    f"Completed scanning {len(scan_results)} repositories. "
-                    f"Found {total_relevant_files} relevant files."
-                )
-                
-                # Update task status for download phase
-                self.task_tracker.update_task_progress(
-                    task_id,
-                    20,
-                    stage="downloading_files",
-                    stage_progress=0
-                )
-                
-                # Phase 3: Build a global download queue from scan results
-                download_queue = self.repo_fetcher.download_queue
-                download_queue.reset()
-                
-                # Identify all files to download
-                all_files_to_download = []
-                
-                for scan_result in scan_results:
-                    if not scan_result or "scan_result" not in scan_result:
-                        continue
-                        
-                    owner = scan_result["owner"]
-                    repo_name = scan_result["repo"]
-                    branch = scan_result["branch"]
-                    structure = scan_result["scan_result"]
-                    
-                    # Create repository cache directory
                     repo_cache_dir = self.repo_fetcher.cache_dir / owner / repo_name
-                    repo_cache_dir.mkdir(parents=True, exist_ok=True)
                     
-                    # Add files from all relevant paths in this repository
+                    # Collect files from all relevant paths in this repository
+                    files = []
                     for path in structure.get("relevant_paths", []):
-                        files = self.repo_fetcher._identify_files_to_download(
+                        files.extend(self.repo_fetcher._identify_files_to_download(
                             structure, path, owner, repo_name, branch, repo_cache_dir
-                        )
-                        all_files_to_download.extend(files)
-                
-                # Add all files to the global download queue
-                if all_files_to_download:
-                    download_queue.add_files(all_files_to_download)
-                    logger.info(f"Added {len(all_files_to_download)} files to download queue")
-                else:
-                    logger.warning("No files identified for download")
+                        ))
                     
-                # Phase 4: Download all queued files
-                if download_queue.total_files > 0:
-                    all_content = []
+                    # Create the target directories here, once each, so the download
+                    # workers never wait on mkdir
+                    for directory in {os.path.dirname(item.local_path) for item in files}:
+                        self.repo_fetcher._ensure_dir(directory)
                     
-                    # Process files in small batches for better progress display
-                    batch_size = 5
-                    while not download_queue.is_empty():
-                        # Check for cancellation before each batch
-                        if _cancellation_event and _cancellation_event.is_set():
-                            logger.info("Operation cancelled during file download")
-                            self.task_tracker.cancel_task(task_id)
-                            return []
-                            
-                        batch = []
-                        for _ in range(min(batch_size, len(download_queue.queue))):
-                            file_item = download_queue.get_next_file()
-                            if file_item:
-                                batch.append(file_item)
-                                
-                        # Download this batch with proper resource management
-                        download_executor = None
-                        futures = []
-                        try:
-                            with ThreadPoolExecutor(max_workers=3) as download_executor:
-                                # Submit all download tasks first
-                                for file_item in batch:
-                                    futures.append(download_executor.submit(
-                                        self.repo_fetcher._download_single_file,
-                                        file_item["owner"],
-                                        file_item["repo"],
-                                        file_item["path"],
-                                        file_item["branch"],
-                                        file_item["local_path"]
-                                    ))
-                                
-                                # Process results separately for better error handling
-                                for future in futures:
-                                    # Check for cancellation during future processing
-                                    if _cancellation_event and _cancellation_event.is_set():
-                                        logger.info("Operation cancelled during file download futures")
-                                        self.task_tracker.cancel_task(task_id)
-                                        return []
-                                        
-                                    try:
-                                        result = future.result(timeout=300)  # 5-minute timeout
-                                        if result:
-                                            all_content.append(result)
-                                        download_queue.mark_processed()
-                                    except Exception as e:
-                                        logger.error(f"Error downloading file: {e}")
-                                        download_queue.mark_processed()
-                        except Exception as e:
-                            logger.error(f"Error in download executor: {e}")
-                            if _cancellation_event:
-                                _cancellation_event.set()
-                            if download_executor:
-                                download_executor.shutdown(wait=False)
-                            raise
-                        
-                        # Update progress (20-90%)
-                        progress_info = download_queue.get_progress()
-                        if progress_callback:
-                            download_progress = 20 + (progress_info["percent"] * 0.7)
-                            progress_callback(min(90, download_progress))
-                            
-                        # Update task status
-                        self.task_tracker.update_task_progress(
-                            task_id,
-                            min(90, download_progress),
-                            stage="downloading_files",
-                            stage_progress=progress_info["percent"]
+                    return {
+                        "owner": owner,
+                        "repo": repo_name,
+                        "relevant_files": structure.get("relevant_files", 0),
+                        "files": files
+                    }
+                except Exception as e:
+                    logger.error("Error scanning repository %s: %s", repo['name'], e)
+                    return None
+            
+            def collect_scan(future):
+                nonlocal repos_scanned, total_relevant_files
+                try:
+                    result = future.result(timeout=0)
+                    if result:
+                        repos_scanned += 1
+                        total_relevant_files += result["relevant_files"]
+                        if result["files"]:
+                            download_queue.add_files(result["files"])
+                            # Hand the flat list over in one go rather than popping
+                            # the queue's head once per file
+                            for file_item in download_queue.take_all():
+                                work.put(file_item)
+                except Exception as e:
+                    logger.error("Error in scan batch processing: %s", e)
+            
+            scans_in_flight = set()
+            try:
+                for repos_page in self.iter_organization_repositories(
+                    org_name, _cancellation_event=_cancellation_event
+                ):
+                    repos_found += len(repos_page)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Scanning page of %d repositories: %s...",
+                                     len(repos_page), [r['name'] for r in repos_page[:5]])
+                    
+                    if _shutdown_event.is_set():
+                        break
+                    for repo in repos_page:
+                        key = (repo["owner"]["login"], repo["name"], repo.get("default_branch"))
+                        scans_in_flight.add(
+                            self._submit_scan(executor, key, scan_repository_structure, repo)
                         )
-                        
-                    # Complete progress
-                    if progress_callback:
-                        progress_callback(90)
-                        
-                    logger.info(f"Downloaded {len(all_content)} files from {len(scan_results)} repositories")
                     
-                    # Update task status for completion
-                    self.task_tracker.update_task_progress(
-                        task_id,
-                        100,
-                        stage="complete",
-                        stage_progress=100,
-                        status="completed"
-                    )
+                    # Harvest finished scans, blocking only while too many are outstanding
+                    done, scans_in_flight = wait(scans_in_flight, timeout=0)
+                    while len(scans_in_flight) > max_scans_in_flight and not (
+                        (_cancellation_event and _cancellation_event.is_set())
+                        or _shutdown_event.is_set()
+                    ):
+                        more_done, scans_in_flight = wait(
+                            scans_in_flight, return_when=FIRST_COMPLETED
+                        )
+                        done |= more_done
+                    for future in done:
+                        collect_scan(future)
                     
-                    return all_content
-                else:
-                    # No files to download
-                    logger.warning("No files to download in any repositories")
+                    # Update progress (10-20%) against the repositories seen so far
+                    scan_fraction = repos_scanned / max(1, repos_found)
+                    scan_progress = 10 + 10 * scan_fraction
                     if progress_callback:
-                        progress_callback(90)
-                        
-                    # Complete task
-                    self.task_tracker.complete_task(
+                        progress_callback(scan_progress)
+                    self._maybe_update_task(
                         task_id,
-                        success=True,
-                        result={"files_count": 0, "message": "No relevant files found"}
+                        scan_progress,
+                        stage="scanning_repositories",
+                        stage_progress=scan_fraction * 100
                     )
+                
+                # Pagination finished; wait for the remaining scans (5-minute budget)
+                for future in _iter_completed(scans_in_flight, _cancellation_event):
+                    collect_scan(future)
+            except Exception as e:
+                logger.error("Error during executor processing: %s", e)
+                for future in scans_in_flight:
+                    future.cancel()
+                if _cancellation_event:
+                    _cancellation_event.set()
+                raise
+            
+            # Every file is queued; workers exit once the queue is drained
+            stop_workers()
+            
+            if _shutdown_event.is_set():
+                logger.warning("Interpreter is shutting down. Stopping processing early.")
+                self._cancel_task(task_id)
+                return []
+            
+            # Check for cancellation during pagination or scanning
+            if _cancellation_event and _cancellation_event.is_set():
+                logger.info("Operation cancelled during repository scanning")
+                self._cancel_task(task_id)
+                return []
+            
+            if not repos_found:
+                logger.warning("No repositories found for organization %s", org_name)
+                self._finish_task(
+                    task_id,
+                    progress_callback,
+                    {"files_count": 0, "message": "No repositories found"}
+                )
+                return []
+            
+            logger.info("Found %d repositories in %s", repos_found, org_name)
+            if progress_callback:
+                progress_callback(20)
+                
+            # Log overall scan results
+            logger.info(
+                "Completed scanning %d repositories. Found %d relevant files.",
+                repos_scanned, total_relevant_files
+            )
+            
+            # Update task status for download phase
+            self._maybe_update_task(
+                task_id,
+                20,
+                stage="downloading_files",
+                stage_progress=0
+            )
+            
+            if download_queue.total_files > 0:
+                logger.info("Added %d files to download queue", download_queue.total_files)
+            else:
+                logger.warning("No files identified for download")
+            
+            last_callback_progress = -1
+            
+            def report_download_progress():
+                nonlocal last_callback_progress
+                # Update progress (20-90%) in whole percents straight from the counters;
+                # get_progress() also builds ETA/history data we don't need here
+                pct = (download_queue.processed_files * 100) // max(1, download_queue.total_files)
+                download_progress = 20 + (pct * 7) // 10
+                if download_progress > 90:
+                    download_progress = 90
+                # Forward changes only; completions arrive far more often
+                if progress_callback and download_progress != last_callback_progress:
+                    last_callback_progress = download_progress
+                    progress_callback(download_progress)
                     
-                    return []
-                    
-            except RuntimeError as e:
-                if "cannot schedule new futures" in str(e):
-                    logger.warning("Interpreter is shutting down. Stopping processing early.")
-                    self.task_tracker.cancel_task(task_id)
-                else:
-                    raise
-                    
-        except Exception as e:
+                # Update task status (coalesced by _maybe_update_task)
+                self._maybe_update_task(
+                    task_id,
+                    download_progress,
+                    stage="downloading_files",
+                    stage_progress=pct
+                )
+            
+            # Phase 4: Report progress as the remaining downloads complete
+            while not all(worker.done() for worker in workers):
+                if progress_changed.wait(timeout=0.5):
+                    progress_changed.clear()
+                    report_download_progress()
+            work.join()
+            
+            if _shutdown_event.is_set():
+                logger.warning("Interpreter is shutting down. Stopping processing early.")
+                self._cancel_task(task_id)
+                return []
+            
+            # Check for cancellation while downloads were in flight
+            if _cancellation_event and _cancellation_event.is_set():
+                logger.info("Operation cancelled during file download")
+                self._cancel_task(task_id)
+                return []
+            
+            if download_queue.total_files > 0:
+                logger.info("Downloaded %d files from %d repositories", downloaded_count, repos_scanned)
+                result = {"files_count": downloaded_count}
+            else:
+                # No files to download
+                logger.warning("No files to download in any repositories")
+                result = {"files_count": 0, "message": "No relevant files found"}
+            
+            self._finish_task(task_id, progress_callback, result)
+            # Empty when nothing was downloaded or when results went to the sink
+            return all_content
+                
+        except (GitHubAPIError, requests.RequestException, OSError, TimeoutError) as e:
+            # Operational failures (API, network, filesystem) fail the task
             logger.error(
-                f"Failed to fetch multiple repositories for {org_name}: {e}",
+                "Failed to fetch multiple repositories for %s: %s",
+                org_name, e,
                 exc_info=True,
             )
             
             # Complete task as failed
             if task_id:
-                self.task_tracker.complete_task(
+                self._complete_task(
                     task_id,
                     success=False,
                     result={"error": str(e)}
                 )
                 
             raise
+        except Exception:
+            # Anything else is a bug, not a failed fetch; leave the task record alone
+            logger.error(
+                "Unexpected error while fetching repositories for %s",
+                org_name,
+                exc_info=True,
+            )
+            raise
             
         finally:
-            # Always stop the status display
-            self._stop_status_display()
\ No newline at end of file
+            # Release any download workers still waiting for files
+            if stop_download_workers:
+                stop_download_workers()
+            # Always stop the status display, without masking the exception in flight
+            try:
+                self._stop_status_display()
+            except Exception as e:
+                logger.error("Error stopping status display: %s", e)
\ No newline at end of file
@@ -0,0 +1,163 @@
+import logging
+import sys
+from pathlib import Path
+# Ensure local import takes precedence over any installed packages
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config.settings import GITHUB_GRAPHQL_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def build_organization_repositories_query():
+    """
+    Build the query that lists an organization's repositories.
+
+    Only repository metadata is selected; file trees are fetched per repository
+    with one recursive git tree request when a repository is actually scanned.
+
+    Returns:
+        str: GraphQL query taking ``$org``, ``$first`` and ``$cursor`` variables
+    """
+    return (
+        "query($org: String!, $first: Int!, $cursor: String) {"
+        " organization(login: $org) {"
+        " repositories(first: $first, after: $cursor) {"
+        " totalCount"
+        " pageInfo { endCursor hasNextPage }"
+        " nodes { name nameWithOwner url description owner { login }"
+        " defaultBranchRef { name }"
+        " } } } }"
+    )
+
+
+ORGANIZATION_REPOSITORIES_QUERY = build_organization_repositories_query()
+
+
+def build_blob_texts_query(count):
+    """
+    Build a query that reads the text of ``count`` blobs from one repository.
+
+    Each blob is selected through an aliased ``object(expression: $eN)`` field, so
+    the expressions are passed as variables rather than spliced into the query.
+
+    Args:
+        count (int): Number of blobs
+
+    Returns:
+        str: GraphQL query taking ``$owner``, ``$name`` and ``$e0`` .. ``$e{count-1}``
+    """
+    declarations = "".join(f", $e{i}: String!" for i in range(count))
+    fields = " ".join(
+        f"f{i}: object(expression: $e{i}) {{ ... on Blob {{ text byteSize isBinary isTruncated }} }}"
+        for i in range(count)
+    )
+    return (
+        f"query($owner: String!, $name: String!{declarations}) {{"
+        f" repository(owner: $owner, name: $name) {{ {fields} }} }}"
+    )
+
+
+def fetch_blob_texts(client, owner, repo, branch, paths):
+    """
+    Read the text of several files of one repository branch in a single GraphQL request.
+
+    Args:
+        client (GitHubClient): Authenticated client
+        owner (str): Repository owner
+        repo (str): Repository name
+        branch (str): Branch to read from
+        paths (list): File paths in the repository
+
+    Returns:
+        list: Text of each file, in ``paths`` order; None for files that are
+        missing, binary, truncated by GitHub, or whose text does not re-encode
+        as UTF-8 to exactly ``byteSize`` bytes (fetch those as raw downloads)
+
+    Raises:
+        GitHubAPIError: If the request fails or the response contains errors
+    """
+    variables = {"owner": owner, "name": repo}
+    for i, path in enumerate(paths):
+        variables[f"e{i}"] = f"{branch}:{path}"
+    data = client.graphql(build_blob_texts_query(len(paths)), variables)
+
+    repository = data.get("repository") or {}
+    texts = []
+    for i in range(len(paths)):
+        blob = repository.get(f"f{i}") or {}
+        text = blob.get("text")
+        if blob.get("isBinary") or blob.get("isTruncated") or not isinstance(text, str):
+            text = None
+        elif len(text.encode("utf-8")) != blob.get("byteSize"):
+            # Not UTF-8 on disk (Latin-1, UTF-16, ...): writing the decoded text
+            # back would not reproduce the blob
+            text = None
+        texts.append(text)
+    return texts
+
+
+def paginate_graphql(client, query, variables, connection_path):
+    """
+    Follow ``pageInfo.endCursor`` / ``hasNextPage`` through a GraphQL connection.
+
+    Args:
+        client (GitHubClient): Client used to execute the query
+        query (str): GraphQL query accepting a ``$cursor`` variable
+        variables (dict): Variables for the query (``cursor`` is managed here)
+        connection_path (list): Keys leading from ``data`` to the connection object
+
+    Yields:
+        dict: Each page of the connection (``nodes``, ``pageInfo`` and any other selected fields)
+    """
+    cursor = None
+    while True:
+        data = client.graphql(query, dict(variables, cursor=cursor))
+
+        connection = data
+        for key in connection_path:
+            connection = (connection or {}).get(key)
+        if not connection:
+            return
+
+        yield connection
+
+        page_info = connection.get("pageInfo") or {}
+        if not page_info.get("hasNextPage"):
+            return
+        cursor = page_info.get("endCursor")
+
+
+def repository_node_to_rest(node):
+    """Convert a GraphQL repository node into the REST-style dict used elsewhere."""
+    default_branch = (node.get("defaultBranchRef") or {}).get("name")
+    return {
+        "name": node["name"],
+        "full_name": node.get("nameWithOwner"),
+        "owner": {"login": node["owner"]["login"]},
+        "html_url": node.get("url"),
+        "description": node.get("description"),
+        "default_branch": default_branch,
+    }
+
+
+def iter_organization_repositories(client, org_name, page_size=GITHUB_GRAPHQL_PAGE_SIZE):
+    """
+    Iterate over an organization's repositories via GraphQL.
+
+    Args:
+        client (GitHubClient): Authenticated client
+        org_name (str): Organization login
+        page_size (int): Repositories per page
+
+    Yields:
+        tuple: ``(total_count, [repo_dict, ...])`` per page
+    """
+    pages = paginate_graphql(
+        client,
+        ORGANIZATION_REPOSITORIES_QUERY,
+        {"org": org_name, "first": page_size},
+        ["organization", "repositories"],
+    )
+    for page in pages:
+        repos = [repository_node_to_rest(node) for node in page.get("nodes") or [] if node]
+        yield page.get("totalCount", 0), repos
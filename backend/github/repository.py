@@ -3,34 +3,184 @@ import os
 import time
 import logging
 import sys
+import shutil
+import sqlite3
+import fnmatch
+import bisect
+import functools
+import heapq
+import itertools
+import json
+import threading
+from collections import deque, namedtuple
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 # Ensure local import takes precedence over any installed packages
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from github.client import GitHubClient, GitHubAPIError
+from github.graphql_client import iter_organization_repositories, fetch_blob_texts
 from config.settings import (
     RELEVANT_FOLDERS,
     IGNORED_DIRS,
     TEXT_FILE_EXTENSIONS,
     MAX_FILE_SIZE_MB,
     GITHUB_DEFAULT_BRANCH,
+    GITHUB_DOWNLOAD_CONCURRENCY,
+    GITHUB_GRAPHQL_BLOB_BATCH,
+    GITHUB_GRAPHQL_BLOB_BATCH_BYTES,
+    GITHUB_GRAPHQL_BLOB_CONCURRENCY,
     CACHE_DIR,
 )
 
 logger = logging.getLogger(__name__)
 
+# GitHub URL patterns, compiled once at import
+_GH_ORG_URL_RE = re.compile(r"https?://github\.com/([^/]+)/?$")
+_GH_REPO_URL_RE = re.compile(r"https?://github\.com/([^/]+)/([^/]+?)(?:\.git)?(?:/|$)")
+
+# File filters, prepared once: str.endswith accepts a tuple and checks it in C
+_TEXT_FILE_SUFFIXES = tuple(ext.lower() for ext in TEXT_FILE_EXTENSIONS)
+_MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
+_IGNORED_DIR_NAMES = frozenset(IGNORED_DIRS)
+# Any relevant folder name appearing inside a (lower-cased) folder name, in one regex search
+_RELEVANT_FOLDER_RE = re.compile("|".join(re.escape(folder) for folder in RELEVANT_FOLDERS))
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_glob_patterns(patterns):
+    """Compile a tuple of (lower-cased) glob patterns into one alternation regex."""
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+@functools.lru_cache(maxsize=64)
+def _weighted_priority_keywords(priority_content):
+    """
+    Lower-cased priority keywords with their weights, earlier keywords weighing more.
+    
+    Returns:
+        tuple: (regex matching any keyword, tuple of (keyword, weight) pairs)
+    """
+    count = len(priority_content)
+    keywords = tuple((keyword.lower(), count - i) for i, keyword in enumerate(priority_content))
+    any_keyword = re.compile("|".join(re.escape(keyword) for keyword, _ in keywords))
+    return any_keyword, keywords
+
+
+# Folder and file names repeat heavily across a tree (docs, README.md, ...), so the
+# filters below are memoised per name and AI guidance settings.
+@functools.lru_cache(maxsize=4096)
+def _is_relevant_folder_name(folder_name, include_directories, exclude_directories):
+    """Folder relevance for ``RepositoryFetcher._is_relevant_folder``, memoised."""
+    folder_lower = folder_name.lower()
+    
+    # Always exclude specific directories, regardless of AI settings
+    if folder_lower in _IGNORED_DIR_NAMES:
+        return False
+        
+    # Check if this folder is in the AI-guided exclude list
+    if any(excluded_dir.lower() == folder_lower for excluded_dir in exclude_directories):
+        logger.debug(f"Excluding directory {folder_name} based on AI guidance")
+        return False
+        
+    # First, check if this folder is in the AI-guided include list (highest priority)
+    if any(included_dir.lower() == folder_lower for included_dir in include_directories):
+        logger.debug(f"Including directory {folder_name} based on AI guidance")
+        return True
+        
+    # Then check against the predefined list of relevant folders
+    return _RELEVANT_FOLDER_RE.search(folder_lower) is not None
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_text_file_name(filename, file_patterns, exclude_patterns):
+    """File selection for ``RepositoryFetcher._is_text_file``, memoised."""
+    filename_lower = filename.lower()
+    
+    # If we have AI-guided file patterns, apply them
+    if file_patterns or exclude_patterns:
+        # Check exclude patterns first (higher priority than include)
+        if exclude_patterns:
+            excluded = _compile_glob_patterns(tuple(pattern.lower() for pattern in exclude_patterns))
+            if excluded.match(filename_lower):
+                logger.debug(f"Excluding file {filename} based on AI guidance patterns")
+                return False
+        
+        # If we have include patterns, they override the default text check
+        if file_patterns:
+            included = _compile_glob_patterns(tuple(pattern.lower() for pattern in file_patterns))
+            return included.match(filename_lower) is not None
+    
+    # Fall back to basic text file check if no patterns match
+    return filename_lower.endswith(_TEXT_FILE_SUFFIXES)
+
+
+# Time remaining formatters for under a minute, under an hour and longer,
+# picked by bisecting on the band limits
+_DURATION_BANDS = (60, 3600)
+_DURATION_FORMATTERS = (
+    lambda seconds: f"{int(seconds)}s",
+    lambda seconds: f"{int(seconds / 60)}m {int(seconds % 60)}s",
+    lambda seconds: f"{int(seconds / 3600)}h {int((seconds % 3600) / 60)}m",
+)
+
+
+def _format_time_remaining(seconds):
+    """Format an estimated number of seconds as ``"42s"``, ``"3m 5s"`` or ``"1h 2m"``."""
+    if seconds == float('inf'):
+        return "Unknown"
+    return _DURATION_FORMATTERS[bisect.bisect_right(_DURATION_BANDS, seconds)](seconds)
+
+
+def _write_file_bytes(path, data):
+    """Write ``data`` to ``path`` with raw ``os.write`` calls, bypassing the io stack.
+    
+    Small files (the common case) take a single write syscall.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+# A file waiting in the download queue. A tuple is several times smaller than the
+# equivalent dict, which matters when an organization yields tens of thousands of files.
+FileItem = namedtuple(
+    "FileItem",
+    "owner repo path branch local_path sha name size url",
+    defaults=(None, None, 0, ""),
+)
+
 
 class DownloadQueue:
-    """Manages a queue of files to download with progress tracking."""
+    """Manages a queue of files to download with progress tracking.
+
+    The queue is owned by the thread coordinating a download: only it adds,
+    takes and marks files, while worker threads just perform the transfers.
+    Other threads (such as the console status display) only read progress,
+    which is computed from snapshots so no lock is needed. ``status_changed``
+    is set whenever progress changes so readers can block instead of polling.
+    """
+
+    # Sample the clock for the rate estimate once every this many processed files
+    HISTORY_SAMPLE_EVERY = 8
     
     def __init__(self):
         """Initialize an empty download queue."""
-        self.queue = []
+        self.queue = deque()
         self.total_files = 0
         self.processed_files = 0
         self.start_time = None
-        self.processing_history = []  # Track processing rate history
         self.history_window = 20  # Number of samples to keep for rate calculation
+        # Track processing rate history as (files processed, monotonic time) samples;
+        # the oldest sample drops off automatically
+        self.processing_history = deque(maxlen=self.history_window)
+        self._time_remaining = (None, "Calculating...")  # ((processed, total), formatted estimate)
+        self._status_message = (None, "")  # ((processed, total), get_status_message result)
+        self.status_changed = threading.Event()  # Set whenever progress changes
         
     def __repr__(self):
         """String representation for debugging."""
@@ -40,31 +190,44 @@ class DownloadQueue:
         """Add a file to the download queue."""
         self.queue.append(file_info)
         self.total_files += 1
+        self.status_changed.set()
         
     def add_files(self, file_list):
         """Add multiple files to the download queue."""
         self.queue.extend(file_list)
         self.total_files += len(file_list)
+        self.status_changed.set()
         
     def get_next_file(self):
         """Get the next file from the queue, or None if empty."""
         if not self.queue:
             return None
-        return self.queue.pop(0)
+        return self.queue.popleft()
         
-    def mark_processed(self):
-        """Mark a file as processed and update metrics."""
-        self.processed_files += 1
+    def get_batch(self, count):
+        """Remove and return up to ``count`` files from the front of the queue."""
+        return [self.queue.popleft() for _ in range(min(count, len(self.queue)))]
         
-        # Record processing rate for time estimation
-        current_time = time.time()
-        if not self.start_time:
-            self.start_time = current_time
-            
-        if len(self.processing_history) >= self.history_window:
-            self.processing_history.pop(0)  # Remove oldest entry
-            
-        self.processing_history.append(current_time)
+    def take_all(self):
+        """Remove and return every queued file at once, in queue order."""
+        files = list(self.queue)
+        self.queue.clear()
+        return files
+        
+    def mark_processed(self, count=1):
+        """Mark ``count`` files as processed and update metrics."""
+        before = self.processed_files
+        self.processed_files = before + count
+        
+        # Record processing rate for time estimation; the estimate only needs a
+        # trend, so the clock is sampled on the first file and then every few files
+        every = self.HISTORY_SAMPLE_EVERY
+        if not self.start_time or before // every != self.processed_files // every:
+            current_time = time.monotonic()
+            if not self.start_time:
+                self.start_time = current_time
+            self.processing_history.append((self.processed_files, current_time))
+        self.status_changed.set()
         
     def get_progress(self):
         """
@@ -84,41 +247,38 @@ class DownloadQueue:
                 "status": "No files to process"
             }
             
-        percent = (self.processed_files / self.total_files) * 100
-        files_remaining = self.total_files - self.processed_files
+        # Snapshot shared state once so readers on other threads see consistent values
+        processed_files = self.processed_files
+        history = tuple(self.processing_history)
+        
+        percent = (processed_files / self.total_files) * 100
+        files_remaining = self.total_files - processed_files
         
         # Calculate time elapsed
-        current_time = time.time()
+        current_time = time.monotonic()
         time_elapsed = 0 if not self.start_time else current_time - self.start_time
         
-        # Estimate time remaining
-        if len(self.processing_history) >= 2 and self.processed_files > 0:
+        # Estimate time remaining; it only changes when another file completes
+        cached_counts, time_remaining = self._time_remaining
+        if cached_counts == (processed_files, self.total_files):
+            pass
+        elif len(history) >= 2 and processed_files > 0:
             # Calculate processing rate based on recent history
-            first_time = self.processing_history[0]
-            last_time = self.processing_history[-1]
+            first_count, first_time = history[0]
+            last_count, last_time = history[-1]
             if last_time > first_time:  # Avoid division by zero
-                recent_rate = len(self.processing_history) / (last_time - first_time)  # files per second
+                recent_rate = (last_count - first_count) / (last_time - first_time)  # files per second
                 time_remaining_sec = files_remaining / recent_rate if recent_rate > 0 else float('inf')
-                
-                # Format time remaining
-                if time_remaining_sec == float('inf'):
-                    time_remaining = "Unknown"
-                elif time_remaining_sec < 60:
-                    time_remaining = f"{int(time_remaining_sec)}s"
-                elif time_remaining_sec < 3600:
-                    time_remaining = f"{int(time_remaining_sec / 60)}m {int(time_remaining_sec % 60)}s"
-                else:
-                    hours = int(time_remaining_sec / 3600)
-                    minutes = int((time_remaining_sec % 3600) / 60)
-                    time_remaining = f"{hours}h {minutes}m"
+                time_remaining = _format_time_remaining(time_remaining_sec)
             else:
                 time_remaining = "Calculating..."
         else:
             time_remaining = "Calculating..."
+        self._time_remaining = ((processed_files, self.total_files), time_remaining)
             
         return {
             "percent": percent,
-            "files_processed": self.processed_files,
+            "files_processed": processed_files,
             "files_total": self.total_files,
             "files_remaining": files_remaining,
             "time_elapsed": time_elapsed,
@@ -128,15 +288,24 @@ class DownloadQueue:
         
     def get_status_message(self):
         """Get a formatted status message for console display."""
+        # Everything in the message follows from the file counts, so reuse the last
+        # message until another file completes
+        counts = (self.processed_files, self.total_files)
+        cached_counts, message = self._status_message
+        if cached_counts == counts:
+            return message
+            
         progress = self.get_progress()
         
         if progress["files_total"] == 0:
-            return "No files to process"
-            
-        return (f"Downloading: {progress['files_total']} Files, "
-                f"{progress['percent']:.1f}% Complete "
-                f"({progress['files_processed']}/{progress['files_total']}) "
-                f"[{progress['time_remaining']} Remaining]")
+            message = "No files to process"
+        else:
+            message = (f"Downloading: {progress['files_total']} Files, "
+                       f"{progress['percent']:.1f}% Complete "
+                       f"({progress['files_processed']}/{progress['files_total']}) "
+                       f"[{progress['time_remaining']} Remaining]")
+        self._status_message = ((progress["files_processed"], progress["files_total"]), message)
+        return message
                 
     def is_empty(self):
         """Check if the queue is empty."""
@@ -144,11 +313,92 @@ class DownloadQueue:
         
     def reset(self):
         """Reset the queue and all metrics."""
-        self.queue = []
+        self.queue = deque()
         self.total_files = 0
         self.processed_files = 0
         self.start_time = None
-        self.processing_history = []
+        self.processing_history = deque(maxlen=self.history_window)
+        self._time_remaining = (None, "Calculating...")
+        self._status_message = (None, "")
+        self.status_changed.set()
+
+
+class BlobCache:
+    """
+    Persistent map from git blob SHA to a file already downloaded to disk.
+
+    Blob SHAs identify file content, so a file whose SHA is recorded here can be
+    reused (or copied) instead of fetched again on later runs. Backed by SQLite
+    in WAL mode so concurrent readers are not blocked by writes. The
+    connection is opened on first use and shared by the download threads.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS blobs(sha TEXT PRIMARY KEY, path TEXT, size INT, mtime REAL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, sha):
+        """
+        Look up a previously downloaded blob.
+
+        Args:
+            sha (str): Git blob SHA
+
+        Returns:
+            tuple: ``(path, size)`` if the file is still on disk unchanged, otherwise None
+        """
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT path, size FROM blobs WHERE sha=?", (sha,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Blob cache lookup failed: {e}")
+            return None
+
+        if row is None:
+            return None
+        path, size = row
+        try:
+            if os.path.getsize(path) != size:
+                return None
+        except OSError:
+            return None
+        return path, size
+
+    def put(self, sha, path, size):
+        """Record that ``path`` holds the blob ``sha``."""
+        try:
+            with self._lock:
+                conn = self._connect()
+                # The path no longer holds whatever blob was recorded for it before
+                conn.execute("DELETE FROM blobs WHERE path=? AND sha!=?", (str(path), sha))
+                conn.execute(
+                    "INSERT OR REPLACE INTO blobs VALUES(?,?,?,?)",
+                    (sha, str(path), size, time.time()),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Blob cache update failed: {e}")
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
 
 class RepositoryFetcher:
     """Handles fetching repositories and their contents from GitHub.
@@ -169,19 +419,32 @@ class RepositoryFetcher:
         priority_content (list): Keywords or patterns to prioritize
     """
 
-    def __init__(self, github_token=None, client=None):
+    def __init__(self, github_token=None, client=None, session=None):
         """Initialize the repository fetcher.
 
         Args:
             github_token (str, optional): GitHub token for authentication
             client (GitHubClient, optional): Existing GitHub client to use
+            session (requests.Session, optional): HTTP session for a newly created client
+                (defaults to the shared pooled session)
             
         Raises:
             GitHubAPIError: If there's an error authenticating with GitHub
         """
-        self.client = client if client is not None else GitHubClient(token=github_token)
+        self.client = client if client is not None else GitHubClient(token=github_token, session=session)
         self.cache_dir = CACHE_DIR
         self.download_queue = DownloadQueue()  # Initialize download queue
+        # Local directories known to exist, so per-file downloads skip the mkdir syscalls
+        self._created_dirs = set()
+        # Downloaded blobs by SHA; opened lazily under the (possibly reassigned) cache_dir
+        self._blob_cache = None
+        self._blob_cache_lock = threading.Lock()
+        # Blob SHAs being downloaded right now; other threads wanting the same blob wait
+        self._blob_inflight = {}
+        self._blob_inflight_lock = threading.Lock()
+        # Failed downloads, appended to one JSON-lines log under the cache_dir
+        self._error_log = None
+        self._error_log_lock = threading.Lock()
         
         # AI guidance settings (can be set by ContentFetcher before fetching)
         self.file_patterns = []       # List of glob patterns to prioritize
@@ -206,9 +469,36 @@ class RepositoryFetcher:
             logger.error(f"Error creating cache directory: {e}")
             # Continue anyway, we'll handle directory errors during operations
 
+    def iter_organization_repos_graphql(self, org_name):
+        """
+        Iterate over an organization's repositories page by page using GraphQL.
+
+        Args:
+            org_name (str): Organization name
+
+        Yields:
+            tuple: ``(total_count, repos_page)`` for each page
+
+        Raises:
+            GitHubAPIError: If the GraphQL API is unavailable or returns errors
+        """
+        yield from iter_organization_repositories(self.client, org_name)
+
     def fetch_organization_repos(self, org_name):
         """Fetch all repositories for an organization."""
         logger.info(f"Fetching repositories for organization: {org_name}")
+
+        # GraphQL returns the repository list in a handful of requests
+        if getattr(self.client, "token", None):
+            try:
+                repos = []
+                for _, repos_page in self.iter_organization_repos_graphql(org_name):
+                    repos.extend(repos_page)
+                logger.info(f"Found {len(repos)} repositories for {org_name} via GraphQL")
+                return repos
+            except GitHubAPIError as e:
+                logger.warning(f"GraphQL organization listing failed, falling back to REST: {e}")
+
         repos = []
         page = 1
 
@@ -229,19 +519,18 @@ class RepositoryFetcher:
     def fetch_single_repo(self, repo_url):
         """Fetch a single repository from its URL."""
         # Check if this is an organization URL (no second path part)
-        org_match = re.match(r"https?://github\.com/([^/]+)/?$", repo_url)
+        org_match = _GH_ORG_URL_RE.match(repo_url)
         if org_match:
             # This is an organization URL
             org_name = org_match.group(1)
             raise ValueError(f"Organization URL detected: {repo_url}. Use fetch_organization_repos instead")
             
         # Parse owner and repo from URL
-        match = re.match(r"https?://github\.com/([^/]+)/([^/]+)", repo_url)
+        match = _GH_REPO_URL_RE.match(repo_url)
         if not match:
             raise ValueError(f"Invalid GitHub repository URL: {repo_url}")
 
-        owner, repo = match.groups()
-        repo = repo.rstrip(".git")
+        owner, repo = match.group(1), match.group(2)
 
         logger.info(f"Fetching repository: {owner}/{repo}")
         return self.client.get_repository(owner, repo)
@@ -342,6 +631,13 @@ class RepositoryFetcher:
                 logger.warning(f"No relevant files found in {owner}/{repo}")
                 return []
                 
+            # Keep only the files that will actually be downloaded
+            all_file_items = self._limit_file_items(all_file_items, max_files)
+                
+            # Create each target directory once here, so the downloads skip mkdir
+            for directory in {os.path.dirname(item.local_path) for item in all_file_items}:
+                self._ensure_dir(directory)
+                
             # Add all files to the download queue
             self.download_queue.add_files(all_file_items)
             
@@ -354,184 +650,144 @@ class RepositoryFetcher:
             
         except GitHubAPIError as e:
             logger.error(f"Error scanning repository structure: {e}")
-            # Fall back to the original recursive approach if scanning fails
-            logger.warning("Falling back to direct recursive fetch")
-            return self._fetch_directory_content(
-                owner, repo, "", branch, repo_cache_dir, progress_callback, _cancellation_event
+            # Fall back to listing the whole tree in one request if scanning fails
+            logger.warning("Falling back to a recursive tree listing")
+            return self._fetch_tree_content(
+                owner, repo, branch, repo_cache_dir, progress_callback, _cancellation_event, max_files
             )
 
-    def _fetch_directory_content(
-        self, owner, repo, path, branch, base_dir, progress_callback=None, _cancellation_event=None
+    def _fetch_tree_content(
+        self, owner, repo, branch, base_dir, progress_callback=None, _cancellation_event=None, max_files=None
     ):
         """
-        Recursively fetch content from a directory with improved rate limiting.
+        Fetch relevant content using one recursive git tree listing.
+        
+        Files are selected from the flat tree the same way a structure scan selects
+        them: text files under a relevant folder and outside ignored directories.
+        They are then downloaded through the download queue.
         
         Args:
             owner: Repository owner
             repo: Repository name
-            path: Path to fetch
             branch: Branch to use
             base_dir: Base directory to save files
             progress_callback: Function to call with progress updates
             _cancellation_event: Event that can be set to cancel the operation
+            max_files: Maximum number of files to fetch (optional limit)
             
         Returns:
             List of file data
         """
         # Check for cancellation
         if _cancellation_event and _cancellation_event.is_set():
-            logger.info(f"Operation cancelled before fetching directory {path}")
+            logger.info(f"Operation cancelled before listing the tree of {owner}/{repo}")
             return []
             
         try:
-            contents = self.client.get_repository_contents(owner, repo, path, branch)
+            tree = self.client.get_tree(owner, repo, branch, recursive=True)
         except GitHubAPIError as e:
-            logger.error(f"Error fetching directory {path}: {e}")
+            logger.error(f"Error listing tree of {owner}/{repo}: {e}")
             return []
 
-        if not isinstance(contents, list):
-            logger.warning(f"Expected directory content but got a file: {path}")
-            return []
-
-        # Process this directory's contents
-        files_data = []
-        subdirs_to_process = []
+        if tree.get("truncated"):
+            logger.warning(f"Tree of {owner}/{repo} is too large to list completely; fetching the listed part")
 
-        # Indicate progress for this directory
-        if progress_callback and not path:  # Only for root directory
+        if progress_callback:
             progress_callback(20)
 
-        # Check for cancellation
-        if _cancellation_event and _cancellation_event.is_set():
-            logger.info(f"Operation cancelled after fetching directory list for {path}")
-            return []
-
-        for item in contents:
-            item_name = item["name"]
-            item_path = item["path"]
-            item_type = item["type"]
-
-            # Skip ignored directories
-            if item_type == "dir" and item_name in IGNORED_DIRS:
+        owner = sys.intern(owner)
+        repo = sys.intern(repo)
+        branch = sys.intern(branch)
+        base_dir = os.fspath(base_dir)
+        # Percent-encoded so refs and paths containing '#', '?' or '/' address the right file
+        raw_base = f"https://raw.githubusercontent.com/{owner}/{repo}/{quote(branch, safe='')}/"
+        file_items = []
+        # Whether each directory is wanted (relevant and not ignored), worked out
+        # once per directory rather than once per file in it
+        wanted_dirs = {}
+        for entry in tree.get("tree") or []:
+            if entry.get("type") != "blob":
                 continue
-
-            # Process directories
-            if item_type == "dir":
-                # Check if this is a relevant directory we want to process
-                if self._is_relevant_folder(item_name) or self._is_relevant_folder(
-                    path
-                ):
-                    subdirs_to_process.append((item_path, Path(base_dir) / item_name))
-                # Otherwise, check if any parent directory is relevant
-                elif path and any(
-                    part for part in path.split("/") if self._is_relevant_folder(part)
-                ):
-                    subdirs_to_process.append((item_path, Path(base_dir) / item_name))
-
-            # Process files (only in relevant directories)
-            elif item_type == "file" and (
-                self._is_relevant_folder(path)
-                or any(
-                    part for part in path.split("/") if self._is_relevant_folder(part)
-                )
-            ):
-                if (
-                    self._is_text_file(item_name)
-                    and item["size"] / 1024 / 1024 <= MAX_FILE_SIZE_MB
-                ):
-                    # Process file
-                    file_data = self._process_file(owner, repo, item, branch, base_dir)
-                    files_data.append(file_data)
-
-        # Update progress again after processing this directory
-        if progress_callback and not path:  # Only for root directory
-            progress_callback(30)
-            
-        # Check for cancellation before starting subdirectory processing
-        if _cancellation_event and _cancellation_event.is_set():
-            logger.info(f"Operation cancelled before processing subdirectories for {path}")
-            return files_data  # Return what we've processed so far
-
-        # Use ThreadPoolExecutor with fewer workers (3 instead of 10)
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            futures = []
-            for subdir_path, subdir_local in subdirs_to_process:
-                subdir_local.mkdir(parents=True, exist_ok=True)
-                futures.append(
-                    executor.submit(
-                        self._fetch_directory_content,
-                        owner,
-                        repo,
-                        subdir_path,
-                        branch,
-                        subdir_local,
-                        progress_callback,
-                        _cancellation_event
-                    )
+            directory, _, name = entry["path"].rpartition("/")
+            wanted = wanted_dirs.get(directory)
+            if wanted is None:
+                dir_parts = directory.split("/") if directory else ()
+                wanted = wanted_dirs[directory] = (
+                    not any(part in _IGNORED_DIR_NAMES for part in dir_parts)
+                    and any(self._is_relevant_folder(part) for part in dir_parts)
                 )
+            if not wanted:
+                continue
+            size = entry.get("size", 0)
+            if size > _MAX_FILE_SIZE_BYTES or not self._is_text_file(name):
+                continue
+            file_items.append(FileItem(
+                owner=owner,
+                repo=repo,
+                path=entry["path"],
+                branch=branch,
+                local_path=os.path.join(base_dir, entry["path"]),
+                sha=entry.get("sha"),
+                name=name,
+                size=size,
+                url=raw_base + quote(entry["path"]),
+            ))
 
-            # Collect results from all futures
-            for future in futures:
-                # Check for cancellation during future processing
-                if _cancellation_event and _cancellation_event.is_set():
-                    logger.info(f"Operation cancelled during subdirectory processing for {path}")
-                    executor.shutdown(wait=False)
-                    return files_data  # Return what we've processed so far
-                    
-                try:
-                    result = future.result()
-                    files_data.extend(result)
-                except Exception as e:
-                    logger.error(f"Error in directory fetch: {e}")
-                    # Continue with other directories even if one fails
-
-        # Final progress update when finished
-        if progress_callback and not path:  # Only for root directory
-            progress_callback(80)
+        if not file_items:
+            logger.warning(f"No relevant files found in the tree of {owner}/{repo}")
+            return []
 
-        return files_data
+        file_items = self._limit_file_items(file_items, max_files)
 
-    def _process_file(self, owner, repo, file_info, branch, base_dir):
-        """Process a single file and save it to cache."""
-        try:
-            file_content = self.client.get_repository_file(
-                owner, repo, file_info["path"], branch
-            )
-            file_path = Path(base_dir) / file_info["name"]
+        for directory in {os.path.dirname(item.local_path) for item in file_items}:
+            self._ensure_dir(directory)
 
-            # Save to cache
-            file_path.write_text(file_content, encoding="utf-8", errors="replace")
+        self.download_queue.reset()
+        self.download_queue.add_files(file_items)
+        return self._download_queued_files(owner, repo, branch, progress_callback, _cancellation_event, max_files)
 
-            return {
-                "name": file_info["name"],
-                "path": file_info["path"],
-                "sha": file_info["sha"],
-                "size": file_info["size"],
-                "url": file_info["html_url"],
-                "local_path": str(file_path),
-                "repo": f"{owner}/{repo}",
-                "branch": branch,
-            }
-        except Exception as e:
-            logger.error(f"Error processing file {file_info['path']}: {e}")
-            # For large files, create a placeholder with file info but mark as error
-            try:
-                # Create an error file to indicate download failure
-                error_file_path = Path(base_dir) / f"{file_info['name']}.error"
-                error_file_path.write_text(
-                    f"Error downloading: {str(e)}", encoding="utf-8"
-                )
-            except Exception:
-                pass
+    def _priority_score(self, file_item, keywords=None):
+        """
+        Score a file by the priority keywords found in its path.
+        
+        Args:
+            file_item (FileItem): File to score
+            keywords (tuple, optional): Result of ``_weighted_priority_keywords``;
+                looked up from priority_content if omitted
+            
+        Returns:
+            int: Higher for files matching more (and earlier) priority keywords
+        """
+        if keywords is None:
+            keywords = _weighted_priority_keywords(tuple(self.priority_content))
+        any_keyword, weighted = keywords
+        path = file_item.path.lower()
+        # Most paths match no keyword; one regex scan rules those out
+        if not any_keyword.search(path):
+            return 0
+        return sum(weight for keyword, weight in weighted if keyword in path)
 
-            return {
-                "name": file_info["name"],
-                "path": file_info["path"],
-                "error": str(e),
-                "repo": f"{owner}/{repo}",
-                "branch": branch,
-                "size": file_info.get("size", 0),
-            }
+    def _limit_file_items(self, file_items, max_files):
+        """
+        Keep at most ``max_files`` items, preferring the highest priority ones.
+        
+        Files with equal priority keep their original order.
+        
+        Args:
+            file_items (list): FileItem records to choose from
+            max_files (int, optional): Maximum number of files to keep
+            
+        Returns:
+            list: The kept FileItem records
+        """
+        if not max_files or max_files <= 0 or len(file_items) <= max_files:
+            return list(file_items)
+        if self.priority_content:
+            keywords = _weighted_priority_keywords(tuple(self.priority_content))
+            return heapq.nlargest(
+                max_files, file_items, key=functools.partial(self._priority_score, keywords=keywords)
+            )
+        return list(itertools.islice(file_items, max_files))
 
     def _is_relevant_folder(self, folder_name):
         """
@@ -543,30 +799,9 @@ class RepositoryFetcher:
         Returns:
             bool: True if the folder is relevant, False otherwise
         """
-        folder_lower = folder_name.lower()
-        
-        # Always exclude specific directories, regardless of AI settings
-        if folder_lower in IGNORED_DIRS:
-            return False
-            
-        # Check if this folder is in the AI-guided exclude list
-        if self.exclude_directories and any(
-            excluded_dir.lower() == folder_lower 
-            for excluded_dir in self.exclude_directories
-        ):
-            logger.debug(f"Excluding directory {folder_name} based on AI guidance")
-            return False
-            
-        # First, check if this folder is in the AI-guided include list (highest priority)
-        if self.include_directories and any(
-            included_dir.lower() == folder_lower
-            for included_dir in self.include_directories
-        ):
-            logger.debug(f"Including directory {folder_name} based on AI guidance")
-            return True
-            
-        # Then check against the predefined list of relevant folders
-        return any(relevant in folder_lower for relevant in RELEVANT_FOLDERS)
+        return _is_relevant_folder_name(
+            folder_name, tuple(self.include_directories), tuple(self.exclude_directories)
+        )
 
     def _is_text_file(self, filename):
         """
@@ -578,28 +813,9 @@ class RepositoryFetcher:
         Returns:
             bool: True if the file should be included, False otherwise
         """
-        # Basic text file check
-        is_text = any(filename.lower().endswith(ext) for ext in TEXT_FILE_EXTENSIONS)
-        
-        # If we have AI-guided file patterns, apply them
-        if self.file_patterns or self.exclude_patterns:
-            # Check exclude patterns first (higher priority than include)
-            if self.exclude_patterns:
-                import fnmatch
-                if any(fnmatch.fnmatch(filename.lower(), pattern.lower()) 
-                      for pattern in self.exclude_patterns):
-                    logger.debug(f"Excluding file {filename} based on AI guidance patterns")
-                    return False
-            
-            # If we have include patterns, they override the default text check
-            if self.file_patterns:
-                import fnmatch
-                matches = any(fnmatch.fnmatch(filename.lower(), pattern.lower()) 
-                             for pattern in self.file_patterns)
-                return matches
-        
-        # Fall back to basic text file check if no patterns match
-        return is_text
+        return _is_text_file_name(
+            filename, tuple(self.file_patterns), tuple(self.exclude_patterns)
+        )
 
     def _identify_files_to_download(self, repo_structure, path, owner, repo, branch, base_dir):
         """
@@ -614,45 +830,40 @@ class RepositoryFetcher:
             base_dir (Path): Base directory for local storage
             
         Returns:
-            list: List of file items to download
+            list: List of FileItem records to download
         """
-        # Find this path in the structure
-        current_path = repo_structure["structure"]
-        if path:
-            try:
-                for part in path.split("/"):
-                    current_path = current_path.get(part, {})
-            except (KeyError, AttributeError):
-                logger.warning(f"Path {path} not found in repository structure")
-                return []
-                
+        # Look up the files recorded directly under this path
+        files = repo_structure["structure_flat"].get(path)
+        
         # Extract files from this path
         files_to_download = []
-        if "files" in current_path and isinstance(current_path["files"], list):
-            for file_info in current_path["files"]:
+        if files:
+            # Share one string object per repository across all of its items
+            owner = sys.intern(owner)
+            repo = sys.intern(repo)
+            branch = sys.intern(branch) if branch else branch
+            # Local directory for this path, joined once as a plain string
+            local_dir = os.path.join(base_dir, path) if path else os.fspath(base_dir)
+            for file_info in files:
                 # Check if this is a text file we want to download
-                if (self._is_text_file(file_info["name"]) and 
-                    file_info["size"] / 1024 / 1024 <= MAX_FILE_SIZE_MB):
+                if (file_info["size"] <= _MAX_FILE_SIZE_BYTES and
+                    self._is_text_file(file_info["name"])):
                     
                     # Create local path
-                    file_path = Path(base_dir)
-                    if path:
-                        file_path = file_path / path
-                    file_path = file_path / file_info["name"]
+                    file_path = os.path.join(local_dir, file_info["name"])
                     
                     # Add file to download queue
-                    download_item = {
-                        "owner": owner,
-                        "repo": repo,
-                        "path": file_info["path"],
-                        "branch": branch,
-                        "sha": file_info["sha"],
-                        "name": file_info["name"],
-                        "size": file_info["size"],
-                        "local_path": str(file_path),
-                        "url": file_info.get("download_url", ""),
-                    }
-                    files_to_download.append(download_item)
+                    files_to_download.append(FileItem(
+                        owner=owner,
+                        repo=repo,
+                        path=file_info["path"],
+                        branch=branch,
+                        local_path=file_path,
+                        sha=file_info["sha"],
+                        name=file_info["name"],
+                        size=file_info["size"],
+                        url=file_info.get("download_url") or "",
+                    ))
         
         return files_to_download
         
@@ -680,8 +891,11 @@ class RepositoryFetcher:
             
         logger.info(f"Downloading {total_files} files from {owner}/{repo}")
         
+        # Cancellation is polled between completions; bind the check once
+        is_cancelled = _cancellation_event.is_set if _cancellation_event is not None else (lambda: False)
+        
         # Check for cancellation before starting downloads
-        if _cancellation_event and _cancellation_event.is_set():
+        if is_cancelled():
             logger.info(f"Operation cancelled before file download for {owner}/{repo}")
             return []
         
@@ -689,96 +903,88 @@ class RepositoryFetcher:
         if progress_callback:
             progress_callback(25)  # We're at 25% after scanning and queueing
             
-        # Prepare for parallel downloads
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            # Process files in batches for better progress tracking
-            batch_size = 5
-            downloaded_files = []
-            last_progress_update = time.time()
-            progress_update_interval = 0.5  # Update status at most every 0.5 seconds
-            
-            # Apply max_files limit if specified
-            if max_files is not None and max_files > 0:
-                logger.info(f"Limiting download to {max_files} files based on AI guidance")
-                # Trim the queue to respect max_files
-                if len(queue.queue) > max_files:
-                    # Sort queue by priority if we have priority_content settings
-                    if self.priority_content:
-                        # Utility function to score a file based on priority keywords
-                        def priority_score(file_item):
-                            score = 0
-                            path = file_item.get("path", "").lower()
-                            for i, keyword in enumerate(self.priority_content):
-                                if keyword.lower() in path:
-                                    # Higher priority for earlier keywords in the list
-                                    score += (len(self.priority_content) - i)
-                            return score
-                            
-                        # Sort queue by priority score
-                        queue.queue.sort(key=priority_score, reverse=True)
-                        
-                    # Trim queue to max_files
-                    queue.queue = queue.queue[:max_files]
-                    queue.total_files = len(queue.queue)
-                    logger.info(f"Queue trimmed to {len(queue.queue)} files based on max_files limit")
-            
-            while not queue.is_empty():
-                # Check for cancellation before each batch
-                if _cancellation_event and _cancellation_event.is_set():
+        downloaded_files = []
+        last_progress_update = time.monotonic()
+        progress_update_interval = 0.5  # Update status at most every 0.5 seconds
+        
+        # Apply max_files limit if specified (callers that build the queue from a
+        # scan have already trimmed it, so this only applies to hand-filled queues)
+        if max_files is not None and max_files > 0 and len(queue.queue) > max_files:
+            logger.info(f"Limiting download to {max_files} files based on AI guidance")
+            queue.queue = deque(self._limit_file_items(queue.queue, max_files))
+            queue.total_files = len(queue.queue)
+            logger.info(f"Queue trimmed to {len(queue.queue)} files based on max_files limit")
+        
+        # With a token, small files come back ~100 per GraphQL request; the rest
+        # (binary, oversized, already cached) stay queued for raw downloads
+        if getattr(self.client, "token", None):
+            downloaded_files.extend(
+                self._download_blobs_batched(queue, progress_callback, _cancellation_event)
+            )
+        
+        # Keep a window of downloads in flight and start the next one as soon as any
+        # finishes, instead of waiting for whole batches. Results are collected here,
+        # on the coordinating thread, so the queue needs no locking.
+        in_flight = set()
+        window = self._download_window(queue)
+        executor = ThreadPoolExecutor(max_workers=window)
+        cancelled = False
+        # Bound once; these run for every file
+        submit = executor.submit
+        download = self._download_single_file
+        try:
+            while in_flight or not queue.is_empty():
+                # Check for cancellation between completions
+                if is_cancelled():
                     logger.info(f"Operation cancelled during file download for {owner}/{repo}")
-                    executor.shutdown(wait=False)
+                    cancelled = True
                     return downloaded_files  # Return what we've got so far
                 
-                batch = []
-                for _ in range(min(batch_size, len(queue.queue))):
-                    next_file = queue.get_next_file()
-                    if next_file:
-                        batch.append(next_file)
-                
-                # Submit batch for download
-                futures = []
-                for file_item in batch:
-                    futures.append(executor.submit(
-                        self._download_single_file, 
-                        file_item["owner"],
-                        file_item["repo"],
-                        file_item["path"],
-                        file_item["branch"],
-                        file_item["local_path"]
+                for file_item in queue.get_batch(window - len(in_flight)):
+                    in_flight.add(submit(
+                        download,
+                        file_item.owner,
+                        file_item.repo,
+                        file_item.path,
+                        file_item.branch,
+                        file_item.local_path,
+                        file_item.url or None,
+                        file_item.sha
                     ))
                 
-                # Process results
-                for i, future in enumerate(futures):
-                    # Check for cancellation during future processing
-                    if _cancellation_event and _cancellation_event.is_set():
-                        logger.info(f"Operation cancelled while processing download futures for {owner}/{repo}")
-                        executor.shutdown(wait=False)
-                        return downloaded_files  # Return what we've got so far
-                    
+                done, in_flight = wait(
+                    in_flight, timeout=progress_update_interval, return_when=FIRST_COMPLETED
+                )
+                for future in done:
                     try:
                         result = future.result()
                         if result:
                             downloaded_files.append(result)
-                        queue.mark_processed()
                     except Exception as e:
                         logger.error(f"Error downloading file: {e}")
-                        queue.mark_processed()  # Still mark as processed to update progress
+                # Mark failures as processed too, to keep progress moving
+                if done:
+                    queue.mark_processed(len(done))
                 
                 # Update progress callback (but not too frequently)
-                current_time = time.time()
+                current_time = time.monotonic()
                 if current_time - last_progress_update >= progress_update_interval:
-                    progress_info = queue.get_progress()
-                    logger.debug(queue.get_status_message())
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(queue.get_status_message())
                     
                     if progress_callback:
                         # Map our queue progress (0-100%) to the expected progress range (25-90%)
-                        callback_progress = 25 + (progress_info["percent"] * 0.65)
+                        callback_progress = 25 + (queue.get_progress()["percent"] * 0.65)
                         progress_callback(min(90, callback_progress))
                         
                     last_progress_update = current_time
+        finally:
+            # On cancellation drop the queued downloads and return without waiting
+            # for the ones already running
+            executor.shutdown(wait=not cancelled, cancel_futures=cancelled)
         
         # Final check for cancellation
-        if _cancellation_event and _cancellation_event.is_set():
+        if is_cancelled():
             logger.info(f"Operation cancelled at end of download phase for {owner}/{repo}")
             return downloaded_files
         
@@ -789,7 +995,160 @@ class RepositoryFetcher:
         logger.info(f"Downloaded {len(downloaded_files)} files from {owner}/{repo}")
         return downloaded_files
         
-    def _download_single_file(self, owner, repo, path, branch, local_path):
+    def _download_window(self, queue):
+        """
+        Number of downloads to keep in flight for the files in ``queue``.
+
+        Raw downloads are not charged against the API rate limit, but files without
+        a scanned URL need a contents API call each. When any are queued, the window
+        shrinks to the core budget left above the reserve, so threads do not pile
+        up waiting for a rate-limit reset.
+        """
+        window = GITHUB_DOWNLOAD_CONCURRENCY
+        if any(not file_item.url for file_item in queue.queue):
+            rate_limiter = getattr(self.client, "rate_limiter", None)
+            headroom = rate_limiter.headroom("core") if rate_limiter is not None else None
+            if isinstance(headroom, int):
+                window = max(1, min(window, headroom))
+        return window
+
+    def _download_blobs_batched(self, queue, progress_callback=None, _cancellation_event=None):
+        """
+        Download queued text files through batched GraphQL blob reads.
+
+        Files are grouped per repository branch into requests of up to
+        ``GITHUB_GRAPHQL_BLOB_BATCH`` paths and ``GITHUB_GRAPHQL_BLOB_BATCH_BYTES``
+        of content, with up to ``GITHUB_GRAPHQL_BLOB_CONCURRENCY`` requests in
+        flight. Files that are large, already in the blob cache, binary, not
+        byte-identical as UTF-8 text, or in a batch that failed are put back on
+        the queue for raw downloads.
+
+        Args:
+            queue (DownloadQueue): Queue to take files from
+            progress_callback (function): Progress callback function
+            _cancellation_event (Event): Event that can be set to cancel the operation
+
+        Returns:
+            list: Downloaded file data
+        """
+        blob_cache = self._get_blob_cache()
+        downloaded_files = []
+        raw_items = []
+        batches = []
+        batch = []
+        batch_bytes = 0
+
+        for file_item in queue.take_all():
+            if (
+                file_item.size > GITHUB_GRAPHQL_BLOB_BATCH_BYTES
+                or (file_item.sha and blob_cache.get(file_item.sha))
+            ):
+                raw_items.append(file_item)
+                continue
+            if batch and (
+                (file_item.owner, file_item.repo, file_item.branch)
+                != (batch[0].owner, batch[0].repo, batch[0].branch)
+                or len(batch) >= GITHUB_GRAPHQL_BLOB_BATCH
+                or batch_bytes + file_item.size > GITHUB_GRAPHQL_BLOB_BATCH_BYTES
+            ):
+                batches.append(batch)
+                batch = []
+                batch_bytes = 0
+            batch.append(file_item)
+            batch_bytes += file_item.size
+        if batch:
+            batches.append(batch)
+
+        def read_batch(batch):
+            """Fetch and write one batch; returns (downloaded file data, items left for raw downloads)."""
+            if _cancellation_event and _cancellation_event.is_set():
+                return [], batch
+            first = batch[0]
+            try:
+                texts = fetch_blob_texts(
+                    self.client, first.owner, first.repo, first.branch,
+                    [file_item.path for file_item in batch]
+                )
+            except GitHubAPIError as e:
+                logger.warning(f"Batched blob read failed for {first.owner}/{first.repo}, using raw downloads: {e}")
+                return [], batch
+
+            written = []
+            leftover = []
+            for file_item, text in zip(batch, texts):
+                if text is None:
+                    leftover.append(file_item)
+                    continue
+                # fetch_blob_texts only returns text that re-encodes to the blob's bytes
+                data = text.encode("utf-8")
+                try:
+                    self._ensure_dir(os.path.dirname(file_item.local_path))
+                    _write_file_bytes(file_item.local_path, data)
+                except OSError as e:
+                    logger.debug(f"Could not write {file_item.path}, retrying as a raw download: {e}")
+                    self._created_dirs.discard(os.path.dirname(file_item.local_path))
+                    leftover.append(file_item)
+                    continue
+
+                if file_item.sha:
+                    blob_cache.put(file_item.sha, os.path.abspath(file_item.local_path), len(data))
+                written.append({
+                    "name": os.path.basename(file_item.path),
+                    "path": file_item.path,
+                    "local_path": file_item.local_path,
+                    "repo": f"{file_item.owner}/{file_item.repo}",
+                    "branch": file_item.branch,
+                    "size": len(data),
+                })
+            return written, leftover
+
+        if batches:
+            # Results are merged here, on the coordinating thread, so the queue needs no locking
+            workers = min(GITHUB_GRAPHQL_BLOB_CONCURRENCY, len(batches))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gh-blobs") as executor:
+                for written, leftover in executor.map(read_batch, batches):
+                    raw_items.extend(leftover)
+                    if written:
+                        downloaded_files.extend(written)
+                        queue.mark_processed(len(written))
+                    if progress_callback:
+                        # Same 25-90% range as the raw download loop
+                        progress_callback(min(90, 25 + queue.get_progress()["percent"] * 0.65))
+
+        queue.queue.extend(raw_items)
+        return downloaded_files
+
+    def _get_blob_cache(self):
+        """Return the blob cache stored under the current cache directory."""
+        with self._blob_cache_lock:
+            db_path = self.cache_dir / "blobs.sqlite3"
+            if self._blob_cache is None or self._blob_cache.db_path != db_path:
+                self._blob_cache = BlobCache(db_path)
+            return self._blob_cache
+
+    def _record_download_error(self, owner, repo, path, branch, local_path, error):
+        """Append a failed download to ``download_errors.jsonl`` in the cache directory."""
+        record = json.dumps({
+            "repo": f"{owner}/{repo}",
+            "path": path,
+            "branch": branch,
+            "local_path": os.fspath(local_path),
+            "error": str(error),
+            "time": time.time(),
+        })
+        try:
+            with self._error_log_lock:
+                log_path = os.path.join(self.cache_dir, "download_errors.jsonl")
+                if self._error_log is None or self._error_log.name != log_path:
+                    if self._error_log is not None:
+                        self._error_log.close()
+                    # Line buffered, so each record is on disk once written
+                    self._error_log = open(log_path, "a", encoding="utf-8", buffering=1)
+                self._error_log.write(record + "\n")
+        except OSError as e:
+            logger.debug(f"Could not record download error for {path}: {e}")
+
+    def _download_single_file(self, owner, repo, path, branch, local_path, download_url=None, sha=None):
         """
         Download a single file and save it locally.
         
@@ -799,38 +1158,93 @@ class RepositoryFetcher:
             path (str): File path
             branch (str): Branch to use
             local_path (str): Local path to save the file
+            download_url (str, optional): Raw URL recorded during the scan
+            sha (str, optional): Git blob SHA; a blob downloaded before (or being
+                downloaded by another thread) is reused
             
         Returns:
             dict: File information or None on failure
         """
+        if sha:
+            self._claim_blob(sha)
         try:
             # Ensure parent directory exists
-            Path(local_path).parent.mkdir(parents=True, exist_ok=True)
+            parent = os.path.dirname(local_path)
+            self._ensure_dir(parent)
+            
+            # Unchanged content downloaded on an earlier run (or in another repository)
+            cached = self._get_blob_cache().get(sha) if sha else None
+            if cached:
+                cached_path, size = cached
+                if os.path.abspath(cached_path) != os.path.abspath(local_path):
+                    shutil.copyfile(cached_path, local_path)
+                logger.debug(f"Reusing cached blob {sha} for {path}")
+                return {
+                    "name": os.path.basename(path),
+                    "path": path,
+                    "local_path": local_path,
+                    "repo": f"{owner}/{repo}",
+                    "branch": branch,
+                    "size": size,
+                }
             
-            # Download file
-            file_content = self.client.get_repository_file(owner, repo, path, branch)
+            # Stream the file straight to disk
+            try:
+                size = self.client.download_repository_file(
+                    owner, repo, path, local_path, branch, download_url=download_url
+                )
+            except FileNotFoundError:
+                # Directory removed since we created it (e.g. cache cleared); recreate it
+                self._created_dirs.discard(parent)
+                self._ensure_dir(parent)
+                size = self.client.download_repository_file(
+                    owner, repo, path, local_path, branch, download_url=download_url
+                )
             
-            # Save file locally
-            Path(local_path).write_text(file_content, encoding="utf-8", errors="replace")
+            if sha:
+                self._get_blob_cache().put(sha, os.path.abspath(local_path), size)
             
             return {
-                "name": Path(path).name,
+                "name": os.path.basename(path),
                 "path": path,
                 "local_path": local_path,
                 "repo": f"{owner}/{repo}",
                 "branch": branch,
-                "size": len(file_content),
+                "size": size,
             }
         except Exception as e:
             logger.error(f"Error downloading file {path}: {e}")
-            # Create error marker file
-            try:
-                error_path = f"{local_path}.error"
-                Path(error_path).write_text(f"Error downloading: {str(e)}", encoding="utf-8")
-            except Exception:
-                pass
+            self._record_download_error(owner, repo, path, branch, local_path, e)
             return None
+        finally:
+            if sha:
+                self._release_blob(sha)
     
+    def _claim_blob(self, sha):
+        """Wait until no other thread is downloading blob ``sha``, then claim it."""
+        while True:
+            with self._blob_inflight_lock:
+                done = self._blob_inflight.get(sha)
+                if done is None:
+                    self._blob_inflight[sha] = threading.Event()
+                    return
+            # Once the other download lands, the blob cache lookup finds it
+            done.wait()
+    
+    def _release_blob(self, sha):
+        """Release a blob claimed by ``_claim_blob`` and wake threads waiting for it."""
+        with self._blob_inflight_lock:
+            done = self._blob_inflight.pop(sha, None)
+        if done is not None:
+            done.set()
+    
+    def _ensure_dir(self, directory):
+        """Create ``directory`` (and parents) once per fetcher."""
+        directory = os.fspath(directory)
+        if directory not in self._created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._created_dirs.add(directory)
+
     def _is_pdf_file(self, filename):
         """Check if a file is a PDF file based on extension."""
         return filename.lower().endswith(".pdf")
@@ -838,30 +1252,39 @@ class RepositoryFetcher:
     def _process_pdf_folder_structure(self, base_dir):
         """Process directory structure to extract PDF labels from folder names."""
         pdf_data = []
-        base_path = Path(base_dir)
-        
-        # Walk the directory structure
-        for root, dirs, files in os.walk(base_path):
-            # Skip ignored directories
-            if any(ignored in root.split(os.sep) for ignored in IGNORED_DIRS):
-                continue
-                
-            # Extract PDF files
-            for file in files:
-                if file.lower().endswith('.pdf'):
-                    file_path = Path(root) / file
-                    rel_path = file_path.relative_to(base_path)
-                    
-                    # Extract labels from directory structure
-                    path_parts = rel_path.parent.parts
-                    labels = [part for part in path_parts if self._is_relevant_folder(part)]
-                    
-                    pdf_data.append({
-                        "file_path": str(file_path),
-                        "relative_path": str(rel_path),
-                        "labels": labels,
-                        "filename": file,
-                        "directory": str(rel_path.parent)
-                    })
         
+        # Walk the directory structure with scandir, keeping paths as strings. Each
+        # directory carries its path relative to base_dir and the labels (relevant
+        # folder names) above it, so nothing is recomputed per file.
+        pending = [(os.fspath(base_dir), "", ())]
+        # Bound once; these run for every entry
+        add_pdf = pdf_data.append
+        join = os.path.join
+        is_relevant_folder = self._is_relevant_folder
+        is_pdf_file = self._is_pdf_file
+        while pending:
+            directory, rel_dir, labels = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            # Skip ignored directories without descending into them
+                            if entry.name not in _IGNORED_DIR_NAMES:
+                                sub_labels = (
+                                    labels + (entry.name,)
+                                    if is_relevant_folder(entry.name) else labels
+                                )
+                                pending.append((
+                                    entry.path, join(rel_dir, entry.name), sub_labels
+                                ))
+                        elif is_pdf_file(entry.name):
+                            add_pdf({
+                                "file_path": entry.path,
+                                "relative_path": join(rel_dir, entry.name),
+                                "labels": list(labels),
+                                "filename": entry.name,
+                                "directory": rel_dir or "."
+                            })
+            except OSError as e:
+                logger.debug(f"Could not list {directory}: {e}")        
         return pdf_data
\ No newline at end of file
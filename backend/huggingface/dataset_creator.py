@@ -759,24 +759,27 @@ class DatasetCreator:
                     # Initialize graph schema if needed
                     graph_store.initialize_schema()
                     
-                    # Add documents to graph
-                    for i, page_data in enumerate(crawled_data):
-                        # Basic document metadata
-                        document_data = {
+                    # Basic document metadata for every crawled page
+                    documents_data = [
+                        {
                             "url": page_data.get("url", ""),
                             "title": page_data.get("title", "Unknown Title"),
                             "description": page_data.get("meta_description", ""),
                             "content": page_data.get("markdown", ""),
                             "fetched_at": page_data.get("fetched_at", "")
                         }
+                        for page_data in crawled_data
+                    ]
+                    
+                    # Add documents to graph, one query per batch
+                    batch_size = 200
+                    for start in range(0, len(documents_data), batch_size):
+                        batch = documents_data[start:start + batch_size]
+                        graph_store.add_documents(batch)
                         
-                        # Add to graph
-                        document_id = graph_store.add_document(document_data)
-                        
-                        # Update progress periodically
-                        if i % 10 == 0 or i == len(crawled_data) - 1:
-                            progress = 91 + ((i + 1) / len(crawled_data) * 8)
-                            _progress_callback(progress, f"Adding documents to knowledge graph ({i+1}/{len(crawled_data)})")
+                        done = start + len(batch)
+                        progress = 91 + (done / len(documents_data) * 8)
+                        _progress_callback(progress, f"Adding documents to knowledge graph ({done}/{len(documents_data)})")
                     
                     # Extract entities from documents
                     _progress_callback(99, "Extracting entities for knowledge graph")
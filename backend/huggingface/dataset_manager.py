@@ -1,11 +1,19 @@
 import logging
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from huggingface_hub import HfApi, HfFolder, DatasetCard, DatasetCardData
 from pathlib import Path
+from config.settings import HF_METADATA_CACHE_TTL, HF_METADATA_CONCURRENCY
 
 logger = logging.getLogger(__name__)
 
 
+def _write_json(path, data):
+    """Write ``data`` as indented JSON, encoded in full and written in one call."""
+    Path(path).write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
 class DatasetManager:
     """Manage existing datasets on Hugging Face Hub."""
 
@@ -20,6 +28,28 @@ class DatasetManager:
         self.api = HfApi()
         if self.token:
             HfFolder.save_token(self.token)
+        
+        # Recent Hub lookups, keyed by (kind, name) -> (expiry on time.monotonic(), value)
+        self._lookup_cache = {}
+
+    def _cached_lookup(self, kind, name, fetch):
+        """Return ``fetch()``, reusing its result for HF_METADATA_CACHE_TTL seconds.
+        
+        Failures are not cached, so a lookup that raised is retried next time.
+        """
+        key = (kind, name)
+        now = time.monotonic()
+        cached = self._lookup_cache.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        value = fetch()
+        self._lookup_cache[key] = (now + HF_METADATA_CACHE_TTL, value)
+        return value
+
+    def _invalidate_dataset(self, dataset_name):
+        """Drop cached lookups for a dataset after it has changed on the Hub."""
+        self._lookup_cache.pop(("dataset_info", dataset_name), None)
+        self._lookup_cache.pop(("dataset_card", dataset_name), None)
 
     def list_datasets(self, username=None):
         """List datasets for the authenticated user or specified username."""
@@ -34,7 +64,9 @@ class DatasetManager:
                         "No Hugging Face token provided. Cannot list datasets."
                     )
                     return []
-                whoami = self.api.whoami(self.token)
+                whoami = self._cached_lookup(
+                    "whoami", self.token, lambda: self.api.whoami(self.token)
+                )
                 username = whoami["name"]
                 logger.info(f"Listing datasets for authenticated user: {username}")
                 datasets = self.api.list_datasets(author=username)
@@ -49,7 +81,9 @@ class DatasetManager:
         """Get information about a specific dataset."""
         try:
             logger.info(f"Getting info for dataset: {dataset_name}")
-            info = self.api.dataset_info(dataset_name)
+            info = self._cached_lookup(
+                "dataset_info", dataset_name, lambda: self.api.dataset_info(dataset_name)
+            )
             return info
         except Exception as e:
             logger.error(f"Error getting dataset info for {dataset_name}: {e}")
@@ -71,6 +105,7 @@ class DatasetManager:
         try:
             logger.info(f"Deleting dataset: {dataset_name}")
             self.api.delete_repo(dataset_name, repo_type="dataset", token=self.token)
+            self._invalidate_dataset(dataset_name)
             logger.info(f"Dataset {dataset_name} deleted successfully")
             return True
         except Exception as e:
@@ -93,23 +128,41 @@ class DatasetManager:
                 output_dir.mkdir(parents=True, exist_ok=True)
 
             logger.info(f"Downloading metadata for dataset: {dataset_name}")
+            
+            # List the repository once to see which metadata source exists, instead
+            # of probing each source and handling the failures
             try:
-                # First try to get the metadata.json file if it exists
-                self.api.hf_hub_download(
-                    repo_id=dataset_name,
-                    filename="metadata.json",
-                    repo_type="dataset",
-                    local_dir=output_dir,
-                    token=self.token,
-                )
-                logger.info(f"Downloaded metadata.json for {dataset_name}")
-                return True
+                repo_files = set(self.api.list_repo_files(
+                    dataset_name, repo_type="dataset", token=self.token
+                ))
             except Exception as e:
-                logger.warning(f"No metadata.json found for {dataset_name}: {e}")
+                logger.warning(f"Could not list files for {dataset_name}: {e}")
+                repo_files = None
+
+            if repo_files is None or "metadata.json" in repo_files:
+                # First try to get the metadata.json file if it exists
+                try:
+                    self.api.hf_hub_download(
+                        repo_id=dataset_name,
+                        filename="metadata.json",
+                        repo_type="dataset",
+                        local_dir=output_dir,
+                        token=self.token,
+                    )
+                    logger.info(f"Downloaded metadata.json for {dataset_name}")
+                    return True
+                except Exception as e:
+                    logger.warning(f"No metadata.json found for {dataset_name}: {e}")
+            else:
+                logger.info(f"No metadata.json in {dataset_name}")
 
+            if repo_files is None or "README.md" in repo_files:
                 # Try to get the dataset card
                 try:
-                    dataset_card = DatasetCard.load(dataset_name, token=self.token)
+                    dataset_card = self._cached_lookup(
+                        "dataset_card", dataset_name,
+                        lambda: DatasetCard.load(dataset_name, token=self.token)
+                    )
                     if dataset_card and dataset_card.data:
                         # Extract metadata from the dataset card
                         metadata = {
@@ -119,44 +172,76 @@ class DatasetManager:
                             "tags": dataset_card.data.get("tags", []),
                         }
                         
-                        with open(output_dir / "dataset_card_info.json", "w") as f:
-                            json.dump(metadata, f, indent=2)
+                        _write_json(output_dir / "dataset_card_info.json", metadata)
                             
                         logger.info(f"Created dataset_card_info.json for {dataset_name}")
                         return True
                 except Exception as card_e:
                     logger.warning(f"Could not load dataset card for {dataset_name}: {card_e}")
 
-                # As a last resort, get the dataset info
-                info = self.get_dataset_info(dataset_name)
-                if info:
-                    metadata = {
-                        "name": info.id,
-                        "description": info.description,
-                        "created_at": (
-                            info.created_at.isoformat() if info.created_at else None
-                        ),
-                        "last_modified": (
-                            info.last_modified.isoformat()
-                            if info.last_modified
-                            else None
-                        ),
-                        "tags": info.tags,
-                        "downloads": info.downloads,
-                        "likes": info.likes,
-                    }
-
-                    with open(output_dir / "dataset_info.json", "w") as f:
-                        json.dump(metadata, f, indent=2)
-
-                    logger.info(f"Created dataset_info.json for {dataset_name}")
-                    return True
+            # As a last resort, get the dataset info
+            info = self.get_dataset_info(dataset_name)
+            if info:
+                metadata = {
+                    "name": info.id,
+                    "description": info.description,
+                    "created_at": (
+                        info.created_at.isoformat() if info.created_at else None
+                    ),
+                    "last_modified": (
+                        info.last_modified.isoformat()
+                        if info.last_modified
+                        else None
+                    ),
+                    "tags": info.tags,
+                    "downloads": info.downloads,
+                    "likes": info.likes,
+                }
 
-                return False
+                _write_json(output_dir / "dataset_info.json", metadata)
+
+                logger.info(f"Created dataset_info.json for {dataset_name}")
+                return True
+
+            return False
         except Exception as e:
             logger.error(f"Error downloading dataset metadata for {dataset_name}: {e}")
             return False
             
+    def download_many_metadata(self, dataset_names, output_dir=None, max_workers=HF_METADATA_CONCURRENCY):
+        """Download metadata for several datasets concurrently.
+        
+        Args:
+            dataset_names (list): Dataset names in format 'username/dataset_name'
+            output_dir (Path, optional): Parent directory; each dataset's metadata is
+                saved to a subdirectory named after it (default ./dataset_metadata)
+            max_workers (int): Maximum number of datasets handled at once
+            
+        Returns:
+            dict: Dataset name -> whether its metadata was successfully downloaded
+        """
+        def download(dataset_name):
+            dataset_dir = None
+            if output_dir:
+                dataset_dir = Path(output_dir) / dataset_name
+                dataset_dir.mkdir(parents=True, exist_ok=True)
+            return self.download_dataset_metadata(dataset_name, output_dir=dataset_dir)
+        
+        results = {}
+        names = list(dict.fromkeys(dataset_names))
+        if not names:
+            return results
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(names)))) as executor:
+            futures = {executor.submit(download, name): name for name in names}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    logger.error(f"Error downloading dataset metadata for {name}: {e}")
+                    results[name] = False
+        return results
+
     def update_dataset_card(self, dataset_name, metadata):
         """Update or create a dataset card with metadata.
         
@@ -200,6 +285,7 @@ class DatasetManager:
                 
             # Push the updated card
             card.push_to_hub(dataset_name, token=self.token)
+            self._invalidate_dataset(dataset_name)
             logger.info(f"Dataset card updated for {dataset_name}")
             return True
         except Exception as e:
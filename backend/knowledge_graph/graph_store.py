@@ -1,5 +1,10 @@
+import atexit
+import hashlib
 import logging
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Union, Tuple
 from datetime import datetime
 import json
@@ -13,6 +18,43 @@ from langchain_openai import ChatOpenAI
 
 logger = logging.getLogger(__name__)
 
+# Bolt connection pool size for each cached Neo4j driver
+NEO4J_POOL_SIZE = int(os.environ.get("NEO4J_POOL_SIZE", "50"))
+
+# Maximum number of documents sent to the LLM at once during entity extraction
+LLM_CONCURRENCY = int(os.environ.get("LLM_CONCURRENCY", "8"))
+
+# Indexes that keep per-graph filters sargable
+GRAPH_NAME_INDEXES = (
+    "document_graph_name",
+    "document_graph_id",
+    "entity_graph_name",
+    "entity_graph_id",
+    "concept_graph_name",
+    "person_graph_name",
+    "organization_graph_name",
+)
+
+# Connections shared by every GraphStore, keyed by (uri, username, database)
+# and stored with a hash of the password they were opened with
+_DRIVER_CACHE: Dict[Tuple[str, str, Optional[str]], Tuple[str, Neo4jGraph]] = {}
+# Connections replaced after a credential change; stores created earlier may
+# still be using them, so they are only closed at exit
+_RETIRED_DRIVERS: List[Neo4jGraph] = []
+_DRIVER_CACHE_LOCK = threading.Lock()
+
+# Characters and boolean keywords with special meaning in Lucene query syntax
+_LUCENE_SPECIAL_CHARS = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/]|\b(?:AND|OR|NOT)\b)')
+
+def _lucene_escape(text: str) -> str:
+    """Escape Lucene syntax so user text is searched as plain terms."""
+    return _LUCENE_SPECIAL_CHARS.sub(r"\\\1", text)
+
+def _lucene_phrase(value: str) -> str:
+    """Quote a value as a Lucene phrase so it matches literally."""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
 class GraphStore:
     """Neo4j-based knowledge graph store with support for multiple graphs."""
 
@@ -48,13 +90,7 @@ class GraphStore:
         self.graph = None
         if all([self.uri, self.username, self.password]):
             try:
-                self.graph = Neo4jGraph(
-                    url=self.uri,
-                    username=self.username,
-                    password=self.password,
-                    database=self.graph_name if self.graph_name != "default" else None,
-                    refresh_schema=False
-                )
+                self.graph = self._get_connection()
                 logger.info(f"Connected to Neo4j graph: {self.graph_name}")
             except Exception as e:
                 logger.error(f"Failed to connect to Neo4j: {e}")
@@ -62,6 +98,45 @@ class GraphStore:
         else:
             logger.warning("Neo4j credentials not configured")
     
+    def _get_connection(self) -> Neo4jGraph:
+        """Return the shared connection for this store, creating it on first use."""
+        database = self.graph_name if self.graph_name != "default" else None
+        key = (self.uri, self.username, database)
+        password_hash = hashlib.sha256(self.password.encode("utf-8")).hexdigest()
+        
+        with _DRIVER_CACHE_LOCK:
+            cached = _DRIVER_CACHE.get(key)
+            if cached is not None and cached[0] == password_hash:
+                return cached[1]
+            
+            # Credentials changed since the driver was opened, so replace it
+            if cached is not None:
+                _RETIRED_DRIVERS.append(cached[1])
+            graph = Neo4jGraph(
+                url=self.uri,
+                username=self.username,
+                password=self.password,
+                database=database,
+                refresh_schema=False,
+                driver_config={"max_connection_pool_size": NEO4J_POOL_SIZE}
+            )
+            _DRIVER_CACHE[key] = (password_hash, graph)
+        return graph
+    
+    @classmethod
+    def close_all(cls) -> None:
+        """Close every cached and retired Neo4j connection."""
+        with _DRIVER_CACHE_LOCK:
+            graphs = [graph for _, graph in _DRIVER_CACHE.values()] + _RETIRED_DRIVERS
+            _DRIVER_CACHE.clear()
+            _RETIRED_DRIVERS.clear()
+        
+        for graph in graphs:
+            try:
+                graph.close()
+            except Exception as e:
+                logger.warning(f"Failed to close Neo4j connection: {e}")
+    
     def test_connection(self) -> bool:
         """Test the connection to the Neo4j database."""
         if not self.graph:
@@ -94,17 +169,28 @@ class GraphStore:
                 "CREATE CONSTRAINT concept_id IF NOT EXISTS FOR (c:Concept) REQUIRE c.id IS UNIQUE",
                 "CREATE CONSTRAINT place_id IF NOT EXISTS FOR (p:Place) REQUIRE p.id IS UNIQUE",
                 
+                # Index graph_name so per-graph filters seek instead of scanning labels
+                "CREATE INDEX document_graph_name IF NOT EXISTS FOR (d:Document) ON (d.graph_name)",
+                "CREATE INDEX document_graph_id IF NOT EXISTS FOR (d:Document) ON (d.graph_name, d.id)",
+                "CREATE INDEX entity_graph_name IF NOT EXISTS FOR (e:Entity) ON (e.graph_name)",
+                "CREATE INDEX entity_graph_id IF NOT EXISTS FOR (e:Entity) ON (e.graph_name, e.id)",
+                "CREATE INDEX concept_graph_name IF NOT EXISTS FOR (c:Concept) ON (c.graph_name, c.name)",
+                "CREATE INDEX person_graph_name IF NOT EXISTS FOR (p:Person) ON (p.graph_name, p.name)",
+                "CREATE INDEX organization_graph_name IF NOT EXISTS FOR (o:Organization) ON (o.graph_name, o.name)",
+                
                 # Create graph metadata node if it doesn't exist
-                f"""
-                MERGE (g:KnowledgeGraph {{name: '{self.graph_name}'}})
+                """
+                MERGE (g:KnowledgeGraph {name: $graph_name})
                 ON CREATE SET g.created_at = datetime(),
                               g.updated_at = datetime(),
                               g.description = 'Knowledge graph created by othertales Serper'
                 ON MATCH SET g.updated_at = datetime()
                 """,
                 
-                # Create full-text search index for document content
-                "CREATE FULLTEXT INDEX document_content IF NOT EXISTS FOR (d:Document) ON EACH [d.content]",
+                # Create full-text search index for document content, with graph_name
+                # indexed alongside so searches are filtered inside Lucene
+                "DROP INDEX document_content IF EXISTS",
+                "CREATE FULLTEXT INDEX document_content_graph IF NOT EXISTS FOR (d:Document) ON EACH [d.content, d.graph_name]",
                 
                 # Create full-text search index for entity names
                 "CREATE FULLTEXT INDEX entity_name IF NOT EXISTS FOR (e:Entity) ON EACH [e.name, e.id]"
@@ -112,7 +198,14 @@ class GraphStore:
             
             # Execute all schema setup queries
             for query in schema_queries:
-                self.graph.query(query)
+                self.graph.query(query, {"graph_name": self.graph_name})
+            
+            # Verify the graph_name indexes exist, since queries silently fall back to scans
+            indexes = self.graph.query("SHOW INDEXES YIELD name RETURN name")
+            index_names = {index.get("name") for index in indexes}
+            missing = [name for name in GRAPH_NAME_INDEXES if name not in index_names]
+            if missing:
+                logger.warning(f"Missing graph indexes: {', '.join(missing)}")
             
             logger.info(f"Knowledge graph schema initialized for {self.graph_name}")
             return True
@@ -128,27 +221,36 @@ class GraphStore:
             return {}
         
         try:
-            # Query for graph statistics
-            stats_query = f"""
-            MATCH (g:KnowledgeGraph {{name: '{self.graph_name}'}})
-            OPTIONAL MATCH (d:Document)
-            WITH g, COUNT(d) as document_count
-            OPTIONAL MATCH (c:Concept)
-            WITH g, document_count, COUNT(c) as concept_count
-            OPTIONAL MATCH (n)
-            WITH g, document_count, concept_count, COUNT(n) as node_count
-            OPTIONAL MATCH ()-[r]->()
+            # Query for graph statistics, one subquery per count
+            stats_query = """
+            MATCH (g:KnowledgeGraph {name: $graph_name})
+            CALL {
+                MATCH (d:Document {graph_name: $graph_name})
+                RETURN count(d) as document_count
+            }
+            CALL {
+                MATCH (c:Concept {graph_name: $graph_name})
+                RETURN count(c) as concept_count
+            }
+            CALL {
+                MATCH (n {graph_name: $graph_name})
+                RETURN count(n) as node_count
+            }
+            CALL {
+                MATCH (n {graph_name: $graph_name})-[r]->()
+                RETURN count(r) as relationship_count
+            }
             RETURN g.name as graph_name,
                    g.description as description,
                    g.created_at as created_at,
                    g.updated_at as updated_at,
                    node_count,
-                   COUNT(r) as relationship_count,
+                   relationship_count,
                    document_count,
                    concept_count
             """
             
-            result = self.graph.query(stats_query)
+            result = self.graph.query(stats_query, {"graph_name": self.graph_name})
             
             if not result:
                 return {}
@@ -216,15 +318,18 @@ class GraphStore:
         
         try:
             # Create graph metadata node
-            create_query = f"""
-            MERGE (g:KnowledgeGraph {{name: '{name}'}})
+            create_query = """
+            MERGE (g:KnowledgeGraph {name: $name})
             ON CREATE SET g.created_at = datetime(),
                           g.updated_at = datetime(),
                           g.description = $description
             RETURN g.name as name
             """
             
-            result = self.graph.query(create_query, {"description": description or f"Knowledge graph: {name}"})
+            result = self.graph.query(create_query, {
+                "name": name,
+                "description": description or f"Knowledge graph: {name}"
+            })
             
             if result and result[0].get("name") == name:
                 logger.info(f"Created knowledge graph: {name}")
@@ -253,13 +358,13 @@ class GraphStore:
         
         try:
             # Delete all nodes and relationships in the graph
-            delete_query = f"""
+            delete_query = """
             MATCH (n)
-            WHERE n.graph_name = '{name}' OR n:KnowledgeGraph AND n.name = '{name}'
+            WHERE n.graph_name = $name OR (n:KnowledgeGraph AND n.name = $name)
             DETACH DELETE n
             """
             
-            self.graph.query(delete_query)
+            self.graph.query(delete_query, {"name": name})
             logger.info(f"Deleted knowledge graph: {name}")
             return True
                 
@@ -277,57 +382,68 @@ class GraphStore:
         Returns:
             str: Document ID if successful, None otherwise
         """
+        doc_ids = self.add_documents([document_data])
+        return doc_ids[0] if doc_ids else None
+    
+    def add_documents(self, docs: List[Dict[str, Any]]) -> List[str]:
+        """
+        Add a batch of documents to the knowledge graph in a single query.
+        
+        Args:
+            docs: List of dictionaries with document properties
+            
+        Returns:
+            List of IDs of the documents written, empty on failure
+        """
         if not self.graph:
             logger.error("Neo4j connection not available")
-            return None
+            return []
+        
+        if not docs:
+            return []
         
         try:
-            # Generate a unique ID if not provided
-            doc_id = document_data.get("id", str(uuid.uuid4()))
-            
-            # Create document node
-            create_query = f"""
-            MERGE (d:Document {{id: $id}})
-            ON CREATE SET d.created_at = datetime(),
-                          d.graph_name = '{self.graph_name}',
-                          d.url = $url,
-                          d.title = $title,
-                          d.content = $content,
-                          d.description = $description,
-                          d.fetched_at = $fetched_at
-            ON MATCH SET d.updated_at = datetime(),
-                         d.url = $url,
-                         d.title = $title,
-                         d.content = $content,
-                         d.description = $description,
-                         d.fetched_at = $fetched_at
+            # Normalise every document up front so the whole batch is one round-trip
+            fetched_at = datetime.now().isoformat()
+            rows = [
+                {
+                    "id": doc.get("id") or str(uuid.uuid4()),
+                    "url": doc.get("url", ""),
+                    "title": doc.get("title", "Untitled Document"),
+                    "content": doc.get("content", ""),
+                    "description": doc.get("description", ""),
+                    "fetched_at": doc.get("fetched_at", fetched_at)
+                }
+                for doc in docs
+            ]
+            
+            # Create or update all document nodes
+            create_query = """
+            UNWIND $rows AS row
+            MERGE (d:Document {id: row.id})
+            ON CREATE SET d += row,
+                          d.created_at = datetime(),
+                          d.graph_name = $graph_name
+            ON MATCH SET d += row,
+                         d.updated_at = datetime()
             WITH d
-            MATCH (g:KnowledgeGraph {{name: '{self.graph_name}'}})
+            MATCH (g:KnowledgeGraph {name: $graph_name})
             MERGE (g)-[:CONTAINS]->(d)
             RETURN d.id as id
             """
             
-            params = {
-                "id": doc_id,
-                "url": document_data.get("url", ""),
-                "title": document_data.get("title", "Untitled Document"),
-                "content": document_data.get("content", ""),
-                "description": document_data.get("description", ""),
-                "fetched_at": document_data.get("fetched_at", datetime.now().isoformat())
-            }
-            
-            result = self.graph.query(create_query, params)
+            result = self.graph.query(create_query, {"rows": rows, "graph_name": self.graph_name})
+            doc_ids = [row["id"] for row in result or [] if row.get("id")]
             
-            if result and result[0].get("id") == doc_id:
-                logger.info(f"Added document to graph {self.graph_name}: {doc_id}")
-                return doc_id
+            if doc_ids:
+                logger.info(f"Added {len(doc_ids)} document(s) to graph {self.graph_name}")
             else:
-                logger.error(f"Failed to add document: {doc_id}")
-                return None
+                logger.error(f"Failed to add {len(rows)} document(s) to graph {self.graph_name}")
+            return doc_ids
                 
         except Exception as e:
-            logger.error(f"Failed to add document: {e}")
-            return None
+            logger.error(f"Failed to add documents: {e}")
+            return []
     
     def extract_entities_from_documents(self, documents: List[Dict[str, Any]], llm_api_key: str = None) -> bool:
         """
@@ -431,19 +547,24 @@ class GraphStore:
                     }
                 ))
             
-            # Extract graph documents
-            graph_documents = llm_transformer.convert_to_graph_documents(langchain_docs)
+            # Extract graph documents on worker threads, bounding concurrent LLM
+            # requests. Threads keep this safe to call from inside an event loop.
+            if not langchain_docs:
+                return True
+            
+            with ThreadPoolExecutor(max_workers=min(LLM_CONCURRENCY, len(langchain_docs))) as executor:
+                graph_documents = list(executor.map(llm_transformer.process_response, langchain_docs))
             
-            # Add to graph
-            for graph_doc in graph_documents:
+            # Add to graph in a single write
+            if graph_documents:
                 self.graph.add_graph_documents(
-                    [graph_doc], 
+                    graph_documents, 
                     baseEntityLabel=True, 
                     include_source=True
                 )
                 
                 # Add graph name to all nodes
-                self._add_graph_name_to_nodes(graph_doc)
+                self._add_graph_name_to_nodes()
             
             return True
                 
@@ -451,17 +572,17 @@ class GraphStore:
             logger.error(f"Failed to extract entities: {e}")
             return False
     
-    def _add_graph_name_to_nodes(self, graph_doc):
+    def _add_graph_name_to_nodes(self):
         """Add graph name to all nodes to support multiple graphs."""
         try:
             # Add graph name to all nodes
-            query = f"""
+            query = """
             MATCH (n)
-            WHERE NOT n:KnowledgeGraph AND (n.graph_name IS NULL OR n.graph_name = '')
-            SET n.graph_name = '{self.graph_name}'
+            WHERE NOT n:KnowledgeGraph AND coalesce(n.graph_name, '') = ''
+            SET n.graph_name = $graph_name
             """
             
-            self.graph.query(query)
+            self.graph.query(query, {"graph_name": self.graph_name})
             
         except Exception as e:
             logger.error(f"Failed to add graph name to nodes: {e}")
@@ -481,12 +602,17 @@ class GraphStore:
             logger.error("Neo4j connection not available")
             return []
         
+        if not query or not query.strip():
+            return []
+        
         try:
-            # Use full-text search
-            search_query = f"""
-            CALL db.index.fulltext.queryNodes("document_content", $query) 
+            # Use full-text search, letting the index restrict hits to this graph.
+            # The exact graph_name check only guards against analyzer token overlap.
+            lucene_query = f"+graph_name:{_lucene_phrase(self.graph_name)} +content:({_lucene_escape(query)})"
+            search_query = """
+            CALL db.index.fulltext.queryNodes("document_content_graph", $query) 
             YIELD node, score
-            WHERE node.graph_name = '{self.graph_name}'
+            WHERE node.graph_name = $graph_name
             RETURN node.id as id,
                    node.title as title,
                    node.url as url,
@@ -497,7 +623,11 @@ class GraphStore:
             LIMIT $limit
             """
             
-            result = self.graph.query(search_query, {"query": query, "limit": limit})
+            result = self.graph.query(search_query, {
+                "query": lucene_query,
+                "limit": limit,
+                "graph_name": self.graph_name
+            })
             
             # Format timestamps
             for doc in result:
@@ -528,8 +658,8 @@ class GraphStore:
         
         try:
             # Query for document
-            query = f"""
-            MATCH (d:Document {{id: $id, graph_name: '{self.graph_name}'}})
+            query = """
+            MATCH (d:Document {id: $id, graph_name: $graph_name})
             RETURN d.id as id,
                    d.title as title,
                    d.url as url,
@@ -540,7 +670,7 @@ class GraphStore:
                    d.updated_at as updated_at
             """
             
-            result = self.graph.query(query, {"id": doc_id})
+            result = self.graph.query(query, {"id": doc_id, "graph_name": self.graph_name})
             
             if not result:
                 return None
@@ -574,25 +704,18 @@ class GraphStore:
         
         try:
             # Query for entities related to document
-            query = f"""
-            MATCH (d:Document {{id: $id, graph_name: '{self.graph_name}'}})-[r]->(e)
+            query = """
+            MATCH (d:Document {id: $id, graph_name: $graph_name})-[r]-(e)
             WHERE NOT e:Document AND NOT e:KnowledgeGraph
             RETURN e.id as id,
                    labels(e) as types,
                    e.name as name,
                    type(r) as relationship_type,
-                   properties(e) as properties
-            UNION
-            MATCH (e)-[r]->(d:Document {{id: $id, graph_name: '{self.graph_name}'}})
-            WHERE NOT e:Document AND NOT e:KnowledgeGraph
-            RETURN e.id as id,
-                   labels(e) as types,
-                   e.name as name,
-                   type(r) as relationship_type,
-                   properties(e) as properties
+                   properties(e) as properties,
+                   startNode(r) = d as outgoing
             """
             
-            result = self.graph.query(query, {"id": doc_id})
+            result = self.graph.query(query, {"id": doc_id, "graph_name": self.graph_name})
             
             # Clean up properties
             for entity in result:
@@ -635,10 +758,13 @@ class GraphStore:
             return {"nodes": [], "relationships": []}
         
         try:
+            # Variable-length bounds cannot be parameters, so only a clamped int is interpolated
+            depth = max(1, min(int(depth), 5))
+            
             # Query for concept and related entities
             query = f"""
-            MATCH path = (c {{name: $concept_name, graph_name: '{self.graph_name}'}})-[*1..{depth}]-(related)
-            WHERE related.graph_name = '{self.graph_name}'
+            MATCH path = (c {{name: $concept_name, graph_name: $graph_name}})-[*1..{depth}]-(related)
+            WHERE related.graph_name = $graph_name
             WITH c, related, [rel in relationships(path) | type(rel)] AS rel_types
             RETURN c.id as source_id,
                    c.name as source_name,
@@ -649,7 +775,7 @@ class GraphStore:
                    rel_types
             """
             
-            result = self.graph.query(query, {"concept_name": concept_name})
+            result = self.graph.query(query, {"concept_name": concept_name, "graph_name": self.graph_name})
             
             # Transform results into nodes and relationships
             nodes = {}
@@ -721,4 +847,7 @@ class GraphStore:
             
         except Exception as e:
             logger.error(f"Failed to execute custom query: {e}")
-            return []
\ No newline at end of file
+            return []
+
+
+atexit.register(GraphStore.close_all)
@@ -1,8 +1,9 @@
+import os
 import pytest
 import requests
 import time
 from unittest.mock import patch, MagicMock
-from github.client import GitHubClient, GitHubAPIError, RateLimitError
+from github.client import GitHubClient, GitHubAPIError, RateLimitError, EtagCache, get_shared_session
 from config.settings import GITHUB_API_URL, GITHUB_TIMEOUT
 
 
@@ -94,6 +95,49 @@ def test_get_repository_contents(mock_get, github_client):
     mock_get.assert_called_once()
 
 
+@patch("github.client.requests.Session.get")
+def test_get_tree_requests_recursive_listing(mock_get, github_client):
+    """Test that the whole tree is requested in one recursive call."""
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"tree": [{"path": "docs/a.md", "type": "blob"}], "truncated": False}
+    mock_get.return_value = mock_response
+
+    tree = github_client.get_tree("test_owner", "test_repo", "main")
+    assert tree["tree"][0]["path"] == "docs/a.md"
+    args, kwargs = mock_get.call_args
+    assert args[0].endswith("/repos/test_owner/test_repo/git/trees/main")
+    assert kwargs["params"] == {"recursive": 1}
+
+
+def test_scan_repository_structure_uses_one_tree_listing(github_client):
+    """Test that the structure scan is built from a single recursive tree listing."""
+    tree = {"truncated": False, "tree": [
+        {"path": "README.md", "type": "blob", "sha": "s1", "size": 10},
+        {"path": "docs", "type": "tree", "sha": "t1"},
+        {"path": "docs/api", "type": "tree", "sha": "t2"},
+        {"path": "docs/api/ref.md", "type": "blob", "sha": "s2", "size": 10},
+        {"path": "docs/guide.md", "type": "blob", "sha": "s3", "size": 10},
+        {"path": "node_modules", "type": "tree", "sha": "t3"},
+        {"path": "node_modules/pkg.md", "type": "blob", "sha": "s4", "size": 10},
+    ]}
+
+    with patch.object(github_client, "get_tree", return_value=tree) as mock_tree, \
+         patch.object(github_client, "get_repository_contents") as mock_contents:
+        result = github_client.scan_repository_structure("test_owner", "test_repo", "main")
+
+    mock_tree.assert_called_once_with("test_owner", "test_repo", "main", recursive=True)
+    mock_contents.assert_not_called()
+    assert result["relevant_paths"] == ["docs", "docs/api"]
+    assert result["relevant_files"] == 2
+    assert result["total_files"] == 6
+    assert result["structure"]["dirs"] == ["docs"]
+    assert result["structure_flat"]["docs"] is result["structure"]["docs"]["files"]
+    assert result["structure_flat"]["docs/api"][0]["download_url"] == (
+        "https://raw.githubusercontent.com/test_owner/test_repo/main/docs/api/ref.md"
+    )
+
+
 @patch("github.client.requests.Session.get")
 def test_get_repository_file(mock_get, github_client):
     """Test fetching a repository file."""
@@ -119,3 +163,206 @@ def test_get_repository_file(mock_get, github_client):
     # Verify the result
     assert file_content == "file content"
     assert mock_get.call_count == 2
+
+
+@patch("github.client.requests.Session.get")
+def test_get_uses_etag_cache_on_not_modified(mock_get, tmp_path):
+    """Test that a 304 response returns the body cached from the previous 200."""
+    github_client = GitHubClient(token="test_token", etag_cache=EtagCache(tmp_path))
+
+    first_response = MagicMock()
+    first_response.status_code = 200
+    first_response.headers = {"ETag": '"abc123"'}
+    first_response.json.return_value = [{"name": "repo1"}]
+
+    not_modified_response = MagicMock()
+    not_modified_response.status_code = 304
+    not_modified_response.headers = {}
+
+    mock_get.side_effect = [first_response, not_modified_response]
+
+    assert github_client.get("orgs/test_org/repos", {"page": 1}) == [{"name": "repo1"}]
+    assert github_client.get("orgs/test_org/repos", {"page": 1}) == [{"name": "repo1"}]
+
+    second_headers = mock_get.call_args_list[1].kwargs["headers"]
+    assert second_headers["If-None-Match"] == '"abc123"'
+    # Entries persist on disk for later runs
+    assert EtagCache(tmp_path).get(
+        EtagCache.make_key(f"{GITHUB_API_URL}/orgs/test_org/repos", {"page": 1}, "test_token")
+    )["etag"] == '"abc123"'
+
+
+def test_etag_cache_prunes_least_recently_used_entries(tmp_path):
+    """Test that the on-disk cache deletes the least recently used entries once over its size cap."""
+    etag_cache = EtagCache(tmp_path, max_bytes=2500)
+    body = ["x" * 1000]
+    etag_cache.set("first", '"1"', body)
+    etag_cache.set("second", '"2"', body)
+    # Age both entries, then touch the first so the second is the least recently used
+    for key, age in (("first", 20), ("second", 10)):
+        past = time.time() - age
+        os.utime(etag_cache._entry_path(key), (past, past))
+    etag_cache.get("first")
+
+    etag_cache.set("third", '"3"', body)
+
+    assert etag_cache.get("second") is None
+    assert etag_cache.get("first")["etag"] == '"1"'
+    assert etag_cache.get("third")["etag"] == '"3"'
+
+
+@patch("github.client.requests.Session.get")
+def test_etag_cache_skips_file_contents_and_scopes_by_token(mock_get, tmp_path):
+    """Test that file payloads are not cached and cached listings are not shared across tokens."""
+    etag_cache = EtagCache(tmp_path)
+    listing = MagicMock(status_code=200, headers={"ETag": '"list"'})
+    listing.json.return_value = [{"name": "repo1"}]
+    file_contents = MagicMock(status_code=200, headers={"ETag": '"file"'})
+    file_contents.json.return_value = {"type": "file", "content": "aGVsbG8="}
+    mock_get.side_effect = [file_contents, listing, listing]
+
+    client = GitHubClient(token="token_a", etag_cache=etag_cache)
+    client.get("repos/o/r/contents/README.md")
+    client.get("orgs/test_org/repos")
+    GitHubClient(token="token_b", etag_cache=etag_cache).get("orgs/test_org/repos")
+
+    assert len(list(tmp_path.glob("*.json"))) == 2
+    assert "If-None-Match" not in mock_get.call_args_list[2].kwargs["headers"]
+
+
+def test_shared_session_retries_statuses_only():
+    """Test that the pooled session leaves connection and read errors to the client's own retries."""
+    retry = get_shared_session().get_adapter("https://api.github.com").max_retries
+    assert (retry.connect, retry.read, retry.other) == (0, 0, 0)
+    assert 503 in retry.status_forcelist
+
+
+def test_clients_share_pooled_session():
+    """Test that clients reuse one pooled session unless one is supplied."""
+    first = GitHubClient(token="test_token")
+    second = GitHubClient()
+    assert first.session is second.session
+
+    custom_session = requests.Session()
+    assert GitHubClient(session=custom_session).session is custom_session
+
+
+def test_scan_repository_structure_encodes_raw_download_urls(github_client):
+    """Test that refs and paths are percent-encoded in raw download URLs."""
+    tree = {"truncated": False, "tree": [
+        {"path": "docs", "type": "tree", "sha": "t1"},
+        {"path": "docs/q#a?.md", "type": "blob", "sha": "s1", "size": 10},
+    ]}
+
+    with patch.object(github_client, "get_tree", return_value=tree):
+        result = github_client.scan_repository_structure("test_owner", "test_repo", "feature/x")
+
+    assert result["structure_flat"]["docs"][0]["download_url"] == (
+        "https://raw.githubusercontent.com/test_owner/test_repo/feature%2Fx/docs/q%23a%3F.md"
+    )
+
+
+@patch("github.client.requests.Session.get")
+def test_download_repository_file_streams_to_disk(mock_get, github_client, tmp_path):
+    """Test that file downloads are streamed to disk in chunks."""
+    mock_content_response = MagicMock()
+    mock_content_response.status_code = 200
+    mock_content_response.json.return_value = {
+        "download_url": "http://example.com/file"
+    }
+
+    mock_download_response = MagicMock()
+    mock_download_response.iter_content.return_value = [b"file ", b"", b"content"]
+
+    mock_get.side_effect = [mock_content_response, mock_download_response]
+    local_path = tmp_path / "file.md"
+
+    written = github_client.download_repository_file(
+        "test_owner", "test_repo", "test_path", str(local_path)
+    )
+
+    assert written == len(b"file content")
+    assert local_path.read_bytes() == b"file content"
+    assert mock_get.call_args_list[1].kwargs["stream"] is True
+    mock_download_response.close.assert_called_once()
+
+
+@patch("github.client.requests.Session.get")
+def test_failed_download_releases_connection(mock_get, github_client, tmp_path):
+    """Test that a failed streamed download is closed so its connection returns to the pool."""
+    mock_content_response = MagicMock()
+    mock_content_response.status_code = 200
+    mock_content_response.json.return_value = {
+        "download_url": "http://example.com/file"
+    }
+
+    mock_download_response = MagicMock()
+    mock_download_response.ok = False
+    mock_download_response.raise_for_status.side_effect = requests.HTTPError("404")
+
+    mock_get.side_effect = [mock_content_response, mock_download_response]
+
+    with pytest.raises(GitHubAPIError):
+        github_client.download_repository_file(
+            "test_owner", "test_repo", "test_path", str(tmp_path / "file.md")
+        )
+
+    mock_download_response.close.assert_called_once()
+
+
+@patch("github.client.requests.Session.get")
+def test_interrupted_download_leaves_no_partial_file(mock_get, github_client, tmp_path):
+    """Test that a transfer failing part-way leaves neither a truncated file nor a .part file."""
+    def broken_stream(chunk_size):
+        yield b"partial"
+        raise requests.ConnectionError("connection reset")
+
+    mock_download_response = MagicMock()
+    mock_download_response.iter_content.side_effect = broken_stream
+    mock_get.return_value = mock_download_response
+    local_path = tmp_path / "file.md"
+
+    with pytest.raises(GitHubAPIError):
+        github_client.download_repository_file(
+            "test_owner", "test_repo", "test_path", str(local_path),
+            download_url="http://example.com/file"
+        )
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@patch("github.client.requests.Session.get")
+def test_download_repository_file_uses_known_download_url(mock_get, github_client, tmp_path):
+    """Test that a download URL from the scan skips the contents API lookup."""
+    mock_download_response = MagicMock()
+    mock_download_response.iter_content.return_value = [b"content"]
+    mock_get.return_value = mock_download_response
+
+    written = github_client.download_repository_file(
+        "test_owner", "test_repo", "test_path", str(tmp_path / "file.md"),
+        download_url="http://example.com/file"
+    )
+
+    assert written == len(b"content")
+    mock_get.assert_called_once()
+    assert mock_get.call_args.args[0] == "http://example.com/file"
+
+
+@patch("github.client.requests.Session.get")
+def test_download_pacing_waits_outside_the_lock(mock_get, github_client):
+    """Test that a paced download reserves its start slot and sleeps without holding the lock."""
+    mock_get.return_value = MagicMock(ok=True)
+    GitHubClient.last_download_time = time.monotonic()
+    lock_free_while_sleeping = []
+
+    def fake_sleep(seconds):
+        acquired = GitHubClient.download_lock.acquire(blocking=False)
+        lock_free_while_sleeping.append(acquired)
+        if acquired:
+            GitHubClient.download_lock.release()
+
+    with patch("github.client.time.sleep", side_effect=fake_sleep) as mock_sleep:
+        github_client._request_download("docs/a.md", "https://raw.example.com/a.md")
+
+    assert mock_sleep.call_count == 1
+    assert lock_free_while_sleeping == [True]
@@ -121,3 +121,409 @@ def test_fetch_org_repositories_cancels_midway():
     
     # Verify callback was called with progress
     progress_callback.assert_any_call(50, "Fetched 100/200 repositories")
+
+
+def test_fetch_multiple_repositories_downloads_all_files(tmp_path):
+    """Test the scan and download phases end to end against a mocked GitHub client."""
+    from github.repository import RepositoryFetcher
+
+    mock_client = MagicMock()
+    mock_client.token = None
+    mock_client.get.return_value = {"public_repos": 2}
+    mock_client.get_organization_repos.return_value = [
+        {"name": "repo1", "owner": {"login": "mock_org"}, "default_branch": "main"},
+        {"name": "repo2", "owner": {"login": "mock_org"}, "default_branch": "main"},
+    ]
+    def fake_scan(owner, repo, ref=None):
+        files = [
+            {"name": "a.md", "path": "docs/a.md", "sha": f"{repo}-1", "size": 10,
+             "download_url": "https://raw.example.com/docs/a.md"},
+            {"name": "b.md", "path": "docs/b.md", "sha": f"{repo}-2", "size": 10},
+        ]
+        return {
+            "total_files": 2,
+            "relevant_files": 2,
+            "relevant_paths": ["docs"],
+            "structure": {"docs": {"files": files}},
+            "structure_flat": {"docs": files},
+        }
+
+    mock_client.scan_repository_structure.side_effect = fake_scan
+    download_urls = {}
+
+    def fake_download(owner, repo, path, local_path, ref=None, download_url=None):
+        download_urls[(repo, path)] = download_url
+        with open(local_path, "w") as f:
+            f.write("content")
+        return len("content")
+
+    mock_client.download_repository_file.side_effect = fake_download
+
+    repo_fetcher = RepositoryFetcher(client=mock_client)
+    repo_fetcher.cache_dir = tmp_path
+    content_fetcher = ContentFetcher()
+    content_fetcher.repo_fetcher = repo_fetcher
+    content_fetcher.github_client = mock_client
+    progress_mock = MagicMock()
+
+    content = content_fetcher.fetch_multiple_repositories("mock_org", progress_callback=progress_mock)
+
+    assert sorted(item["local_path"] for item in content) == sorted(
+        str(tmp_path / "mock_org" / repo / "docs" / name)
+        for repo in ("repo1", "repo2") for name in ("a.md", "b.md")
+    )
+    assert (tmp_path / "mock_org" / "repo1" / "docs" / "a.md").read_text() == "content"
+    # Scanned raw URLs are handed to the client so it can skip the contents lookup
+    assert download_urls[("repo1", "docs/a.md")] == "https://raw.example.com/docs/a.md"
+    assert download_urls[("repo1", "docs/b.md")] is None
+    # Progress is driven monotonically to completion
+    reported = [c.args[0] for c in progress_mock.call_args_list]
+    assert reported == sorted(reported)
+    assert reported[-1] == 100
+
+    # Results can be streamed to a sink instead of collected
+    streamed = []
+    assert content_fetcher.fetch_multiple_repositories("mock_org", sink=streamed.append) == []
+    assert sorted(item["local_path"] for item in streamed) == sorted(
+        item["local_path"] for item in content
+    )
+
+
+def test_fetch_content_for_dataset_parses_repo_url(content_fetcher, mock_repo_fetcher):
+    """Test that a trailing .git suffix is removed without eating repository name characters."""
+    mock_repo_fetcher.return_value.fetch_relevant_content.return_value = []
+
+    content_fetcher.fetch_content_for_dataset("https://github.com/mock_org/digit.git")
+
+    args = mock_repo_fetcher.return_value.fetch_relevant_content.call_args.args
+    assert args[:2] == ("mock_org", "digit")
+
+
+def test_fetch_multiple_repositories_fails_task_only_for_operational_errors(content_fetcher):
+    """Test that API errors fail the task while programming errors leave it untouched."""
+    content_fetcher.task_tracker = MagicMock()
+    content_fetcher.task_tracker.create_task.return_value = "task"
+
+    with patch.object(content_fetcher, "iter_organization_repositories",
+                      side_effect=GitHubAPIError("boom")):
+        with pytest.raises(GitHubAPIError):
+            content_fetcher.fetch_multiple_repositories("mock_org")
+    content_fetcher.task_tracker.complete_task.assert_called_once_with(
+        "task", success=False, result={"error": "boom"}
+    )
+
+    content_fetcher.task_tracker.reset_mock()
+    with patch.object(content_fetcher, "iter_organization_repositories",
+                      side_effect=KeyError("owner")):
+        with pytest.raises(KeyError):
+            content_fetcher.fetch_multiple_repositories("mock_org")
+    content_fetcher.task_tracker.complete_task.assert_not_called()
+
+
+def test_status_display_wakes_on_queue_change_and_stops(capsys):
+    """Test that the status display reacts to queue changes and stops promptly."""
+    from github.repository import DownloadQueue
+
+    content_fetcher = ContentFetcher()
+    content_fetcher.repo_fetcher.download_queue = DownloadQueue()
+    content_fetcher._start_status_display()
+
+    content_fetcher.repo_fetcher.download_queue.add_files([{"path": "a.md"}, {"path": "b.md"}])
+    deadline = time.time() + 2
+    while not content_fetcher.current_status and time.time() < deadline:
+        time.sleep(0.01)
+
+    content_fetcher._stop_status_display()
+    content_fetcher.status_thread.join(timeout=1)
+
+    assert content_fetcher.current_status.startswith("Downloading: 2 Files")
+    assert not content_fetcher.status_thread.is_alive()
+    # Stopping again is a no-op
+    content_fetcher._stop_status_display()
+    # Captured stdout is not a terminal, so nothing is drawn
+    assert capsys.readouterr().out == ""
+
+
+def test_maybe_update_task_coalesces_small_updates(content_fetcher):
+    """Test that tiny progress changes are dropped but stage/status changes are written."""
+    content_fetcher.task_tracker = MagicMock()
+
+    assert content_fetcher._maybe_update_task("task", 10, stage="downloading_files")
+    assert not content_fetcher._maybe_update_task("task", 10.5, stage="downloading_files")
+    assert content_fetcher._maybe_update_task("task", 12, stage="downloading_files")
+    assert content_fetcher._maybe_update_task("task", 12.1, stage="complete")
+    assert content_fetcher._maybe_update_task("task", 12.1, stage="complete", status="completed")
+
+    assert content_fetcher._tracker_writer.flush()
+    assert content_fetcher.task_tracker.update_task_progress.call_count == 4
+
+
+def test_task_tracker_writer_merges_progress_and_keeps_order():
+    """Queued progress updates for one stage collapse to the latest; order is preserved."""
+    from github.content_fetcher import _TaskTrackerWriter
+
+    tracker = MagicMock()
+    tracker.update_task_progress.__name__ = "update_task_progress"
+    writer = _TaskTrackerWriter()
+    started = threading.Event()
+    gate = threading.Event()
+
+    def hold():
+        started.set()
+        gate.wait(5)
+
+    # Hold the writer thread so the following updates land in one batch
+    writer.submit(hold)
+    assert started.wait(5)
+    for progress in (21, 22, 23):
+        writer.submit(tracker.update_task_progress, "task", progress, stage="downloading_files")
+    writer.submit(tracker.update_task_progress, "task", 100, stage="complete", status="completed")
+    gate.set()
+
+    assert writer.flush()
+    assert [c.args[1] for c in tracker.update_task_progress.call_args_list] == [23, 100]
+
+
+def test_iter_completed_yields_in_completion_order_and_stops_on_cancel():
+    """Test that futures are yielded as they finish and cancellation stops the wait."""
+    from concurrent.futures import ThreadPoolExecutor
+    from github.content_fetcher import _iter_completed
+
+    release_slow = threading.Event()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        slow = executor.submit(release_slow.wait, 5)
+        fast = executor.submit(lambda: "fast")
+
+        cancel_event = threading.Event()
+        completed = []
+        for future in _iter_completed([slow, fast], cancel_event, poll_interval=0.05):
+            completed.append(future)
+            cancel_event.set()
+
+        release_slow.set()
+
+    assert completed == [fast]
+
+
+def test_iter_organization_repositories_yields_pages(content_fetcher):
+    """Test that organization repositories are yielded one page at a time."""
+    content_fetcher.github_token = None
+    content_fetcher.github_client = MagicMock()
+    content_fetcher.github_client.get.return_value = {"public_repos": 101}
+    first_page = [{"name": f"repo{i}"} for i in range(100)]
+    content_fetcher.github_client.get_organization_repos.side_effect = [first_page, [{"name": "last"}]]
+
+    pages = content_fetcher.iter_organization_repositories("mock_org")
+
+    assert next(pages) == first_page
+    assert content_fetcher.github_client.get_organization_repos.call_count == 1
+    assert next(pages) == [{"name": "last"}]
+    assert list(pages) == []
+
+
+def test_get_github_instructions_is_cached_in_memory_and_on_disk(content_fetcher, tmp_path):
+    """Repeated AI guidance requests reuse the first LLM answer."""
+    from github.content_fetcher import _get_github_instructions_cached
+
+    _get_github_instructions_cached.cache_clear()
+    content_fetcher.repo_fetcher.cache_dir = tmp_path
+    instructions = {"file_patterns": ["*.md"], "max_files": 10}
+
+    with patch("utils.llm_client.LLMClient") as MockLLMClient:
+        MockLLMClient.return_value.generate_github_instructions.return_value = instructions
+        first = content_fetcher.get_github_instructions("docs only", "https://github.com/o/r")
+        second = content_fetcher.get_github_instructions("docs only", "https://github.com/o/r")
+        assert MockLLMClient.return_value.generate_github_instructions.call_count == 1
+
+        # A fresh process only has the disk cache
+        _get_github_instructions_cached.cache_clear()
+        third = content_fetcher.get_github_instructions("docs only", "https://github.com/o/r")
+        assert MockLLMClient.return_value.generate_github_instructions.call_count == 1
+
+    assert first == second == third == instructions
+    assert (tmp_path / "llm_instructions.json").exists()
+
+
+def test_get_executor_installs_chained_signal_handlers(monkeypatch):
+    """Signal handlers flag shutdown without taking locks and defer to the previous handler."""
+    import signal
+    import github.content_fetcher as content_fetcher_module
+
+    monkeypatch.setattr(content_fetcher_module, "_global_executor", None)
+    monkeypatch.setattr(content_fetcher_module, "_signal_handlers_installed", False)
+    monkeypatch.setattr(content_fetcher_module, "_shutdown_event", threading.Event())
+    calls = []
+
+    def previous(signum, frame):
+        calls.append(signum)
+
+    original_term = signal.signal(signal.SIGTERM, previous)
+    original_int = signal.getsignal(signal.SIGINT)
+    try:
+        executor = content_fetcher_module.get_executor(max_workers=1)
+        handler = signal.getsignal(signal.SIGTERM)
+        assert handler is not previous
+
+        # The signal may land while the main thread holds the download pool lock
+        with content_fetcher_module._download_executor_lock:
+            signal_thread = threading.Thread(target=handler, args=(signal.SIGTERM, None))
+            signal_thread.start()
+            signal_thread.join(timeout=5)
+            assert not signal_thread.is_alive()
+
+        assert calls == [signal.SIGTERM]
+        # Running fetches see the shutdown flag; the pools are released at exit
+        assert content_fetcher_module._shutdown_event.is_set()
+        assert content_fetcher_module._global_executor is executor
+        # The process survived the signal, so the next fetch starts normally
+        content_fetcher_module._rearm_shutdown_flag()
+        assert not content_fetcher_module._shutdown_event.is_set()
+        executor.shutdown()
+    finally:
+        signal.signal(signal.SIGTERM, original_term)
+        signal.signal(signal.SIGINT, original_int)
+
+
+def test_signal_handlers_leave_ignored_signals_alone(monkeypatch):
+    """Ignored signals stay ignored, and a real executor shutdown is not re-armed."""
+    import signal
+    import github.content_fetcher as content_fetcher_module
+
+    monkeypatch.setattr(content_fetcher_module, "_signal_handlers_installed", False)
+    monkeypatch.setattr(content_fetcher_module, "_shutdown_event", threading.Event())
+    monkeypatch.setattr(content_fetcher_module, "_global_executor", None)
+    monkeypatch.setattr(content_fetcher_module, "_download_executor", None)
+    monkeypatch.setattr(content_fetcher_module, "_executors_shut_down", False)
+
+    original_term = signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    original_int = signal.getsignal(signal.SIGINT)
+    try:
+        content_fetcher_module._install_signal_handlers()
+        assert signal.getsignal(signal.SIGTERM) == signal.SIG_IGN
+
+        content_fetcher_module.shutdown_executor()
+        content_fetcher_module._rearm_shutdown_flag()
+        assert content_fetcher_module._shutdown_event.is_set()
+    finally:
+        signal.signal(signal.SIGTERM, original_term)
+        signal.signal(signal.SIGINT, original_int)
+
+
+def test_download_executor_is_shared_until_shutdown(monkeypatch):
+    """The download pool is created once and recreated only after shutdown."""
+    import github.content_fetcher as content_fetcher_module
+
+    monkeypatch.setattr(content_fetcher_module, "_global_executor", None)
+    monkeypatch.setattr(content_fetcher_module, "_download_executor", None)
+    monkeypatch.setattr(content_fetcher_module, "_signal_handlers_installed", True)
+    monkeypatch.setattr(content_fetcher_module, "_shutdown_event", threading.Event())
+
+    pool = content_fetcher_module.get_download_executor()
+    assert content_fetcher_module.get_download_executor() is pool
+
+    content_fetcher_module.shutdown_executor()
+    assert content_fetcher_module._download_executor is None
+    assert content_fetcher_module.get_download_executor() is not pool
+    content_fetcher_module.shutdown_executor()
+
+
+def test_submit_scan_shares_in_flight_futures(content_fetcher):
+    """Identical scans submitted while one is running share a single future."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    release = threading.Event()
+    calls = []
+
+    def scan(repo):
+        calls.append(repo)
+        release.wait(5)
+        return repo
+
+    key = ("owner", "repo", "main")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = content_fetcher._submit_scan(executor, key, scan, "repo")
+        second = content_fetcher._submit_scan(executor, key, scan, "repo")
+        assert first is second
+
+        release.set()
+        assert first.result(timeout=5) == "repo"
+
+    assert calls == ["repo"]
+    import github.content_fetcher as content_fetcher_module
+    assert content_fetcher_module._inflight_scans == {}
+
+
+def test_overlapping_fetches_share_scans_and_keep_separate_queues(tmp_path):
+    """Two fetchers running at once scan each repository once and each get every file."""
+    from github.repository import RepositoryFetcher
+
+    mock_client = MagicMock()
+    mock_client.token = None
+    mock_client.get_organization_repos.return_value = [
+        {"name": "repo1", "owner": {"login": "mock_org"}, "default_branch": "main"},
+        {"name": "repo2", "owner": {"login": "mock_org"}, "default_branch": "main"},
+    ]
+    release = threading.Event()
+    scanned = []
+
+    def fake_scan(owner, repo, ref=None):
+        scanned.append(repo)
+        release.wait(5)
+        files = [{"name": "a.md", "path": "docs/a.md", "sha": f"{repo}-1", "size": 10}]
+        return {
+            "total_files": 1,
+            "relevant_files": 1,
+            "relevant_paths": ["docs"],
+            "structure": {"docs": {"files": files}},
+            "structure_flat": {"docs": files},
+        }
+
+    def fake_download(owner, repo, path, local_path, ref=None, download_url=None):
+        with open(local_path, "w") as f:
+            f.write("content")
+        return len("content")
+
+    mock_client.scan_repository_structure.side_effect = fake_scan
+    mock_client.download_repository_file.side_effect = fake_download
+
+    submitted = []
+    original_submit = ContentFetcher._submit_scan
+
+    def record_submit(self, executor, key, fn, *args):
+        future = original_submit(self, executor, key, fn, *args)
+        submitted.append(key)
+        return future
+
+    fetchers = []
+    for _ in range(2):
+        repo_fetcher = RepositoryFetcher(client=mock_client)
+        repo_fetcher.cache_dir = tmp_path
+        fetcher = ContentFetcher()
+        fetcher.repo_fetcher = repo_fetcher
+        fetcher.github_client = mock_client
+        fetchers.append(fetcher)
+
+    results = {}
+
+    def run(index):
+        results[index] = fetchers[index].fetch_multiple_repositories("mock_org")
+
+    with patch.object(ContentFetcher, "_submit_scan", record_submit):
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        # Hold the scans until both fetches have submitted theirs
+        deadline = time.monotonic() + 5
+        while len(submitted) < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=10)
+
+    assert len(submitted) == 4
+    assert sorted(scanned) == ["repo1", "repo2"]
+    expected = sorted(
+        str(tmp_path / "mock_org" / repo / "docs" / "a.md") for repo in ("repo1", "repo2")
+    )
+    for index in range(2):
+        assert sorted(item["local_path"] for item in results[index]) == expected
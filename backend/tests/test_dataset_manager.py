@@ -81,6 +81,7 @@ def test_delete_dataset_no_token():
 def test_download_dataset_metadata_with_metadata_json(
     dataset_manager, mock_hf_api, tmp_path
 ):
+    mock_hf_api.list_repo_files.return_value = ["README.md", "metadata.json"]
     mock_hf_api.hf_hub_download.return_value = True
 
     result = dataset_manager.download_dataset_metadata("dataset1", output_dir=tmp_path)
@@ -118,6 +119,29 @@ def test_download_dataset_metadata_no_metadata_json(
         assert metadata["tags"] == ["tag1", "tag2"]
 
 
+def test_download_dataset_metadata_skips_missing_sources(
+    dataset_manager, mock_hf_api, tmp_path
+):
+    mock_hf_api.list_repo_files.return_value = ["data/train.parquet"]
+    mock_hf_api.dataset_info.return_value = MagicMock(
+        id="dataset1",
+        description="Test dataset",
+        created_at=None,
+        last_modified=None,
+        tags=[],
+        downloads=0,
+        likes=0,
+    )
+
+    with patch("huggingface.dataset_manager.DatasetCard.load") as mock_card_load:
+        result = dataset_manager.download_dataset_metadata("dataset1", output_dir=tmp_path)
+
+    assert result is True
+    mock_hf_api.hf_hub_download.assert_not_called()
+    mock_card_load.assert_not_called()
+    assert (tmp_path / "dataset_info.json").exists()
+
+
 def test_download_dataset_metadata_error(dataset_manager, mock_hf_api):
     mock_hf_api.hf_hub_download.side_effect = Exception("Error")
     mock_hf_api.dataset_info.side_effect = Exception("Error")
@@ -125,3 +149,42 @@ def test_download_dataset_metadata_error(dataset_manager, mock_hf_api):
     result = dataset_manager.download_dataset_metadata("dataset1")
 
     assert result is False
+
+
+def test_get_dataset_info_reuses_recent_lookup(dataset_manager, mock_hf_api):
+    mock_hf_api.dataset_info.return_value = {"id": "dataset1"}
+
+    dataset_manager.get_dataset_info("dataset1")
+    info = dataset_manager.get_dataset_info("dataset1")
+
+    assert info["id"] == "dataset1"
+    mock_hf_api.dataset_info.assert_called_once_with("dataset1")
+
+
+def test_delete_dataset_invalidates_cached_info(dataset_manager, mock_hf_api):
+    mock_hf_api.dataset_info.return_value = {"id": "dataset1"}
+    dataset_manager.get_dataset_info("dataset1")
+
+    dataset_manager.delete_dataset("dataset1")
+    dataset_manager.get_dataset_info("dataset1")
+
+    assert mock_hf_api.dataset_info.call_count == 2
+
+
+def test_download_many_metadata(dataset_manager, mock_hf_api, tmp_path):
+    def fake_download(repo_id, **kwargs):
+        if repo_id == "user/missing":
+            raise Exception("Not found")
+        return True
+
+    mock_hf_api.list_repo_files.return_value = ["metadata.json"]
+    mock_hf_api.hf_hub_download.side_effect = fake_download
+    mock_hf_api.dataset_info.side_effect = Exception("Not found")
+
+    results = dataset_manager.download_many_metadata(
+        ["user/one", "user/two", "user/missing"], output_dir=tmp_path
+    )
+
+    assert results == {"user/one": True, "user/two": True, "user/missing": False}
+    assert (tmp_path / "user" / "two").is_dir()
+    assert mock_hf_api.hf_hub_download.call_count == 3
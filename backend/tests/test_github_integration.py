@@ -2,6 +2,7 @@ import unittest
 import os
 import sys
 import re
+import time
 import tempfile
 from unittest.mock import MagicMock, patch
 from pathlib import Path
@@ -9,7 +10,7 @@ from pathlib import Path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from github.client import GitHubClient, GitHubAPIError
-from github.repository import RepositoryFetcher
+from github.repository import RepositoryFetcher, FileItem, _format_time_remaining
 from github.content_fetcher import ContentFetcher
 from utils.llm_client import LLMClient, GitHubInstructionsSchema
 
@@ -150,6 +151,10 @@ class TestGitHubOrganizationIntegration(unittest.TestCase):
                 }
             }
         }
+        self.sample_structure["structure_flat"] = {
+            path: self.sample_structure["structure"][path]["files"]
+            for path in ("docs", "examples")
+        }
 
     def tearDown(self):
         """Tear down test fixtures."""
@@ -308,6 +313,136 @@ class TestGitHubOrganizationIntegration(unittest.TestCase):
         self.assertFalse(self.repo_fetcher._is_relevant_folder("tests"))  # In exclude
         self.assertFalse(self.repo_fetcher._is_relevant_folder("src"))  # Not in include
 
+    def test_download_single_file_recreates_removed_directory(self):
+        """Test that a cached parent directory removed by a cache clear is recreated."""
+        local_path = Path(self.temp_dir.name) / "test-user" / "test-repo" / "docs" / "a.md"
+
+        def fake_download(owner, repo, path, local_path, ref=None, download_url=None):
+            Path(local_path).write_text("content")
+            return len("content")
+
+        self.mock_client.download_repository_file.side_effect = fake_download
+
+        first = self.repo_fetcher._download_single_file(
+            "test-user", "test-repo", "docs/a.md", "main", str(local_path)
+        )
+        # Simulate the cache being cleared between downloads
+        local_path.unlink()
+        local_path.parent.rmdir()
+        second = self.repo_fetcher._download_single_file(
+            "test-user", "test-repo", "docs/a.md", "main", str(local_path)
+        )
+
+        self.assertEqual(first["size"], len("content"))
+        self.assertEqual(second["size"], len("content"))
+        self.assertEqual(local_path.read_text(), "content")
+
+    def test_download_single_file_reuses_cached_blob(self):
+        """Test that a blob downloaded before is reused instead of fetched again."""
+        base = Path(self.temp_dir.name)
+
+        def fake_download(owner, repo, path, local_path, ref=None, download_url=None):
+            Path(local_path).write_text("content")
+            return len("content")
+
+        self.mock_client.download_repository_file.side_effect = fake_download
+
+        first_path = base / "test-user" / "test-repo" / "README.md"
+        fork_path = base / "test-user" / "test-fork" / "README.md"
+        self.repo_fetcher._download_single_file(
+            "test-user", "test-repo", "README.md", "main", str(first_path), sha="abc123"
+        )
+        again = self.repo_fetcher._download_single_file(
+            "test-user", "test-repo", "README.md", "main", str(first_path), sha="abc123"
+        )
+        fork = self.repo_fetcher._download_single_file(
+            "test-user", "test-fork", "README.md", "main", str(fork_path), sha="abc123"
+        )
+
+        self.assertEqual(self.mock_client.download_repository_file.call_count, 1)
+        self.assertEqual(again["size"], len("content"))
+        self.assertEqual(fork["repo"], "test-user/test-fork")
+        self.assertEqual(fork_path.read_text(), "content")
+
+    def test_download_single_file_coalesces_concurrent_blob_downloads(self):
+        """Test that threads wanting the same blob wait for one download instead of repeating it."""
+        import threading
+        base = Path(self.temp_dir.name)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_download(owner, repo, path, local_path, ref=None, download_url=None):
+            started.set()
+            release.wait(5)
+            Path(local_path).write_text("content")
+            return len("content")
+
+        self.mock_client.download_repository_file.side_effect = slow_download
+        results = {}
+
+        def fetch(repo):
+            results[repo] = self.repo_fetcher._download_single_file(
+                "test-user", repo, "README.md", "main", str(base / repo / "README.md"), sha="abc123"
+            )
+
+        first = threading.Thread(target=fetch, args=("test-repo",))
+        first.start()
+        started.wait(5)
+        second = threading.Thread(target=fetch, args=("test-fork",))
+        second.start()
+        release.set()
+        first.join(5)
+        second.join(5)
+
+        self.assertEqual(self.mock_client.download_repository_file.call_count, 1)
+        self.assertEqual(results["test-fork"]["size"], len("content"))
+        self.assertEqual((base / "test-fork" / "README.md").read_text(), "content")
+
+    def test_download_single_file_logs_failures_to_one_file(self):
+        """Test that failed downloads are appended to one log instead of per-file markers."""
+        import json
+        base = Path(self.temp_dir.name)
+        self.mock_client.download_repository_file.side_effect = GitHubAPIError("Not Found")
+
+        for name in ("a.md", "b.md"):
+            result = self.repo_fetcher._download_single_file(
+                "test-user", "test-repo", f"docs/{name}", "main", str(base / "docs" / name)
+            )
+            self.assertIsNone(result)
+
+        records = [json.loads(line) for line in
+                   (base / "download_errors.jsonl").read_text().splitlines()]
+        self.assertEqual([record["path"] for record in records], ["docs/a.md", "docs/b.md"])
+        self.assertEqual(list((base / "docs").glob("*.error")), [])
+
+    def test_download_queued_files_returns_on_cancel_without_waiting(self):
+        """Test that cancelling returns while a started download is still running."""
+        import threading
+        cancel = threading.Event()
+        release = threading.Event()
+
+        def blocked_download(owner, repo, path, local_path, ref=None, download_url=None):
+            cancel.set()
+            release.wait(5)
+            return 0
+
+        self.mock_client.download_repository_file.side_effect = blocked_download
+        queue = self.repo_fetcher.download_queue
+        queue.reset()
+        base = Path(self.temp_dir.name)
+        queue.add_file(FileItem(owner="test-user", repo="test-repo", path="docs/a.md", branch="main",
+                                local_path=str(base / "docs" / "a.md"), url="https://raw.example.com/a.md"))
+
+        started = time.monotonic()
+        result = self.repo_fetcher._download_queued_files(
+            "test-user", "test-repo", "main", _cancellation_event=cancel
+        )
+        elapsed = time.monotonic() - started
+        release.set()
+
+        self.assertEqual(result, [])
+        self.assertLess(elapsed, 3)
+
     def test_download_queued_files_with_max_files(self):
         """Test downloading queued files with max_files limit."""
         # Add more files than max_files
@@ -315,13 +450,13 @@ class TestGitHubOrganizationIntegration(unittest.TestCase):
         
         # Add test files to queue
         for i in range(10):
-            self.repo_fetcher.download_queue.add_file({
-                "owner": "test-user",
-                "repo": "test-repo",
-                "path": f"file{i}.md",
-                "branch": "main",
-                "local_path": f"/tmp/file{i}.md"
-            })
+            self.repo_fetcher.download_queue.add_file(FileItem(
+                owner="test-user",
+                repo="test-repo",
+                path=f"file{i}.md",
+                branch="main",
+                local_path=f"/tmp/file{i}.md"
+            ))
         
         # Configure mock client for file content
         self.mock_client.get_repository_file.return_value = "Sample file content"
@@ -342,6 +477,148 @@ class TestGitHubOrganizationIntegration(unittest.TestCase):
             self.assertEqual(len(result), max_files)
             self.assertEqual(mock_write.call_count, max_files)
 
+    def test_download_queued_files_batches_blob_reads(self):
+        """Test that small files are read through GraphQL and the rest downloaded raw."""
+        self.mock_client.token = "test_token"
+        self.mock_client.graphql.return_value = {"repository": {
+            "f0": {"text": "# A", "byteSize": 3, "isBinary": False, "isTruncated": False},
+            "f1": {"text": None, "byteSize": 10, "isBinary": True, "isTruncated": False},
+        }}
+
+        def fake_download(owner, repo, path, local_path, ref=None, download_url=None):
+            Path(local_path).write_bytes(b"raw")
+            return 3
+
+        self.mock_client.download_repository_file.side_effect = fake_download
+        base = Path(self.temp_dir.name) / "test-user" / "test-repo"
+        queue = self.repo_fetcher.download_queue
+        queue.reset()
+        queue.add_files([
+            FileItem(owner="test-user", repo="test-repo", path=f"docs/{name}", branch="main",
+                     local_path=str(base / "docs" / name), sha=f"sha-{name}", name=name, size=10)
+            for name in ("a.md", "b.bin")
+        ])
+
+        result = self.repo_fetcher._download_queued_files("test-user", "test-repo", "main")
+
+        self.assertEqual(sorted(item["path"] for item in result), ["docs/a.md", "docs/b.bin"])
+        self.assertEqual(self.mock_client.graphql.call_count, 1)
+        self.assertEqual(self.mock_client.download_repository_file.call_count, 1)
+        self.assertEqual((base / "docs" / "a.md").read_text(), "# A")
+        self.assertEqual(queue.processed_files, 2)
+
+    def test_fetch_tree_content_filters_flat_tree(self):
+        """Test that the tree fallback downloads only relevant text files."""
+        self.mock_client.get_tree.return_value = {"truncated": False, "tree": [
+            {"path": "README.md", "type": "blob", "sha": "s1", "size": 10},
+            {"path": "docs", "type": "tree", "sha": "t1"},
+            {"path": "docs/guide.md", "type": "blob", "sha": "s2", "size": 10},
+            {"path": "docs/logo.png", "type": "blob", "sha": "s3", "size": 10},
+            {"path": "docs/node_modules/pkg.md", "type": "blob", "sha": "s4", "size": 10},
+            {"path": "src/examples/demo.py", "type": "blob", "sha": "s5", "size": 10},
+        ]}
+
+        def fake_download(owner, repo, path, local_path, ref=None, download_url=None):
+            Path(local_path).write_text("content")
+            return len("content")
+
+        self.mock_client.download_repository_file.side_effect = fake_download
+        base = Path(self.temp_dir.name) / "test-user" / "test-repo"
+
+        result = self.repo_fetcher._fetch_tree_content("test-user", "test-repo", "main", base)
+
+        self.assertEqual(sorted(item["path"] for item in result), ["docs/guide.md", "src/examples/demo.py"])
+        self.mock_client.get_tree.assert_called_once_with("test-user", "test-repo", "main", recursive=True)
+        self.assertTrue((base / "src" / "examples" / "demo.py").exists())
+
+    def test_limit_file_items_keeps_highest_priority(self):
+        """Test that max_files keeps the highest priority files in scan order."""
+        self.repo_fetcher.priority_content = ["guide"]
+        items = [
+            FileItem(owner="test-user", repo="test-repo", path=path,
+                     branch="main", local_path=f"/tmp/{path}")
+            for path in ("docs/a.md", "docs/guide.md", "docs/b.md", "docs/c.md")
+        ]
+
+        kept = self.repo_fetcher._limit_file_items(items, 2)
+
+        self.assertEqual([item.path for item in kept], ["docs/guide.md", "docs/a.md"])
+        self.assertEqual(self.repo_fetcher._limit_file_items(items, None), items)
+
+    def test_process_pdf_folder_structure_labels_and_skips(self):
+        """Test that PDFs are labelled by relevant folders and ignored folders are skipped."""
+        base = Path(self.temp_dir.name) / "pdfs"
+        for rel in ("a.pdf", "docs/b.pdf", "docs/node_modules/c.pdf", "src/docs/x/d.PDF", "e.txt"):
+            (base / rel).parent.mkdir(parents=True, exist_ok=True)
+            (base / rel).write_text("")
+
+        pdfs = sorted(self.repo_fetcher._process_pdf_folder_structure(base),
+                      key=lambda item: item["relative_path"])
+
+        self.assertEqual(
+            [(item["relative_path"], item["labels"], item["directory"]) for item in pdfs],
+            [("a.pdf", [], "."),
+             (os.path.join("docs", "b.pdf"), ["docs"], "docs"),
+             (os.path.join("src", "docs", "x", "d.PDF"), ["docs"], os.path.join("src", "docs", "x"))]
+        )
+
+    def test_download_queue_take_all(self):
+        """Test that take_all empties the queue but keeps the file count."""
+        queue = self.repo_fetcher.download_queue
+        queue.reset()
+        items = [
+            FileItem(owner="test-user", repo="test-repo", path=f"file{i}.md",
+                     branch="main", local_path=f"/tmp/file{i}.md")
+            for i in range(3)
+        ]
+        queue.add_files(items)
+
+        self.assertEqual(queue.take_all(), items)
+        self.assertTrue(queue.is_empty())
+        self.assertEqual(queue.total_files, 3)
+
+    def test_download_queue_get_batch_and_mark_many(self):
+        """Test taking several files at once and marking them processed together."""
+        queue = self.repo_fetcher.download_queue
+        queue.reset()
+        items = [
+            FileItem(owner="test-user", repo="test-repo", path=f"file{i}.md",
+                     branch="main", local_path=f"/tmp/file{i}.md")
+            for i in range(5)
+        ]
+        queue.add_files(items)
+
+        self.assertEqual(queue.get_batch(3), items[:3])
+        self.assertEqual(queue.get_batch(3), items[3:])
+        self.assertEqual(queue.get_batch(3), [])
+
+        queue.mark_processed(queue.HISTORY_SAMPLE_EVERY + 1)
+        self.assertEqual(queue.processed_files, queue.HISTORY_SAMPLE_EVERY + 1)
+        self.assertEqual(len(queue.processing_history), 1)
+
+    def test_download_queue_samples_processing_history(self):
+        """Test that mark_processed only samples the clock every few files."""
+        queue = self.repo_fetcher.download_queue
+        queue.reset()
+        queue.total_files = 40
+
+        for _ in range(20):
+            queue.mark_processed()
+
+        every = queue.HISTORY_SAMPLE_EVERY
+        self.assertEqual([count for count, _ in queue.processing_history],
+                         [1] + list(range(every, 21, every)))
+        progress = queue.get_progress()
+        self.assertEqual(progress["files_processed"], 20)
+        self.assertEqual(progress["files_remaining"], 20)
+
+    def test_format_time_remaining_bands(self):
+        """Test that time remaining is formatted by magnitude."""
+        self.assertEqual(_format_time_remaining(59.9), "59s")
+        self.assertEqual(_format_time_remaining(60), "1m 0s")
+        self.assertEqual(_format_time_remaining(3725), "1h 2m")
+        self.assertEqual(_format_time_remaining(float('inf')), "Unknown")
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
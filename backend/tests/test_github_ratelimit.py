@@ -0,0 +1,65 @@
+import time
+import pytest
+from unittest.mock import patch
+from utils.github_ratelimit import RateLimiter, RateLimitExhausted
+
+
+def test_acquire_without_budget_information_does_not_wait():
+    """Unknown budgets let requests through immediately."""
+    limiter = RateLimiter(reserve=2)
+    assert limiter.acquire() == 0.0
+
+
+def test_update_tracks_resource_buckets():
+    """Headers are recorded per rate-limit resource."""
+    limiter = RateLimiter(reserve=2)
+    reset = str(int(time.time()) + 60)
+    limiter.update({"X-RateLimit-Remaining": "40", "X-RateLimit-Reset": reset})
+    limiter.update(
+        {"X-RateLimit-Remaining": "7", "X-RateLimit-Reset": reset, "X-RateLimit-Resource": "graphql"}
+    )
+
+    assert limiter.remaining("core") == 40
+    assert limiter.remaining("graphql") == 7
+
+    limiter.acquire("core")
+    assert limiter.remaining("core") == 39
+
+
+def test_headroom_reports_budget_above_reserve():
+    """Headroom is the budget left before the reserve, or None when unknown."""
+    limiter = RateLimiter(reserve=5)
+    assert limiter.headroom() is None
+
+    limiter.update({"X-RateLimit-Remaining": "12", "X-RateLimit-Reset": str(int(time.time()) + 60)})
+    assert limiter.headroom() == 7
+
+    limiter.update({"X-RateLimit-Remaining": "3", "X-RateLimit-Reset": str(int(time.time()) + 60)})
+    assert limiter.headroom() == 0
+
+
+@patch("utils.github_ratelimit.time.sleep")
+def test_acquire_waits_for_reset_when_budget_is_low(mock_sleep):
+    """Hitting the reserve waits for the window to reset."""
+    limiter = RateLimiter(reserve=5, max_wait=120)
+    limiter.update(
+        {"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": str(int(time.time()) + 30)}
+    )
+
+    # Let the window "pass" during the sleep
+    mock_sleep.side_effect = lambda seconds: limiter._buckets["core"].__setitem__(1, 0)
+
+    assert limiter.acquire() > 0
+    mock_sleep.assert_called_once()
+    assert limiter.remaining() is None
+
+
+def test_acquire_raises_when_reset_is_too_far():
+    """A reset beyond max_wait is reported instead of blocking."""
+    limiter = RateLimiter(reserve=5, max_wait=60)
+    limiter.update(
+        {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 3600)}
+    )
+
+    with pytest.raises(RateLimitExhausted):
+        limiter.acquire()
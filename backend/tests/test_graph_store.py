@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock
+
+from knowledge_graph import graph_store
+from knowledge_graph.graph_store import GraphStore
+
+
+@pytest.fixture
+def mock_neo4j(monkeypatch):
+    monkeypatch.setenv("NEO4J_URI", "bolt://localhost:7687")
+    monkeypatch.setenv("NEO4J_USERNAME", "neo4j")
+    monkeypatch.setenv("NEO4J_PASSWORD", "secret")
+    graph_store._DRIVER_CACHE.clear()
+    graph_store._RETIRED_DRIVERS.clear()
+    with patch("knowledge_graph.graph_store.Neo4jGraph") as MockNeo4jGraph:
+        MockNeo4jGraph.side_effect = lambda **kwargs: MagicMock()
+        yield MockNeo4jGraph
+    graph_store._DRIVER_CACHE.clear()
+    graph_store._RETIRED_DRIVERS.clear()
+
+
+@pytest.fixture
+def store(mock_neo4j):
+    return GraphStore(graph_name="test_graph")
+
+
+def test_extract_entities_from_documents_inside_running_loop(store):
+    documents = [{"id": "doc1", "content": "Alice works at Acme"}, {"id": "doc2", "content": "Bob"}]
+
+    with patch("knowledge_graph.graph_store.ChatOpenAI"), \
+         patch("knowledge_graph.graph_store.LLMGraphTransformer") as MockTransformer:
+        MockTransformer.return_value.process_response.side_effect = lambda doc: f"graph:{doc.metadata['id']}"
+
+        async def extract():
+            return store.extract_entities_from_documents(documents, llm_api_key="mock_key")
+
+        assert asyncio.run(extract()) is True
+
+    store.graph.add_graph_documents.assert_called_once()
+    graph_documents = store.graph.add_graph_documents.call_args[0][0]
+    assert graph_documents == ["graph:doc1", "graph:doc2"]
+
+
+def test_graph_stores_share_a_connection(mock_neo4j):
+    first = GraphStore(graph_name="test_graph")
+    second = GraphStore(graph_name="test_graph")
+
+    assert first.graph is second.graph
+    assert mock_neo4j.call_count == 1
+
+
+def test_password_change_replaces_cached_connection(mock_neo4j, monkeypatch):
+    first = GraphStore(graph_name="test_graph")
+    monkeypatch.setenv("NEO4J_PASSWORD", "rotated")
+    second = GraphStore(graph_name="test_graph")
+
+    assert first.graph is not second.graph
+    assert mock_neo4j.call_args.kwargs["password"] == "rotated"
+    # The earlier store keeps a working driver until exit
+    first.graph.close.assert_not_called()
+
+    GraphStore.close_all()
+    first.graph.close.assert_called_once()
+    second.graph.close.assert_called_once()
+
+
+def test_close_all_closes_cached_connections(store):
+    GraphStore.close_all()
+
+    store.graph.close.assert_called_once()
+    assert graph_store._DRIVER_CACHE == {}
+
+
+def test_search_documents_escapes_query_syntax(store):
+    store.graph.query.return_value = []
+
+    store.search_documents('foo) "bar AND', limit=5)
+
+    params = store.graph.query.call_args[0][1]
+    assert params["query"] == '+graph_name:"test_graph" +content:(foo\\) \\"bar \\AND)'
+    assert params["graph_name"] == "test_graph"
+
+
+def test_search_documents_rejects_empty_query(store):
+    assert store.search_documents("   ") == []
+    store.graph.query.assert_not_called()
@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import MagicMock
+from github.graphql_client import (
+    paginate_graphql, iter_organization_repositories, fetch_blob_texts
+)
+
+
+def test_paginate_graphql_follows_cursor():
+    """Test that pagination follows endCursor until hasNextPage is false."""
+    client = MagicMock()
+    client.graphql.side_effect = [
+        {"organization": {"repositories": {"nodes": [1], "pageInfo": {"hasNextPage": True, "endCursor": "c1"}}}},
+        {"organization": {"repositories": {"nodes": [2], "pageInfo": {"hasNextPage": False, "endCursor": None}}}},
+    ]
+
+    pages = list(paginate_graphql(client, "query", {"org": "o"}, ["organization", "repositories"]))
+
+    assert [page["nodes"] for page in pages] == [[1], [2]]
+    assert client.graphql.call_args_list[1].args[1] == {"org": "o", "cursor": "c1"}
+
+
+def test_iter_organization_repositories_converts_nodes():
+    """Test that repository nodes are converted to REST-style dicts without fetching trees."""
+    client = MagicMock()
+    client.graphql.return_value = {"organization": {"repositories": {
+        "totalCount": 1,
+        "pageInfo": {"hasNextPage": False, "endCursor": None},
+        "nodes": [{
+            "name": "repo", "nameWithOwner": "org/repo", "url": "https://github.com/org/repo",
+            "description": None, "owner": {"login": "org"}, "defaultBranchRef": {"name": "main"},
+        }, None],
+    }}}
+
+    pages = list(iter_organization_repositories(client, "org"))
+
+    total, repos = pages[0]
+    assert total == 1
+    assert repos == [{
+        "name": "repo", "full_name": "org/repo", "owner": {"login": "org"},
+        "html_url": "https://github.com/org/repo", "description": None, "default_branch": "main",
+    }]
+    query, variables = client.graphql.call_args.args
+    assert "entries" not in query
+    assert variables["first"] == 100
+
+
+def test_fetch_blob_texts_passes_expressions_as_variables():
+    """Test that blob texts come back in path order, with None for binary or missing files."""
+    client = MagicMock()
+    client.graphql.return_value = {"repository": {
+        "f0": {"text": "# Guide", "byteSize": 7, "isBinary": False, "isTruncated": False},
+        "f1": {"text": None, "byteSize": 10, "isBinary": True, "isTruncated": False},
+        "f2": None,
+    }}
+
+    texts = fetch_blob_texts(client, "owner", "repo", "main", ["docs/a.md", "docs/b.png", "docs/gone.md"])
+
+    assert texts == ["# Guide", None, None]
+    query, variables = client.graphql.call_args.args
+    assert "f2: object(expression: $e2)" in query
+    assert variables == {"owner": "owner", "name": "repo", "e0": "main:docs/a.md",
+                         "e1": "main:docs/b.png", "e2": "main:docs/gone.md"}
+
+
+def test_fetch_blob_texts_rejects_text_that_is_not_byte_identical():
+    """Test that blobs whose text does not re-encode to byteSize bytes are left for raw downloads."""
+    client = MagicMock()
+    client.graphql.return_value = {"repository": {
+        # Latin-1 "café" is 4 bytes on disk but 5 once re-encoded as UTF-8
+        "f0": {"text": "café", "byteSize": 4, "isBinary": False, "isTruncated": False},
+        "f1": {"text": "café", "byteSize": 5, "isBinary": False, "isTruncated": False},
+    }}
+
+    texts = fetch_blob_texts(client, "owner", "repo", "main", ["latin1.txt", "utf8.txt"])
+
+    assert texts == [None, "café"]
@@ -0,0 +1,138 @@
+import time
+import logging
+import threading
+from pathlib import Path
+import sys
+
+# Ensure local import takes precedence over any installed packages
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config.settings import GITHUB_RATE_LIMIT_RESERVE, GITHUB_RATE_LIMIT_MAX_WAIT
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExhausted(Exception):
+    """Raised when the rate-limit window will not reset within the allowed wait."""
+
+    def __init__(self, resource, wait_time):
+        self.resource = resource
+        self.wait_time = wait_time
+        super().__init__(
+            f"GitHub {resource} rate limit exhausted, resets in {wait_time:.0f}s"
+        )
+
+
+class RateLimiter:
+    """
+    Gate GitHub requests on the rate-limit budget the server reports.
+
+    Every response carries ``X-RateLimit-Remaining`` and ``X-RateLimit-Reset``
+    for its resource bucket (``core``, ``graphql``, ...). ``update`` records
+    them and ``acquire`` reserves one request from the bucket before it is
+    sent. Once the bucket drops to ``reserve`` requests, callers wait for the
+    window to reset instead of spending requests that would come back 403.
+
+    One limiter is shared by every thread, so the reserve should be at least
+    the number of requests that can be in flight at once.
+    """
+
+    def __init__(self, reserve=GITHUB_RATE_LIMIT_RESERVE, max_wait=GITHUB_RATE_LIMIT_MAX_WAIT):
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        # resource -> [remaining, reset epoch seconds]
+        self._buckets = {}
+
+    @staticmethod
+    def _header_int(headers, name):
+        value = headers.get(name)
+        if isinstance(value, (str, int)):
+            try:
+                return int(value)
+            except ValueError:
+                return None
+        return None
+
+    def update(self, headers, resource="core"):
+        """
+        Record the rate-limit state reported by a response.
+
+        Args:
+            headers (Mapping): Response headers
+            resource (str): Bucket to update when the response does not name one
+        """
+        remaining = self._header_int(headers, "X-RateLimit-Remaining")
+        reset = self._header_int(headers, "X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+
+        named = headers.get("X-RateLimit-Resource")
+        if isinstance(named, str) and named:
+            resource = named
+
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            # Responses can arrive out of order; never raise the budget within a window
+            if bucket and bucket[1] == reset:
+                remaining = min(remaining, bucket[0])
+            self._buckets[resource] = [remaining, reset]
+
+    def remaining(self, resource="core"):
+        """Return the last known remaining budget for a bucket, or None if unknown."""
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            return bucket[0] if bucket else None
+
+    def headroom(self, resource="core"):
+        """
+        Return how many requests a bucket can still spend before hitting the reserve.
+
+        Returns:
+            int: Requests left above the reserve (0 when depleted), or None if the
+            budget is unknown or its window has already reset
+        """
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            if bucket is None or bucket[1] <= time.time():
+                return None
+            return max(0, bucket[0] - self.reserve)
+
+    def acquire(self, resource="core"):
+        """
+        Reserve one request from a bucket, waiting for a reset if it is depleted.
+
+        Args:
+            resource (str): Rate-limit bucket the request counts against
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            RateLimitExhausted: If the reset is further away than ``max_wait``
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                bucket = self._buckets.get(resource)
+                if bucket is None:
+                    return waited
+
+                wait_time = bucket[1] - time.time()
+                if wait_time <= 0:
+                    # Window has reset; the next response reports the new budget
+                    del self._buckets[resource]
+                    return waited
+
+                if bucket[0] > self.reserve:
+                    bucket[0] -= 1
+                    return waited
+
+            if wait_time > self.max_wait:
+                raise RateLimitExhausted(resource, wait_time)
+
+            logger.warning(
+                f"GitHub {resource} rate limit low, waiting {wait_time:.0f}s for reset"
+            )
+            # Small buffer so we do not race the server's own clock
+            time.sleep(wait_time + 1)
+            waited += wait_time + 1